@@ -7,6 +7,7 @@
 from .chromium_page import ChromiumPage
 from .session_page import SessionPage
 from .web_page import WebPage
+from .async_chromium_page import AsyncChromiumPage
 
 # 启动配置类
 from .configs.chromium_options import ChromiumOptions
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  :   g1879
+@Contact :   g1879@qq.com
+"""
+from asyncio import get_event_loop, wait_for, iscoroutine, shield, ensure_future, TimeoutError as AsyncTimeoutError
+from warnings import warn
+
+from .chromium_driver import GenericAttr, _ALERT_RESULT
+from .commons.codec import dumps, loads
+from .commons.constants import HANDLE_ALERT_METHOD
+from .errors import CallMethodError
+
+
+class AsyncChromiumDriver(object):
+    """基于asyncio的ChromiumDriver，一个事件循环可驱动多个标签页，不需要额外线程"""
+    _INITIAL_ = 'initial'
+    _STARTED_ = 'started'
+    _STOPPED_ = 'stopped'
+
+    def __init__(self, tab_id, tab_type, address):
+        """
+        :param tab_id: 标签页id
+        :param tab_type: 标签页类型
+        :param address: 浏览器连接地址
+        """
+        self.id = tab_id
+        self.address = address
+        self.type = tab_type
+        self.debug = False
+        self._has_alert = False
+
+        self._websocket_url = f'ws://{address}/devtools/{tab_type}/{tab_id}'
+        self._cur_id = 0
+        self._ws = None
+        self._connecting = None
+        self._recv_task = None
+
+        self._stopped = False
+        self._started = False
+        self.status = self._INITIAL_
+
+        self.event_handlers = {}
+        self.method_results = {}
+
+    @property
+    def has_alert(self):
+        """返回是否存在未处理的提示框"""
+        return self._has_alert
+
+    @has_alert.setter
+    def has_alert(self, on_off):
+        """设置是否存在提示框，出现提示框时立即唤醒所有等待结果的调用
+        :param on_off: 是否存在
+        :return: None
+        """
+        self._has_alert = on_off
+        if on_off:
+            for future in self.method_results.values():
+                if not future.done():
+                    future.set_result(_ALERT_RESULT)
+
+    async def _send(self, message, timeout=None):
+        """发送信息到浏览器，并返回浏览器返回的信息
+        :param message: 发送给浏览器的数据
+        :param timeout: 超时时间
+        :return: 浏览器返回的数据，连接已断开时返回None
+        """
+        self._cur_id += 1
+        message['id'] = self._cur_id
+        message_json = dumps(message)
+
+        if self.debug:
+            print(f"发> {message_json}")
+
+        if self.has_alert and message['method'] != HANDLE_ALERT_METHOD:
+            return _ALERT_RESULT
+
+        future = get_event_loop().create_future()
+        self.method_results[message['id']] = future
+        try:
+            try:
+                await self._ws.send(message_json)
+            except Exception:  # 连接已断开（ConnectionClosed），或已调用stop()使_ws为None（AttributeError）
+                return None
+            return await wait_for(future, timeout)
+
+        except AsyncTimeoutError:
+            raise TimeoutError(f"调用{message['method']}超时。")
+
+        finally:
+            self.method_results.pop(message['id'], None)
+
+    async def _recv_loop(self):
+        """接收浏览器信息的协程，退出时让所有等待中的调用立即返回"""
+        try:
+            while not self._stopped:
+                try:
+                    message_json = await self._ws.recv()
+                    message = loads(message_json)
+                except Exception:
+                    if not self._stopped:
+                        await self.stop()
+                    return
+
+                if self.debug:
+                    print(f'<收 {message_json}')
+
+                if "method" in message:
+                    if message['method'] == 'Page.javascriptDialogOpening':
+                        self.has_alert = True
+                    elif message['method'] == 'Page.javascriptDialogClosed':
+                        self.has_alert = False
+                    self._handle_event(message)
+
+                elif "id" in message:
+                    future = self.method_results.get(message['id'], None)
+                    if future is not None and not future.done():
+                        future.set_result(message)
+
+                elif self.debug:
+                    print(f'未知信息：{message}')
+
+        finally:
+            for future in self.method_results.values():
+                if not future.done():
+                    future.set_result(None)
+
+    def _handle_event(self, event):
+        """执行已绑定到cdp event的方法，协程方法以任务方式执行，回调出错时只发出警告，不影响接收信息
+        :param event: 浏览器发来的事件信息
+        :return: None
+        """
+        handler = self.event_handlers.get(event['method'], None)
+        if handler is None:
+            return
+
+        try:
+            r = handler(**event['params'])
+            if iscoroutine(r):
+                get_event_loop().create_task(self._run_handler(handler, r))
+        except Exception as e:
+            warn(f"\n回调函数 {getattr(handler, '__name__', handler)} 错误：\n{e}")
+
+    @staticmethod
+    async def _run_handler(handler, coro):
+        """执行协程回调方法，出错时只发出警告
+        :param handler: 回调方法
+        :param coro: 回调方法返回的协程
+        :return: None
+        """
+        try:
+            await coro
+        except Exception as e:
+            warn(f"\n回调函数 {getattr(handler, '__name__', handler)} 错误：\n{e}")
+
+    def __getattr__(self, item):
+        attr = GenericAttr(item, self)
+        setattr(self, item, attr)
+        return attr
+
+    async def call_method(self, _method, *args, **kwargs):
+        """执行cdp方法
+        :param _method: cdp方法名
+        :param args: cdp参数
+        :param kwargs: cdp参数
+        :return: 执行结果
+        """
+        if not self._started or self._connecting is not None:
+            await self.start()
+        if args:
+            raise CallMethodError("参数必须是key=value形式。")
+
+        if self._stopped:
+            return {'error': 'tab closed', 'type': 'tab_closed'}
+
+        timeout = kwargs.pop("_timeout", None)
+        result = await self._send({"method": _method, "params": kwargs}, timeout=timeout)
+        if result is None:
+            return {'error': 'tab closed', 'type': 'tab_closed'}
+        if 'result' not in result and 'error' in result:
+            return {'error': result['error']['message'],
+                    'type': result.get('type', 'call_method_error'),
+                    'method': _method,
+                    'args': kwargs}
+
+        return result['result']
+
+    async def start(self):
+        """启动连接，连接过程中再次调用时等待同一次连接完成"""
+        if self._started:
+            if self._connecting is not None:
+                await shield(self._connecting)
+            return False
+
+        try:
+            from websockets import connect
+        except ModuleNotFoundError:
+            raise ModuleNotFoundError('请先安装websockets，pip install websockets')
+
+        self._started = True
+        self.status = self._STARTED_
+        self._stopped = False
+        self._connecting = ensure_future(connect(self._websocket_url, max_size=None))
+        try:
+            self._ws = await self._connecting
+        except Exception:
+            self._started = False
+            self.status = self._INITIAL_
+            raise
+        finally:
+            self._connecting = None
+        self._recv_task = get_event_loop().create_task(self._recv_loop())
+        return True
+
+    async def stop(self):
+        """中断连接"""
+        if self._stopped:
+            return False
+        if not self._started:
+            return True
+
+        self.status = self._STOPPED_
+        self._stopped = True
+        if self._ws:
+            await self._ws.close()
+            self._ws = None
+
+        for future in self.method_results.values():
+            if not future.done():
+                future.set_result(None)
+        self.method_results.clear()
+        self.event_handlers.clear()
+        return True
+
+    def set_listener(self, event, callback):
+        """绑定cdp event和回调方法，回调方法可以是普通方法或协程方法
+        :param event: cdp event
+        :param callback: 绑定到cdp event的回调方法
+        :return: 回调方法
+        """
+        if not callback:
+            return self.event_handlers.pop(event, None)
+        if not callable(callback):
+            raise RuntimeError("方法不能调用。")
+
+        self.event_handlers[event] = callback
+        return True
+
+    def get_listener(self, event):
+        """获取cdp event对应的回调方法
+        :param event: cdp event
+        :return: 回调方法
+        """
+        return self.event_handlers.get(event, None)
+
+    def __str__(self):
+        return f"<AsyncChromiumDriver {self.id}>"
+
+    __repr__ = __str__
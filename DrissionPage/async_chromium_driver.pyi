@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  :   g1879
+@Contact :   g1879@qq.com
+"""
+from asyncio import Task
+from typing import Union, Callable, Optional, Coroutine
+
+
+class AsyncChromiumDriver(object):
+    _INITIAL_: str
+    _STARTED_: str
+    _STOPPED_: str
+    id: str
+    address: str
+    type: str
+    debug: bool
+    _has_alert: bool
+    _websocket_url: str
+    _cur_id: int
+    _ws = None
+    _connecting: Optional[Task]
+    _recv_task: Optional[Task]
+    _stopped: bool
+    _started: bool
+    status: str
+    event_handlers: dict
+    method_results: dict
+
+    def __init__(self, tab_id: str, tab_type: str, address: str): ...
+
+    @property
+    def has_alert(self) -> bool: ...
+
+    @has_alert.setter
+    def has_alert(self, on_off: bool) -> None: ...
+
+    async def _send(self, message: dict, timeout: float = None) -> Optional[dict]: ...
+
+    async def _recv_loop(self) -> None: ...
+
+    def _handle_event(self, event: dict) -> None: ...
+
+    @staticmethod
+    async def _run_handler(handler: Callable, coro: Coroutine) -> None: ...
+
+    def __getattr__(self, item: str) -> Callable: ...
+
+    async def call_method(self, _method: str, *args, **kwargs) -> dict: ...
+
+    async def start(self) -> bool: ...
+
+    async def stop(self) -> bool: ...
+
+    def set_listener(self, event: str, callback: Union[Callable, None]) -> Union[Callable, None, bool]: ...
+
+    def get_listener(self, event: str) -> Union[Callable, None]: ...
@@ -0,0 +1,547 @@
+# -*- coding:utf-8 -*-
+"""
+@Author  :   g1879
+@Contact :   g1879@qq.com
+"""
+from asyncio import get_event_loop, sleep
+from time import perf_counter
+
+from requests import Session
+
+from .async_chromium_driver import AsyncChromiumDriver
+from .chromium_base import ChromiumBase, Timeout
+from .chromium_element import make_relative_loc, make_js_for_find, is_empty_result, make_run_js_cmd, \
+    parse_js_value, convert_value
+from .chromium_page import Alert
+from .commons.browser import connect_browser
+from .commons.constants import NoneElement, Settings, HANDLE_ALERT_METHOD
+from .commons.locator import get_loc
+from .commons.web import make_absolute_link, ELE_TXT_JS, ele_txt_by_js
+from .configs.chromium_options import ChromiumOptions
+from .errors import BrowserConnectError, ContextLossError, ElementLossError, JavaScriptError, ElementNotFoundError, \
+    AlertExistsError
+
+
+class AsyncChromiumBase(object):
+    """异步标签页基类，方法以协程方式提供"""
+
+    def __init__(self, address, tab_id=None, timeout=None):
+        """
+        :param address: 浏览器 ip:port
+        :param tab_id: 要控制的标签页id，不指定默认为激活的
+        :param timeout: 超时时间
+        """
+        self.address = address
+        self._tab_id = tab_id
+        self._tab_obj = None
+        self._root_id = None
+        self._doc_version = 0
+        self._alert = Alert()
+        self._timeouts = Timeout(self)
+        self.timeout = timeout if timeout is not None else self._timeouts.implicit
+        self._control_session = Session()
+        self._control_session.keep_alive = False
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def connect(self):
+        """连接标签页"""
+        if not self._tab_id:
+            json = await self._get_json('json')
+            tab_id = [i['id'] for i in json if i['type'] == 'page']
+            if not tab_id:
+                raise BrowserConnectError('浏览器连接失败，可能是浏览器版本原因。')
+            self._tab_id = tab_id[0]
+
+        self._tab_obj = AsyncChromiumDriver(tab_id=self._tab_id, tab_type='page', address=self.address)
+        await self._tab_obj.start()
+        await self._tab_obj.Page.enable()
+        await self._tab_obj.DOM.enable()
+        self._tab_obj.DOM.documentUpdated = self._onDocumentUpdated
+        self._tab_obj.Page.javascriptDialogOpening = self._on_alert_open
+        self._tab_obj.Page.javascriptDialogClosed = self._on_alert_close
+        await self._get_document()
+        return self
+
+    async def close(self):
+        """断开与标签页的连接，不关闭标签页"""
+        if self._tab_obj:
+            await self._tab_obj.stop()
+
+    async def _get_json(self, path):
+        """在线程池中请求浏览器的http接口，避免阻塞事件循环
+        :param path: 接口路径，如 'json'
+        :return: 返回的json数据
+        """
+        url = f'http://{self.address}/{path}'
+        r = await get_event_loop().run_in_executor(None, self._control_session.get, url)
+        return r.json()
+
+    async def _get_document(self):
+        """刷新cdp使用的document数据"""
+        b_id = (await self.run_cdp('DOM.getDocument'))['root']['backendNodeId']
+        self._root_id = (await self.run_cdp('DOM.resolveNode', backendNodeId=b_id))['object']['objectId']
+
+    async def _get_root_id(self):
+        """返回document的object id，文档已更新时重新获取"""
+        if self._root_id is None:
+            await self._get_document()
+        return self._root_id
+
+    def _onDocumentUpdated(self, **kwargs):
+        """文档更新时使缓存的document失效"""
+        self._doc_version += 1
+        self._root_id = None
+
+    def _on_alert_open(self, **kwargs):
+        """提示框出现时记录其信息，driver已在收到事件时标记存在提示框"""
+        self._alert.activated = True
+        self._alert.text = kwargs['message']
+        self._alert.type = kwargs['type']
+        self._alert.defaultPrompt = kwargs.get('defaultPrompt', None)
+        self._alert.response_accept = None
+        self._alert.response_text = None
+
+    def _on_alert_close(self, **kwargs):
+        """提示框关闭时记录处理结果"""
+        self._alert.activated = False
+        self._alert.text = None
+        self._alert.type = None
+        self._alert.defaultPrompt = None
+        self._alert.response_accept = kwargs.get('result')
+        self._alert.response_text = kwargs.get('userInput')
+
+    @property
+    def driver(self):
+        """返回用于控制浏览器的AsyncChromiumDriver对象"""
+        if self._tab_obj is None:
+            raise RuntimeError('浏览器已关闭或链接已断开。')
+        return self._tab_obj
+
+    @property
+    def tab_id(self):
+        """返回当前标签页id"""
+        return self._tab_id
+
+    @property
+    def timeouts(self):
+        """返回timeouts设置"""
+        return self._timeouts
+
+    async def title(self):
+        """返回当前页面title"""
+        return (await self.run_cdp('Target.getTargetInfo', targetId=self.tab_id))['targetInfo']['title']
+
+    async def url(self):
+        """返回当前页面url"""
+        return (await self.run_cdp('Target.getTargetInfo', targetId=self.tab_id))['targetInfo']['url']
+
+    async def html(self):
+        """返回当前页面html文本"""
+        return (await self.run_cdp('DOM.getOuterHTML', objectId=await self._get_root_id()))['outerHTML']
+
+    async def ready_state(self):
+        """返回当前页面加载状态，'loading' 'interactive' 'complete'"""
+        r = await self.run_cdp('Runtime.evaluate', expression='document.readyState;')
+        return r['result']['value']
+
+    async def run_cdp(self, cmd, **cmd_args):
+        """执行Chrome DevTools Protocol语句
+        :param cmd: 协议项目
+        :param cmd_args: 参数
+        :return: 执行的结果
+        """
+        if self.driver.has_alert and cmd != HANDLE_ALERT_METHOD:
+            raise AlertExistsError
+
+        r = await self.driver.call_method(cmd, **cmd_args)
+        return self._check_cdp_result(r)
+
+    _check_cdp_result = ChromiumBase._check_cdp_result
+
+    async def run_js(self, script, *args, as_expr=False):
+        """运行javascript代码
+        :param script: js文本
+        :param args: 参数，按顺序在js文本中对应argument[0]、argument[1]...
+        :param as_expr: 是否作为表达式运行，为True时args无效
+        :return: 运行的结果
+        """
+        return await async_run_js(self, script, as_expr, self.timeouts.script, args)
+
+    async def handle_alert(self, accept=True, send=None, timeout=None):
+        """处理提示框，可以自动等待提示框出现
+        :param accept: True表示确认，False表示取消，其它值不会按按钮但依然返回文本值
+        :param send: 处理prompt提示框时可输入文本
+        :param timeout: 等待提示框出现的超时时间，为None则使用self.timeout属性的值
+        :return: 提示框内容文本，未等到提示框则返回None
+        """
+        timeout = timeout or self.timeout
+        timeout = .1 if timeout <= 0 else timeout
+        end_time = perf_counter() + timeout
+        while not self._alert.activated and perf_counter() < end_time:
+            await sleep(.05)
+        if not self._alert.activated:
+            return None
+
+        res_text = self._alert.text
+        if self._alert.type == 'prompt':
+            await self.driver.Page.handleJavaScriptDialog(accept=accept, promptText=send)
+        else:
+            await self.driver.Page.handleJavaScriptDialog(accept=accept)
+        return res_text
+
+    async def get(self, url, show_errmsg=False, timeout=None):
+        """访问url
+        :param url: 目标url
+        :param show_errmsg: 是否抛出异常
+        :param timeout: 页面加载超时时间
+        :return: 目标url是否可用
+        """
+        timeout = timeout if timeout is not None else self.timeouts.page_load
+        await self._get_root_id()  # 获取过document后浏览器才会发出下一次文档更新事件
+        version = self._doc_version
+        result = await self.run_cdp('Page.navigate', url=url)
+
+        err = None
+        if 'errorText' in result:
+            err = ConnectionError(result['errorText'])
+        elif not await self._wait_loaded(timeout, version if 'loaderId' in result else None):
+            err = TimeoutError('页面连接超时。')
+
+        await self._get_document()
+        if err:
+            if show_errmsg:
+                raise err
+            return False
+        return True
+
+    async def _wait_loaded(self, timeout, version=None):
+        """等待页面加载完成
+        :param timeout: 超时时间
+        :param version: 跳转前的文档版本，传入时先等待文档更新，避免读到旧文档的加载状态
+        :return: 是否成功，超时返回False
+        """
+        end_time = perf_counter() + timeout
+        while version is not None and self._doc_version == version and perf_counter() < end_time:
+            await sleep(.05)
+
+        while perf_counter() < end_time:
+            try:
+                if await self.ready_state() == 'complete':
+                    return True
+            except ContextLossError:
+                pass
+            await sleep(.1)
+
+        await self.run_cdp('Page.stopLoading')
+        return False
+
+    async def ele(self, loc_or_str, timeout=None):
+        """获取第一个符合条件的元素对象
+        :param loc_or_str: 定位符
+        :param timeout: 查找超时时间
+        :return: AsyncChromiumElement对象
+        """
+        return await async_find_elements(self, await self._get_root_id(), loc_or_str, timeout, single=True)
+
+    async def eles(self, loc_or_str, timeout=None):
+        """获取所有符合条件的元素对象
+        :param loc_or_str: 定位符
+        :param timeout: 查找超时时间
+        :return: AsyncChromiumElement对象组成的列表
+        """
+        return await async_find_elements(self, await self._get_root_id(), loc_or_str, timeout, single=False)
+
+
+class AsyncChromiumPage(AsyncChromiumBase):
+    """用于在asyncio中管理浏览器的类"""
+
+    def __init__(self, addr_or_opts=None, tab_id=None, timeout=None):
+        """
+        :param addr_or_opts: 浏览器地址:端口或ChromiumOptions对象
+        :param tab_id: 要控制的标签页id，不指定默认为激活的
+        :param timeout: 超时时间
+        """
+        if not addr_or_opts or isinstance(addr_or_opts, ChromiumOptions):
+            self._driver_options = addr_or_opts or ChromiumOptions()
+        elif isinstance(addr_or_opts, str):
+            self._driver_options = ChromiumOptions()
+            self._driver_options.debugger_address = addr_or_opts
+        else:
+            raise TypeError('只能接收浏览器地址或ChromiumOptions类型参数。')
+
+        super().__init__(self._driver_options.debugger_address, tab_id, timeout)
+        self._timeouts = Timeout(self,
+                                 page_load=self._driver_options.timeouts['pageLoad'],
+                                 script=self._driver_options.timeouts['script'],
+                                 implicit=self._driver_options.timeouts['implicit'])
+        self.timeout = timeout if timeout is not None else self._timeouts.implicit
+
+    async def connect(self):
+        """连接或启动浏览器，然后连接标签页"""
+        await get_event_loop().run_in_executor(None, connect_browser, self._driver_options)
+        return await super().connect()
+
+    async def tabs(self):
+        """返回所有标签页id组成的列表"""
+        return [i['id'] for i in await self._get_json('json') if i['type'] == 'page']
+
+    async def get_tab(self, tab_id=None):
+        """获取一个已连接的标签页对象
+        :param tab_id: 要获取的标签页id，为None时获取当前tab
+        :return: AsyncChromiumTab对象
+        """
+        return await AsyncChromiumTab(self, tab_id or self.tab_id).connect()
+
+    async def new_tab(self, url=None):
+        """新建一个标签页并返回其对象，不切换当前标签页
+        :param url: 新标签页跳转到的网址
+        :return: AsyncChromiumTab对象
+        """
+        tab_id = (await self.run_cdp('Target.createTarget', url=''))['targetId']
+        tab = await AsyncChromiumTab(self, tab_id).connect()
+        if url:
+            await tab.get(url)
+        return tab
+
+    async def close_tabs(self, tabs_or_ids):
+        """关闭传入的标签页，可传入多个
+        :param tabs_or_ids: 要关闭的标签页对象或id，可传入列表或元组
+        :return: None
+        """
+        if not isinstance(tabs_or_ids, (list, tuple)):
+            tabs_or_ids = (tabs_or_ids,)
+        for tab in tabs_or_ids:
+            if isinstance(tab, AsyncChromiumTab):
+                await tab.close()
+                tab = tab.tab_id
+            await self.run_cdp('Target.closeTarget', targetId=tab)
+
+    async def quit(self):
+        """关闭浏览器"""
+        try:
+            await self.driver.Browser.close()
+        finally:
+            await self.close()
+
+
+class AsyncChromiumTab(AsyncChromiumBase):
+    """实现异步浏览器标签页的类"""
+
+    def __init__(self, page, tab_id=None):
+        """
+        :param page: AsyncChromiumPage对象
+        :param tab_id: 要控制的标签页id，不指定默认为激活的
+        """
+        self.page = page
+        super().__init__(page.address, tab_id, page.timeout)
+        self._timeouts = page.timeouts
+
+
+class AsyncChromiumElement(object):
+    """异步方式控制浏览器元素的对象"""
+
+    def __init__(self, page, obj_id):
+        """
+        :param page: 元素所在的异步页面对象
+        :param obj_id: js中的object id
+        """
+        self.page = page
+        self._obj_id = obj_id
+        self._tag = None
+
+    def __repr__(self):
+        return f'<AsyncChromiumElement {self._obj_id}>'
+
+    @property
+    def obj_id(self):
+        """返回js中的object id"""
+        return self._obj_id
+
+    async def tag(self):
+        """返回元素tag"""
+        if self._tag is None:
+            node = (await self.page.run_cdp('DOM.describeNode', objectId=self._obj_id))['node']
+            self._tag = node['localName'].lower()
+        return self._tag
+
+    async def html(self):
+        """返回元素outerHTML文本"""
+        return (await self.page.run_cdp('DOM.getOuterHTML', objectId=self._obj_id))['outerHTML']
+
+    async def attrs(self):
+        """返回元素所有attribute属性"""
+        attrs = (await self.page.run_cdp('DOM.describeNode', objectId=self._obj_id))['node'].get('attributes', [])
+        return {attrs[i]: attrs[i + 1] for i in range(0, len(attrs), 2)}
+
+    async def attr(self, attr):
+        """返回一个attribute属性值
+        :param attr: 属性名
+        :return: 属性值文本，没有该属性返回None
+        """
+        value = (await self.attrs()).get(attr, None)
+        if attr in ('href', 'src') and value and not value.lower().startswith(('javascript:', 'mailto:')):
+            return make_absolute_link(value, _UrlHolder(await self.page.url()))
+        return value
+
+    async def text(self):
+        """返回元素内所有文本，文本已格式化"""
+        r = await self.page.run_cdp('Runtime.callFunctionOn',
+                                    functionDeclaration=f'function(){{{ELE_TXT_JS}\nreturn eleTxt(this);}}',
+                                    objectId=self._obj_id, returnByValue=True)
+        return ele_txt_by_js(r['result']['value'])
+
+    async def run_js(self, script, *args, as_expr=False):
+        """对本元素执行javascript代码
+        :param script: js文本
+        :param args: 参数，按顺序在js文本中对应argument[0]、argument[1]...
+        :param as_expr: 是否作为表达式运行，为True时args无效
+        :return: 运行的结果
+        """
+        return await async_run_js(self, script, as_expr, self.page.timeouts.script, args)
+
+    async def ele(self, loc_or_str, timeout=None):
+        """返回当前元素下级符合条件的第一个元素
+        :param loc_or_str: 定位符
+        :param timeout: 查找元素超时时间
+        :return: AsyncChromiumElement对象
+        """
+        return await async_find_elements(self.page, self._obj_id, loc_or_str, timeout, single=True, relative=True)
+
+    async def eles(self, loc_or_str, timeout=None):
+        """返回当前元素下级所有符合条件的子元素
+        :param loc_or_str: 定位符
+        :param timeout: 查找元素超时时间
+        :return: AsyncChromiumElement对象组成的列表
+        """
+        return await async_find_elements(self.page, self._obj_id, loc_or_str, timeout, single=False, relative=True)
+
+    async def click(self):
+        """用js方式点击元素"""
+        await self.run_js('this.click();')
+
+    async def input(self, vals, clear=True):
+        """输入文本
+        :param vals: 文本值
+        :param clear: 输入前是否清空文本框
+        :return: None
+        """
+        await self.page.run_cdp('DOM.focus', objectId=self._obj_id)
+        if clear:
+            await self.run_js("this.value='';")
+        await self.page.run_cdp('Input.insertText', text=str(vals))
+
+
+class _UrlHolder(object):
+    """给make_absolute_link()提供url属性"""
+
+    def __init__(self, url):
+        self.url = url
+
+
+async def async_find_elements(page, obj_id, loc_or_str, timeout=None, single=True, relative=False):
+    """在页面或元素中异步查找元素
+    :param page: 异步页面对象
+    :param obj_id: 在其中查找的document或元素的object id
+    :param loc_or_str: 定位符
+    :param timeout: 查找超时时间
+    :param single: 是否只返回第一个
+    :param relative: 是否相对定位
+    :return: AsyncChromiumElement对象或其组成的列表
+    """
+    loc = get_loc(loc_or_str)
+    if relative:
+        loc = make_relative_loc(loc)
+    js = make_js_for_find(loc, single)
+
+    timeout = timeout if timeout is not None else page.timeout
+    end_time = perf_counter() + timeout
+    while True:
+        r = await page.run_cdp('Runtime.callFunctionOn', functionDeclaration=js, objectId=obj_id,
+                               returnByValue=False, awaitPromise=True)
+        if 'exceptionDetails' in r:
+            raise SyntaxError(f'查询语句错误：\n{r}')
+        r = r['result']
+        if not is_empty_result(r):
+            break
+        if perf_counter() >= end_time:
+            if single and Settings.raise_ele_not_found:
+                raise ElementNotFoundError
+            return NoneElement() if single else []
+        await sleep(.1)
+
+    if single:
+        return r['value'] if r['type'] == 'string' else AsyncChromiumElement(page, r['objectId'])
+
+    props = (await page.run_cdp('Runtime.getProperties', objectId=r['objectId'], ownProperties=True))['result']
+    return [AsyncChromiumElement(page, i['value']['objectId']) if i['value']['type'] == 'object'
+            else i['value']['value'] for i in props if i['name'].isdigit()]
+
+
+async def async_run_js(page_or_ele, script, as_expr=False, timeout=None, args=None):
+    """异步运行javascript代码
+    :param page_or_ele: 异步页面对象或元素对象
+    :param script: js文本
+    :param as_expr: 是否作为表达式运行，为True时args无效
+    :param timeout: 超时时间
+    :param args: 参数，按顺序在js文本中对应argument[0]、argument[1]...
+    :return: js执行结果
+    """
+    if isinstance(page_or_ele, AsyncChromiumElement):
+        page = page_or_ele.page
+        obj_id = page_or_ele.obj_id
+        is_page = False
+    else:
+        page = page_or_ele
+        obj_id = None if as_expr else await page_or_ele._get_root_id()
+        is_page = True
+
+    cmd, cmd_args = make_run_js_cmd(script, as_expr, timeout, obj_id, [_convert_argument(arg) for arg in args or ()])
+    try:
+        res = await page.run_cdp(cmd, **cmd_args)
+
+    except ContextLossError:
+        if is_page:
+            raise ContextLossError('页面已被刷新，请尝试等待页面加载完成再执行操作。')
+        else:
+            raise ElementLossError('原来获取到的元素对象已不在页面内。')
+
+    if 'result' not in res and page.driver.has_alert:  # 运行中出现了提示框
+        return None
+
+    exceptionDetails = res.get('exceptionDetails')
+    if exceptionDetails:
+        raise JavaScriptError(f'\njavascript运行错误：\n{script}\n错误信息: \n{exceptionDetails}')
+
+    return await _parse_js_result(page, res['result'])
+
+
+async def _parse_js_result(page, result):
+    """解析js返回的结果"""
+    kind, value = parse_js_value(result)
+
+    if kind == 'node':
+        return AsyncChromiumElement(page, result['objectId'])
+
+    elif kind == 'array':
+        r = (await page.run_cdp('Runtime.getProperties', objectId=result['objectId'], ownProperties=True))['result']
+        return [await _parse_js_result(page, i['value']) for i in r if i['name'].isdigit()]
+
+    elif kind == 'object':
+        r = await page.run_cdp('Runtime.callFunctionOn', functionDeclaration='function(){return this;}',
+                               objectId=result['objectId'], returnByValue=True)
+        return r['result'].get('value', None)
+
+    return value
+
+
+def _convert_argument(arg):
+    """把参数转换成js能够接收的形式"""
+    if isinstance(arg, AsyncChromiumElement):
+        return {'objectId': arg.obj_id}
+    return convert_value(arg)
@@ -0,0 +1,168 @@
+# -*- coding:utf-8 -*-
+"""
+@Author  :   g1879
+@Contact :   g1879@qq.com
+"""
+from typing import Union, Tuple, List, Any
+
+from requests import Session
+
+from .async_chromium_driver import AsyncChromiumDriver
+from .chromium_base import Timeout
+from .chromium_page import Alert
+from .commons.constants import NoneElement
+from .configs.chromium_options import ChromiumOptions
+
+
+class AsyncChromiumBase(object):
+
+    def __init__(self, address: str, tab_id: str = None, timeout: float = None):
+        self.address: str = ...
+        self._tab_id: str = ...
+        self._tab_obj: AsyncChromiumDriver = ...
+        self._root_id: str = ...
+        self._doc_version: int = ...
+        self._alert: Alert = ...
+        self._timeouts: Timeout = ...
+        self.timeout: float = ...
+        self._control_session: Session = ...
+
+    async def __aenter__(self) -> AsyncChromiumBase: ...
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None: ...
+
+    async def connect(self) -> AsyncChromiumBase: ...
+
+    async def close(self) -> None: ...
+
+    async def _get_json(self, path: str) -> Union[list, dict]: ...
+
+    async def _get_document(self) -> None: ...
+
+    async def _get_root_id(self) -> str: ...
+
+    def _onDocumentUpdated(self, **kwargs) -> None: ...
+
+    def _on_alert_open(self, **kwargs) -> None: ...
+
+    def _on_alert_close(self, **kwargs) -> None: ...
+
+    @property
+    def driver(self) -> AsyncChromiumDriver: ...
+
+    @property
+    def tab_id(self) -> str: ...
+
+    @property
+    def timeouts(self) -> Timeout: ...
+
+    async def title(self) -> str: ...
+
+    async def url(self) -> str: ...
+
+    async def html(self) -> str: ...
+
+    async def ready_state(self) -> str: ...
+
+    async def run_cdp(self, cmd: str, **cmd_args) -> dict: ...
+
+    def _check_cdp_result(self, r: dict) -> dict: ...
+
+    async def run_js(self, script: str, *args: Any, as_expr: bool = False) -> Any: ...
+
+    async def handle_alert(self, accept: bool = True, send: str = None, timeout: float = None) -> Union[str, None]: ...
+
+    async def get(self, url: str, show_errmsg: bool = False, timeout: float = None) -> bool: ...
+
+    async def _wait_loaded(self, timeout: float, version: int = None) -> bool: ...
+
+    async def ele(self, loc_or_str: Union[Tuple[str, str], str],
+                  timeout: float = None) -> Union[AsyncChromiumElement, str, NoneElement]: ...
+
+    async def eles(self, loc_or_str: Union[Tuple[str, str], str],
+                   timeout: float = None) -> List[Union[AsyncChromiumElement, str]]: ...
+
+
+class AsyncChromiumPage(AsyncChromiumBase):
+
+    def __init__(self, addr_or_opts: Union[str, ChromiumOptions] = None, tab_id: str = None,
+                 timeout: float = None):
+        self._driver_options: ChromiumOptions = ...
+
+    async def connect(self) -> AsyncChromiumPage: ...
+
+    async def tabs(self) -> List[str]: ...
+
+    async def get_tab(self, tab_id: str = None) -> AsyncChromiumTab: ...
+
+    async def new_tab(self, url: str = None) -> AsyncChromiumTab: ...
+
+    async def close_tabs(self, tabs_or_ids: Union[str, AsyncChromiumTab, list, tuple]) -> None: ...
+
+    async def quit(self) -> None: ...
+
+
+class AsyncChromiumTab(AsyncChromiumBase):
+
+    def __init__(self, page: AsyncChromiumPage, tab_id: str = None):
+        self.page: AsyncChromiumPage = ...
+
+
+class AsyncChromiumElement(object):
+
+    def __init__(self, page: AsyncChromiumBase, obj_id: str):
+        self.page: AsyncChromiumBase = ...
+        self._obj_id: str = ...
+        self._tag: str = ...
+
+    @property
+    def obj_id(self) -> str: ...
+
+    async def tag(self) -> str: ...
+
+    async def html(self) -> str: ...
+
+    async def attrs(self) -> dict: ...
+
+    async def attr(self, attr: str) -> Union[str, None]: ...
+
+    async def text(self) -> str: ...
+
+    async def run_js(self, script: str, *args: Any, as_expr: bool = False) -> Any: ...
+
+    async def ele(self, loc_or_str: Union[Tuple[str, str], str],
+                  timeout: float = None) -> Union[AsyncChromiumElement, str, NoneElement]: ...
+
+    async def eles(self, loc_or_str: Union[Tuple[str, str], str],
+                   timeout: float = None) -> List[Union[AsyncChromiumElement, str]]: ...
+
+    async def click(self) -> None: ...
+
+    async def input(self, vals: Any, clear: bool = True) -> None: ...
+
+
+class _UrlHolder(object):
+    def __init__(self, url: str):
+        self.url: str = ...
+
+
+async def async_find_elements(page: AsyncChromiumBase,
+                              obj_id: str,
+                              loc_or_str: Union[Tuple[str, str], str],
+                              timeout: float = None,
+                              single: bool = True,
+                              relative: bool = False) -> Union[AsyncChromiumElement, str, NoneElement,
+                                                               List[Union[AsyncChromiumElement, str]]]: ...
+
+
+async def async_run_js(page_or_ele: Union[AsyncChromiumBase, AsyncChromiumElement],
+                       script: str,
+                       as_expr: bool = False,
+                       timeout: float = None,
+                       args: tuple = None) -> Any: ...
+
+
+async def _parse_js_result(page: AsyncChromiumBase, result: dict) -> Any: ...
+
+
+def _convert_argument(arg: Any) -> dict: ...
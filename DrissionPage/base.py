@@ -130,7 +130,7 @@ class DrissionElement(BaseElement):
         elif isinstance(level_or_loc, (tuple, str)):
             loc = get_loc(level_or_loc, True)
 
-            if loc[0] == 'css selector':
+            if loc[0] != 'xpath':
                 raise ValueError('此css selector语法不受支持，请换成xpath。')
 
             loc = f'xpath:./ancestor::{loc[1].lstrip(". / ")}'
@@ -251,7 +251,7 @@ class DrissionElement(BaseElement):
 
         else:
             loc = get_loc(filter_loc, True)  # 把定位符转换为xpath
-            if loc[0] == 'css selector':
+            if loc[0] != 'xpath':
                 raise ValueError('此css selector语法不受支持，请换成xpath。')
             loc = loc[1].lstrip('./')
 
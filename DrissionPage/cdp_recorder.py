@@ -0,0 +1,457 @@
+# -*- coding:utf-8 -*-
+"""
+@Author  :   g1879
+@Contact :   g1879@qq.com
+"""
+from base64 import b64encode
+from hashlib import sha1
+from json import dumps, loads
+from socket import socket, SHUT_RDWR, IPPROTO_TCP, TCP_NODELAY
+from threading import Thread, Lock
+from time import perf_counter, sleep
+
+from .chromium_driver import ChromiumDriver
+
+
+class CdpRecorder(object):
+    """记录cdp通讯数据的类，每行格式为：'时间 方向 target 消息'，方向'>'为发送，'<'为接收"""
+
+    def __init__(self, path):
+        """
+        :param path: 记录文件路径
+        """
+        self.path = path
+        self._file = None
+        self._lock = Lock()
+        self._start_time = None
+
+    def start(self, driver=None):
+        """开始记录
+        :param driver: 要记录的ChromiumDriver对象，为None时记录所有ChromiumDriver
+        :return: 当前对象
+        """
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._start_time = perf_counter()
+
+        if driver is None:
+            ChromiumDriver.recorder = self
+        else:
+            driver.recorder = self
+        return self
+
+    def stop(self, driver=None):
+        """停止记录并关闭文件
+        :param driver: 要停止记录的ChromiumDriver对象，为None时停止记录所有ChromiumDriver
+        :return: None
+        """
+        if driver is not None:
+            driver.recorder = None
+            return
+
+        if ChromiumDriver.recorder is self:
+            ChromiumDriver.recorder = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def record(self, direction, url, message_json):
+        """记录一条消息
+        :param direction: '>'为发送，'<'为接收
+        :param url: 连接的websocket地址
+        :param message_json: 消息json文本
+        :return: None
+        """
+        target = url.split('/devtools/', 1)[-1]
+        with self._lock:
+            if self._file is not None:
+                self._file.write(f'{perf_counter() - self._start_time:.6f} {direction} {target} {message_json}\n')
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class ReplayServer(object):
+    """回放CdpRecorder记录的本地服务，提供/json、/json/version、/json/new、/json/activate、/json/close接口和websocket连接，
+    ChromiumPage可直接连接其地址，不需要浏览器和网络"""
+
+    def __init__(self, path, address='127.0.0.1:0', delay=False):
+        """
+        :param path: CdpRecorder记录的文件路径
+        :param address: 监听地址，端口为0时自动选择
+        :param delay: 是否按记录时的耗时延迟回复
+        """
+        self.delay = delay
+        self._host, port = address.split(':')
+        self._port = int(port)
+        self._socket = None
+        self._stopped = True
+        self._lock = Lock()
+        self._load(path)
+
+        targets = list(self._requests) + [i for i in self._on_connect if i not in self._requests]
+        pages = [i.split('/', 1)[-1] for i in targets if i.startswith('page/')]
+        # 记录期间新建的标签页，回放到新建时才出现在/json中
+        self._hidden = [i for i in self._created_targets() if i in pages]
+        self._tabs = [i for i in pages if i not in self._hidden]  # 当前打开的标签页id，最后激活的在前
+        self._new_count = 0
+
+    @property
+    def address(self):
+        """返回服务地址，ip:port"""
+        return f'{self._host}:{self._port}'
+
+    def _load(self, path):
+        """读取记录文件，把每个请求和其回复、之后收到的事件对应起来
+        :param path: 记录文件路径
+        :return: None
+        """
+        self._requests = {}  # {target: [[方法, 参数, 回复, 事件列表, 耗时, 是否已用], ...]}
+        self._on_connect = {}  # {target: [连接后、发出请求前收到的事件]}
+        pending = {}  # {(target, id): 请求}
+        last = {}  # {target: 最后一个请求}
+
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                t, direction, target, message = line.rstrip('\n').split(' ', 3)
+                message = loads(message)
+                t = float(t)
+
+                if direction == '>':
+                    req = [message['method'], message.get('params', {}), None, [], t, False]
+                    self._requests.setdefault(target, []).append(req)
+                    pending[(target, message['id'])] = req
+                    last[target] = req
+
+                elif 'id' in message:
+                    req = pending.pop((target, message['id']), None)
+                    if req is not None:
+                        req[2] = message
+                        req[4] = t - req[4]
+
+                elif target in last:
+                    last[target][3].append(message)
+                else:
+                    self._on_connect.setdefault(target, []).append(message)
+
+    def _created_targets(self):
+        """返回记录中用Target.createTarget新建的target id
+        :return: target id组成的列表
+        """
+        ids = []
+        for reqs in self._requests.values():
+            for req in reqs:
+                if req[0] == 'Target.createTarget' and req[2]:
+                    target_id = req[2].get('result', {}).get('targetId', None)
+                    if target_id and target_id not in ids:
+                        ids.append(target_id)
+        return ids
+
+    def _new_tab(self, target_id=None):
+        """新建一个标签页，优先使用记录期间新建的
+        :param target_id: 标签页id，为None时自动选择
+        :return: 标签页id
+        """
+        with self._lock:
+            if target_id is None:
+                if self._hidden:
+                    target_id = self._hidden[0]
+                else:
+                    self._new_count += 1
+                    target_id = f'replay{self._new_count}'
+            if target_id in self._hidden:
+                self._hidden.remove(target_id)
+            if target_id not in self._tabs:
+                self._tabs.insert(0, target_id)
+            return target_id
+
+    def _close_tab(self, target_id):
+        """关闭一个标签页
+        :param target_id: 标签页id
+        :return: 是否存在该标签页
+        """
+        with self._lock:
+            if target_id not in self._tabs:
+                return False
+            self._tabs.remove(target_id)
+            return True
+
+    def _on_reply(self, message, reply):
+        """回复websocket请求后，让新建、关闭标签页的命令在/json中生效
+        :param message: 收到的请求
+        :param reply: 回复的内容
+        :return: None
+        """
+        result = reply.get('result', None)
+        if not isinstance(result, dict):
+            return
+        if message['method'] == 'Target.createTarget' and result.get('targetId'):
+            self._new_tab(result['targetId'])
+        elif message['method'] == 'Target.closeTarget' and result.get('success'):
+            self._close_tab(message.get('params', {}).get('targetId', None))
+
+    def start(self):
+        """启动服务
+        :return: 服务地址
+        """
+        self._socket = socket()
+        self._socket.bind((self._host, self._port))
+        self._port = self._socket.getsockname()[1]
+        self._socket.listen(16)
+        self._stopped = False
+        Thread(target=self._accept_loop, daemon=True).start()
+        return self.address
+
+    def stop(self):
+        """停止服务"""
+        self._stopped = True
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _accept_loop(self):
+        """接受连接的线程方法"""
+        while not self._stopped:
+            try:
+                conn, _ = self._socket.accept()
+            except OSError:
+                return
+            conn.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+            Thread(target=self._handle_conn, args=(conn,), daemon=True).start()
+
+    def _handle_conn(self, conn):
+        """处理一个连接，http请求直接回复，websocket请求进入回放
+        :param conn: socket连接
+        :return: None
+        """
+        try:
+            data = b''
+            while b'\r\n\r\n' not in data:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    return
+                data += chunk
+
+            lines = data.split(b'\r\n\r\n', 1)[0].decode().split('\r\n')
+            url = lines[0].split(' ')[1]
+            headers = {k.strip().lower(): v.strip() for k, v in (i.split(':', 1) for i in lines[1:] if ':' in i)}
+
+            if headers.get('upgrade', '').lower() == 'websocket':
+                accept = b64encode(sha1(f"{headers['sec-websocket-key']}258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+                                        .encode()).digest()).decode()
+                conn.sendall(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                              f'Sec-WebSocket-Accept: {accept}\r\n\r\n').encode())
+                self._replay(conn, url.split('/devtools/', 1)[-1])
+            else:
+                self._http_reply(conn, url)
+
+        except (OSError, ValueError, KeyError, IndexError):
+            pass
+        finally:
+            conn.close()
+
+    def _http_reply(self, conn, url):
+        """回复/json系列http请求，未知路径回复404
+        :param conn: socket连接
+        :param url: 请求的路径
+        :return: None
+        """
+        path = url.split('?', 1)[0].rstrip('/')
+        if path in ('/json', '/json/list'):
+            with self._lock:
+                tabs = list(self._tabs)
+            _send_http(conn, 200, [self._tab_info(i) for i in tabs])
+
+        elif path == '/json/version':
+            browser = [i for i in list(self._requests) + list(self._on_connect) if i.startswith('browser/')]
+            browser = browser[0] if browser else 'browser/replay'
+            _send_http(conn, 200, {'Browser': 'DrissionPage/ReplayServer',
+                                   'webSocketDebuggerUrl': f'ws://{self.address}/devtools/{browser}'})
+
+        elif path == '/json/new':
+            _send_http(conn, 200, self._tab_info(self._new_tab()))
+
+        elif path.startswith('/json/activate/'):
+            target_id = path[15:]
+            with self._lock:
+                found = target_id in self._tabs
+                if found:
+                    self._tabs.remove(target_id)
+                    self._tabs.insert(0, target_id)
+            if found:
+                _send_http(conn, 200, 'Target activated')
+            else:
+                _send_http(conn, 404, f'No such target id: {target_id}')
+
+        elif path.startswith('/json/close/'):
+            target_id = path[12:]
+            if self._close_tab(target_id):
+                _send_http(conn, 200, 'Target is closing')
+            else:
+                _send_http(conn, 404, f'No such target id: {target_id}')
+
+        else:
+            _send_http(conn, 404, f'Unknown command: {path}')
+
+    def _tab_info(self, target_id):
+        """返回/json接口中一个标签页的信息
+        :param target_id: 标签页id
+        :return: 信息dict
+        """
+        return {'id': target_id, 'type': 'page', 'url': 'about:blank', 'title': '',
+                'webSocketDebuggerUrl': f'ws://{self.address}/devtools/page/{target_id}'}
+
+    def _replay(self, conn, target):
+        """在一个websocket连接上回放记录
+        :param conn: socket连接
+        :param target: 连接的target，如'page/xxx'
+        :return: None
+        """
+        for event in self._on_connect.get(target, ()):
+            _send_frame(conn, dumps(event))
+
+        while not self._stopped:
+            opcode, payload = _recv_frame(conn)
+            if opcode == 8:  # close
+                _send_frame(conn, payload, 8)
+                return
+            if opcode == 9:  # ping
+                _send_frame(conn, payload, 10)
+                continue
+            if opcode != 1:
+                continue
+
+            message = loads(payload)
+            req = self._match(target, message)
+            if req is None:
+                reply = {'id': message['id'], 'error': {'code': -32000, 'message': 'not found in recording'}}
+                if 'sessionId' in message:
+                    reply['sessionId'] = message['sessionId']
+                _send_frame(conn, dumps(reply))
+                continue
+
+            if self.delay and req[4] > 0:
+                sleep(req[4])
+            reply = dict(req[2], id=message['id'])
+            _send_frame(conn, dumps(reply))
+            self._on_reply(message, reply)
+            for event in req[3]:
+                _send_frame(conn, dumps(event))
+
+    def _match(self, target, message):
+        """找出与请求对应的记录，优先匹配方法和参数都相同的，其次只匹配方法
+        :param target: 连接的target
+        :param message: 收到的请求
+        :return: 记录的请求，没有时返回None
+        """
+        params = message.get('params', {})
+        with self._lock:
+            candidate = None
+            for req in self._requests.get(target, ()):
+                if req[5] or req[2] is None or req[0] != message['method']:
+                    continue
+                if req[1] == params:
+                    candidate = req
+                    break
+                if candidate is None:
+                    candidate = req
+
+            if candidate is not None:
+                candidate[5] = True
+            return candidate
+
+
+def _send_http(conn, status, body):
+    """回复一个http请求
+    :param conn: socket连接
+    :param status: 状态码
+    :param body: 回复内容，str作为文本，其它转换为json
+    :return: None
+    """
+    if isinstance(body, str):
+        content_type = 'text/plain'
+    else:
+        content_type = 'application/json'
+        body = dumps(body)
+    body = body.encode()
+    reason = 'OK' if status == 200 else 'Not Found'
+    conn.sendall(f'HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}; charset=UTF-8\r\n'
+                 f'Connection: close\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+
+
+def _recv_frame(conn):
+    """从socket读取一个完整的websocket消息
+    :param conn: socket连接
+    :return: (opcode, 消息)
+    """
+    payload = b''
+    opcode = None
+    while True:
+        b1, b2 = _recv_exact(conn, 2)
+        opcode = opcode or b1 & 0x0f
+        length = b2 & 0x7f
+        if length == 126:
+            length = int.from_bytes(_recv_exact(conn, 2), 'big')
+        elif length == 127:
+            length = int.from_bytes(_recv_exact(conn, 8), 'big')
+
+        mask = _recv_exact(conn, 4) if b2 & 0x80 else None
+        data = _recv_exact(conn, length)
+        if mask:
+            key = int.from_bytes((mask * (length // 4 + 1))[:length], 'big')
+            data = (int.from_bytes(data, 'big') ^ key).to_bytes(length, 'big')
+        payload += data
+
+        if b1 & 0x80:
+            return opcode, payload.decode() if opcode == 1 else payload
+
+
+def _recv_exact(conn, size):
+    """从socket读取指定长度的数据
+    :param conn: socket连接
+    :param size: 长度
+    :return: 读取到的bytes
+    """
+    data = b''
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise OSError('连接已断开。')
+        data += chunk
+    return data
+
+
+def _send_frame(conn, payload, opcode=1):
+    """向socket发送一个不分片、不加掩码的websocket消息
+    :param conn: socket连接
+    :param payload: 消息内容
+    :param opcode: 消息类型，1为文本
+    :return: None
+    """
+    if isinstance(payload, str):
+        payload = payload.encode()
+    length = len(payload)
+    if length < 126:
+        header = bytes((0x80 | opcode, length))
+    elif length < 65536:
+        header = bytes((0x80 | opcode, 126)) + length.to_bytes(2, 'big')
+    else:
+        header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, 'big')
+    conn.sendall(header + payload)
@@ -0,0 +1,92 @@
+# -*- coding:utf-8 -*-
+"""
+@Author  :   g1879
+@Contact :   g1879@qq.com
+"""
+from io import TextIOWrapper
+from pathlib import Path
+from socket import socket
+from threading import Lock
+from typing import Union, Tuple, List, Any
+
+from .chromium_driver import ChromiumDriver
+
+
+class CdpRecorder(object):
+
+    def __init__(self, path: Union[str, Path]):
+        self.path: Union[str, Path] = ...
+        self._file: Union[TextIOWrapper, None] = ...
+        self._lock: Lock = ...
+        self._start_time: float = ...
+
+    def start(self, driver: ChromiumDriver = None) -> CdpRecorder: ...
+
+    def stop(self, driver: ChromiumDriver = None) -> None: ...
+
+    def record(self, direction: str, url: str, message_json: str) -> None: ...
+
+    def __enter__(self) -> CdpRecorder: ...
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None: ...
+
+
+class ReplayServer(object):
+
+    def __init__(self, path: Union[str, Path], address: str = '127.0.0.1:0', delay: bool = False):
+        self.delay: bool = ...
+        self._host: str = ...
+        self._port: int = ...
+        self._socket: Union[socket, None] = ...
+        self._stopped: bool = ...
+        self._lock: Lock = ...
+        self._requests: dict = ...
+        self._on_connect: dict = ...
+        self._hidden: List[str] = ...
+        self._tabs: List[str] = ...
+        self._new_count: int = ...
+
+    @property
+    def address(self) -> str: ...
+
+    def _load(self, path: Union[str, Path]) -> None: ...
+
+    def _created_targets(self) -> List[str]: ...
+
+    def _new_tab(self, target_id: str = None) -> str: ...
+
+    def _close_tab(self, target_id: str) -> bool: ...
+
+    def _on_reply(self, message: dict, reply: dict) -> None: ...
+
+    def start(self) -> str: ...
+
+    def stop(self) -> None: ...
+
+    def __enter__(self) -> ReplayServer: ...
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None: ...
+
+    def _accept_loop(self) -> None: ...
+
+    def _handle_conn(self, conn: socket) -> None: ...
+
+    def _http_reply(self, conn: socket, url: str) -> None: ...
+
+    def _tab_info(self, target_id: str) -> dict: ...
+
+    def _replay(self, conn: socket, target: str) -> None: ...
+
+    def _match(self, target: str, message: dict) -> Union[list, None]: ...
+
+
+def _send_http(conn: socket, status: int, body: Any) -> None: ...
+
+
+def _recv_frame(conn: socket) -> Tuple[int, Union[str, bytes]]: ...
+
+
+def _recv_exact(conn: socket, size: int) -> bytes: ...
+
+
+def _send_frame(conn: socket, payload: Union[str, bytes], opcode: int = 1) -> None: ...
@@ -3,10 +3,12 @@
 @Author  :   g1879
 @Contact :   g1879@qq.com
 """
-from base64 import b64decode
-from json import loads, JSONDecodeError
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from json import loads, dumps, JSONDecodeError
 from os import sep
 from pathlib import Path
+from threading import Lock
 from time import perf_counter, sleep, time
 from warnings import warn
 
@@ -14,13 +16,16 @@ from requests import Session
 
 from .base import BasePage
 from .chromium_driver import ChromiumDriver
-from .chromium_element import ChromiumScroll, ChromiumElement, run_js, make_chromium_ele, ChromiumElementWaiter
+from .chromium_element import ChromiumScroll, ChromiumElement, run_js, make_chromium_ele, make_chromium_eles, \
+    ChromiumElementWaiter, snapshot_eles, wait_in_page, find_any, extract_in_chromium, ChromiumElementList, \
+    find_by_deep, make_js_for_find_all, call_helper, HELPER_JS, DEEP_QUERY_JS
+from .commons.codec import b64decode_to_file, b64decode_field
 from .commons.constants import HANDLE_ALERT_METHOD, ERROR, NoneElement
 from .commons.locator import get_loc
 from .commons.tools import get_usable_path, clean_folder
 from .commons.web import cookies_to_tuple
 from .errors import ContextLossError, ElementLossError, AlertExistsError, CallMethodError, TabClosedError, \
-    NoRectError, BrowserConnectError
+    NoRectError, BrowserConnectError, JavaScriptError
 from .session_element import make_session_ele
 
 
@@ -40,6 +45,11 @@ class ChromiumBase(BasePage):
         self._tab_obj = None
         self._set = None
         self._screencast = None
+        self._node_cache = None
+        self._object_group = None
+        self._helper_id = None
+        self._script_cache = None
+        self._remote_frames = {}  # {frame id: ChromiumFrame}，eles_in_all_frames()连接过的跨进程frame
 
         self._set_start_options(address, None)
         self._set_runtime_settings()
@@ -85,23 +95,45 @@ class ChromiumBase(BasePage):
         self._wait = None
         self._scroll = None
 
-    def _driver_init(self, tab_id):
+    def _driver_init(self, tab_id, parked=None):
         """新建页面、页面刷新、切换标签页后要进行的cdp参数初始化
         :param tab_id: 要跳转到的标签页id
+        :param parked: 切换标签页时保留的(driver, 函数库脚本id, 编译缓存)，传入时复用该driver，不重新连接
         :return: None
         """
         self._is_loading = True
-        self._tab_obj = ChromiumDriver(tab_id=tab_id, tab_type='page', address=self.address)
+        driver, helper_id, script_cache = parked or (None, None, None)
+        browser_driver = self._multiplex_driver
+        if driver is not None:
+            self._tab_obj = driver
+        elif browser_driver:
+            self._tab_obj = browser_driver.attach(tab_id)
+        else:
+            self._tab_obj = ChromiumDriver(tab_id=tab_id, tab_type='page', address=self.address)
 
         self._tab_obj.start()
-        self._tab_obj.DOM.enable()
-        self._tab_obj.Page.enable()
+        # 页面的加载状态和document刷新依赖下面绑定的Page、DOM事件，页面对象始终需要这两个domain
+        # 复用的driver已启用过，不会重复调用
+        self._tab_obj.domains.enable('DOM', 'page')
+        self._tab_obj.domains.enable('Page', 'page')
 
         self._tab_obj.Page.frameStoppedLoading = self._onFrameStoppedLoading
         self._tab_obj.Page.frameStartedLoading = self._onFrameStartedLoading
         self._tab_obj.DOM.documentUpdated = self._onDocumentUpdated
         self._tab_obj.Page.loadEventFired = self._onLoadEventFired
         self._tab_obj.Page.frameNavigated = self._onFrameNavigated
+        if self._node_cache is not None:  # 切换了driver，重新绑定
+            self._node_cache.start()
+        if self._helper_id is not None:  # 注入的脚本只对原来的标签页有效，新连接的要重新注入
+            self._helper_id = helper_id or self._tab_obj.call_method('Page.addScriptToEvaluateOnNewDocument',
+                                                                     source=HELPER_JS)['identifier']
+        elif helper_id is not None:  # 离开该标签页期间关闭了函数库
+            self._tab_obj.call_method('Page.removeScriptToEvaluateOnNewDocument', identifier=helper_id)
+        if self._script_cache is not None:  # 编译结果只对原来的标签页有效
+            self._script_cache = script_cache if script_cache is not None else {}
+            self._tab_obj.domains.enable('Runtime', 'script_cache')
+        elif script_cache is not None:
+            self._tab_obj.domains.disable('Runtime', 'script_cache')
 
     def _get_document(self):
         """刷新cdp使用的document数据"""
@@ -220,6 +252,7 @@ class ChromiumBase(BasePage):
 
             self.driver.Page.fileChooserOpened = None
             self.run_cdp('Page.setInterceptFileChooserDialog', enabled=False)
+            self.driver.domains.disable('Page', 'file_chooser')
             self._upload_list = None
 
     def __call__(self, loc_or_str, timeout=None):
@@ -231,6 +264,11 @@ class ChromiumBase(BasePage):
         """
         return self.ele(loc_or_str, timeout)
 
+    @property
+    def _multiplex_driver(self):
+        """返回用于复用连接的浏览器级driver，不复用时返回None"""
+        return None
+
     @property
     def driver(self):
         """返回用于控制浏览器的ChromiumDriver对象"""
@@ -344,6 +382,25 @@ class ChromiumBase(BasePage):
             raise AlertExistsError
 
         r = self.driver.call_method(cmd, **cmd_args)
+        return self._check_cdp_result(r)
+
+    def run_cdp_many(self, cmds, timeout=None):
+        """一次性发送多条互不依赖的Chrome DevTools Protocol语句，再统一接收结果
+        例：page.run_cdp_many([('DOM.describeNode', {'nodeId': 1}), ('DOM.describeNode', {'nodeId': 2})])
+        :param cmds: 由(协议项目, 参数dict)组成的列表
+        :param timeout: 等待全部结果的超时时间，为None时一直等待
+        :return: 执行结果组成的列表，顺序与cmds一致
+        """
+        if self.driver.has_alert and any(i[0] != HANDLE_ALERT_METHOD for i in cmds):
+            raise AlertExistsError
+
+        return [self._check_cdp_result(r) for r in self.driver.call_many(cmds, timeout=timeout)]
+
+    def _check_cdp_result(self, r):
+        """检查cdp执行结果，有错误时抛出对应异常
+        :param r: driver返回的结果
+        :return: 执行的结果
+        """
         if ERROR not in r:
             return r
 
@@ -373,24 +430,26 @@ class ChromiumBase(BasePage):
         self.wait.load_complete()
         return self.run_cdp(cmd, **cmd_args)
 
-    def run_js(self, script, *args, as_expr=False):
+    def run_js(self, script, *args, as_expr=False, by_value=False):
         """运行javascript代码
         :param script: js文本
         :param args: 参数，按顺序在js文本中对应argument[0]、argument[1]...
         :param as_expr: 是否作为表达式运行，为True时args无效
+        :param by_value: 是否按值返回结果，为True时结果转换为json返回，其中的节点再用一次调用批量获取
         :return: 运行的结果
         """
-        return run_js(self, script, as_expr, self.timeouts.script, args)
+        return run_js(self, script, as_expr, self.timeouts.script, args, by_value)
 
-    def run_js_loaded(self, script, *args, as_expr=False):
+    def run_js_loaded(self, script, *args, as_expr=False, by_value=False):
         """运行javascript代码，执行前等待页面加载完毕
         :param script: js文本
         :param args: 参数，按顺序在js文本中对应argument[0]、argument[1]...
         :param as_expr: 是否作为表达式运行，为True时args无效
+        :param by_value: 是否按值返回结果，为True时结果转换为json返回，其中的节点再用一次调用批量获取
         :return: 运行的结果
         """
         self.wait.load_complete()
-        return run_js(self, script, as_expr, self.timeouts.script, args)
+        return run_js(self, script, as_expr, self.timeouts.script, args, by_value)
 
     def run_async_js(self, script, *args, as_expr=False):
         """以异步方式执行js代码
@@ -442,9 +501,42 @@ class ChromiumBase(BasePage):
         """获取所有符合条件的元素对象
         :param loc_or_str: 定位符或元素对象
         :param timeout: 查找超时时间
-        :return: ChromiumElement对象组成的列表
+        :return: ChromiumElement对象组成的ChromiumElementList
         """
-        return self._ele(loc_or_str, timeout=timeout, single=False)
+        return ChromiumElementList(self._ele(loc_or_str, timeout=timeout, single=False))
+
+    def ele_any(self, locs, timeout=None, raise_err=None):
+        """同时查找多个定位符，所有定位符在一次js调用中检查，都没有时在页面中等待，返回最先出现的一个
+        例：i, ele = page.ele_any(('#results', '.no-result', 'xpath://iframe[@title="captcha"]'))
+        :param locs: 定位符组成的列表或元组，同时出现时以排在前面的为准
+        :param timeout: 查找超时时间，默认与页面等待时间一致
+        :param raise_err: 找不到元素是是否抛出异常，为None时根据全局设置
+        :return: (定位符在locs中的序号, 元素对象或属性、文本)，都找不到时返回(None, NoneElement)
+        """
+        self.wait.load_complete()
+        return find_any(self, locs, timeout, raise_err)
+
+    def extract(self, schema):
+        """按schema在页面中获取数据，整个schema编译成一个js函数，用一次cdp调用完成
+        例：data = page.extract({'title': 't:h1',
+                                 'items': {'rows': 'css:li.item',
+                                           'fields': {'name': '.name',
+                                                      'url': {'loc': 't:a', 'attr': 'link'}}}})
+        :param schema: {字段名: 规则}格式的dict，规则格式见parse_schema()
+        :return: 与schema结构对应的dict
+        """
+        self.wait.load_complete()
+        return extract_in_chromium(self, schema)
+
+    def snapshots(self, loc_or_eles, fields=None, timeout=None):
+        """获取多个元素的数据，所有元素的数据用一次js调用获取
+        :param loc_or_eles: 定位符，或ChromiumElement组成的列表
+        :param fields: 要获取的项组成的列表，可选项见SNAPSHOT_FIELDS，为None时获取全部
+        :param timeout: 查找元素超时时间
+        :return: ElementSnapshot对象组成的列表
+        """
+        eles = loc_or_eles if isinstance(loc_or_eles, list) else self.eles(loc_or_eles, timeout=timeout)
+        return snapshot_eles(eles, fields)
 
     def s_ele(self, loc_or_ele=None):
         """查找第一个符合条件的元素以SessionElement形式返回，处理复杂页面时效率很高
@@ -470,22 +562,25 @@ class ChromiumBase(BasePage):
         :return: ChromiumElement对象或元素对象组成的列表
         """
         if isinstance(loc_or_ele, (str, tuple)):
-            loc = get_loc(loc_or_ele)[1]
+            loc_tuple = get_loc(loc_or_ele)
+            loc = loc_tuple[1]
         elif isinstance(loc_or_ele, ChromiumElement) or str(type(loc_or_ele)).endswith(".ChromiumFrame'>"):
             return loc_or_ele
         else:
             raise ValueError('loc_or_str参数只能是tuple、str、ChromiumElement类型。')
 
-        ok = False
-        nodeIds = None
-
         timeout = timeout if timeout is not None else self.timeout
-        end_time = perf_counter() + timeout
-
-        search_result = self.run_cdp_loaded('DOM.performSearch', query=loc, includeUserAgentShadowDOM=True)
-        count = search_result['resultCount']
+        if loc_tuple[0] == 'deep css':  # DOM.performSearch不能穿透shadow root，在页面中查找
+            self.wait.load_complete()
+            return find_by_deep(self, loc, single, timeout)
 
+        end_time = perf_counter() + timeout
         while True:
+            ok = False
+            nodeIds = None
+            search_result = self.run_cdp_loaded('DOM.performSearch', query=loc, includeUserAgentShadowDOM=True)
+            count = search_result['resultCount']
+
             if count > 0:
                 count = 1 if single else count
                 try:
@@ -497,21 +592,88 @@ class ChromiumBase(BasePage):
                 except Exception:
                     sleep(.01)
 
+            self._discard_search(search_result['searchId'])
             if ok:
                 try:
                     if single:
                         return make_chromium_ele(self, node_id=nodeIds['nodeIds'][0])
-                    else:
-                        return [make_chromium_ele(self, node_id=i) for i in nodeIds['nodeIds']]
+                    else:  # 批量生成，1次往返获取全部tag
+                        return make_chromium_eles(self, node_ids=nodeIds['nodeIds'])
 
                 except ElementLossError:
-                    ok = False
-
-            search_result = self.run_cdp_loaded('DOM.performSearch', query=loc, includeUserAgentShadowDOM=True)
-            count = search_result['resultCount']
+                    pass
 
+            # 等待结束后总会再搜索一次，所以超时判断放在等待之前
             if perf_counter() >= end_time:
                 return NoneElement() if single else []
+            if not count:  # 在页面中等待元素出现，再重新搜索
+                self._wait_loc(loc_tuple, end_time - perf_counter())
+
+    def _wait_loc(self, loc, timeout):
+        """在页面中用MutationObserver等待定位符能找到元素，只调用一次cdp，不在python中轮询
+        DOM.performSearch还会搜索同域iframe和shadow root，监听不到其中的变化，所以同时定时在其中查找
+        :param loc: get_loc()返回的定位元组
+        :param timeout: 超时时间
+        :return: 是否找到
+        """
+        if loc[0] == 'xpath':
+            find = f'd.evaluate({dumps(loc[1])}, d, null, 9, null).singleNodeValue'
+        else:
+            find = f'(deep ? deepQuery(d, {dumps(loc[1])}, false) : d.querySelector({dumps(loc[1])}))'
+        # deep为false时是DOM变化触发的检查，只查找文档本身
+        js = f'''function(deep){{{DEEP_QUERY_JS}
+var docs = [document];
+for (var i = 0; i < docs.length; i++) {{
+    var d = docs[i];
+    try {{if ({find}) {{return true;}}}} catch(e) {{return true;}}
+    if (!deep) {{return null;}}
+    var frames = d.querySelectorAll('iframe,frame');
+    for (var j = 0; j < frames.length; j++) {{
+        try {{if (frames[j].contentDocument) {{docs.push(frames[j].contentDocument);}}}} catch(e) {{}}
+    }}
+}}
+return null;}}'''  # 语句错误时交给搜索处理
+        try:
+            r = wait_in_page(self, self._root_id, js, timeout, .2, by_value=True)
+            return r['result'].get('value', None) is True
+        except Exception:  # 等待期间页面刷新等情况
+            sleep(.05)
+            return False
+
+    def _discard_search(self, search_id):
+        """释放DOM.performSearch的搜索结果，不等待返回
+        :param search_id: 搜索id
+        :return: None
+        """
+        self.driver.call_method_async('DOM.discardSearchResults', searchId=search_id)
+
+    def _release_object(self, obj_id):
+        """释放一个js对象，不等待返回
+        :param obj_id: js中的object id
+        :return: None
+        """
+        self.driver.call_method_async('Runtime.releaseObject', objectId=obj_id)
+
+    def _run_helper(self, name, *args):
+        """以页面document为第一个参数调用内置js函数库中的函数
+        :param name: 函数名
+        :param args: 其余参数
+        :return: 函数返回值
+        """
+        r = call_helper(self, self._root_id, name, args)
+        if 'exceptionDetails' in r:
+            raise JavaScriptError(f'\njavascript运行错误：\n{r["exceptionDetails"]}')
+        return r['result'].get('value')
+
+    def scope(self, group=None):
+        """返回一个上下文管理器，with块内获取的元素和js对象都放在同一个objectGroup中，退出时一次性释放
+        块内获取的元素在退出后不能再使用，适合长时间运行的页面中反复查找、读取数据
+        例：with page.scope():
+                texts = [i.text for i in page.eles('tag:a')]
+        :param group: objectGroup名称，为None时自动生成
+        :return: ObjectScope对象
+        """
+        return ObjectScope(self, group)
 
     def refresh(self, ignore_cache=False):
         """刷新当前页面
@@ -604,6 +766,109 @@ class ChromiumBase(BasePage):
         else:
             raise TypeError('必须传入定位符、iframe序号、ChromiumFrame对象其中之一。')
 
+    def eles_in_all_frames(self, loc):
+        """在页面及其中所有frame里查找元素，不需逐个获取ChromiumFrame对象
+        同进程的frame用几批并发的cdp命令一起查找，往返次数不随frame数量增长；跨进程的frame在线程中同时连接、查找
+        :param loc: 定位符
+        :return: (frame id, 元素对象或属性、文本)组成的列表，主文档的结果在前
+        """
+        loc = get_loc(loc)
+        self.wait.load_complete()
+        tree, targets = self.run_cdp_many([('Page.getFrameTree', {}), ('Target.getTargets', {})])
+        tree_ids = _frame_ids(tree['frameTree'])
+        main_id = tree_ids[0]
+        frame_ids = tree_ids[1:]
+        # Target.getTargets返回整个浏览器的iframe target，只保留父frame在本页面中的；
+        # 旧版浏览器没有parentFrameId，不属于本页面的由下面的DOM.getFrameOwner排除
+        frame_ids.extend(i['targetId'] for i in targets['targetInfos']
+                         if i['type'] == 'iframe' and i['targetId'] not in frame_ids
+                         and i.get('parentFrameId', main_id) in tree_ids)
+
+        # 获取各frame的iframe元素，不属于本页面的跨进程frame会返回错误，跳过
+        owners = self.driver.call_many([('DOM.getFrameOwner', {'frameId': i}) for i in frame_ids])
+        owners = [(f, o['backendNodeId']) for f, o in zip(frame_ids, owners) if ERROR not in o]
+        nodes = self.driver.call_many([('DOM.describeNode', {'backendNodeId': b}) for _, b in owners])
+        docs = []
+        remotes = []
+        for (frame_id, b_id), node in zip(owners, nodes):
+            if ERROR in node:
+                continue
+            elif 'contentDocument' in node['node']:
+                docs.append((frame_id, node['node']['contentDocument']['backendNodeId']))
+            else:
+                remotes.append((frame_id, b_id))
+
+        remote_ids = [i[0] for i in remotes]
+        for frame_id in [i for i in self._remote_frames if i not in remote_ids]:  # 已不存在的frame，断开连接
+            self._remote_frames.pop(frame_id)._tab_obj.stop()
+
+        # 线程只在有跨进程frame时才会创建，线程中不读写_remote_frames，结果在本线程中合并
+        with ThreadPoolExecutor(max(len(remotes), 1)) as pool:
+            futures = [(f, pool.submit(self._eles_in_remote_frame, self._remote_frames.get(f, None), b, loc))
+                       for f, b in remotes]
+
+            objs = self.driver.call_many([('DOM.resolveNode', {'backendNodeId': b}) for _, b in docs])
+            contexts = [(main_id, self._root_id)] + [(f, o['object']['objectId'])
+                                                    for (f, _), o in zip(docs, objs) if ERROR not in o]
+            js = make_js_for_find_all(loc)
+            lists = self.driver.call_many([('Runtime.callFunctionOn', {'functionDeclaration': js, 'objectId': o})
+                                           for _, o in contexts])
+            found = []
+            for (frame_id, _), r in zip(contexts, lists):
+                if ERROR in r:
+                    continue
+                elif 'exceptionDetails' in r:
+                    raise SyntaxError(f'查询语句错误：\n{r}')
+                elif r['result'].get('description', None) == 'Array(0)':
+                    self._release_object(r['result']['objectId'])
+                else:
+                    found.append((frame_id, r['result']['objectId']))
+
+            cmds = []
+            for _, obj_id in found:
+                cmds.extend((('Runtime.getProperties', {'objectId': obj_id, 'ownProperties': True}),
+                             ('Runtime.releaseObject', {'objectId': obj_id})))
+            results = []
+            for (frame_id, _), props in zip(found, self.driver.call_many(cmds)[::2]):
+                if ERROR in props:
+                    continue
+                for i in props['result']:
+                    if not i['name'].isdigit():  # 跳过数组的length等属性
+                        continue
+                    value = i['value']
+                    if value['type'] == 'object' and value.get('subtype', None) == 'node':
+                        results.append((frame_id, make_chromium_ele(self, obj_id=value['objectId'],
+                                                                    class_name=value.get('className', None))))
+                    else:
+                        results.append((frame_id, value.get('value', None)))
+
+            for frame_id, future in futures:
+                frame, found = future.result()
+                if frame is None:
+                    self._remote_frames.pop(frame_id, None)
+                else:
+                    self._remote_frames[frame_id] = frame
+                results.extend(found)
+        return results
+
+    def _eles_in_remote_frame(self, frame, backend_id, loc):
+        """在一个跨进程的frame及其下级frame中查找元素，frame的连接由调用者保留下来，下次查找时复用
+        :param frame: 上次查找时连接该frame的ChromiumFrame对象，没有则为None
+        :param backend_id: iframe元素的backend id
+        :param loc: 定位元组
+        :return: (连接该frame的ChromiumFrame对象, (frame id, 元素对象或属性、文本)组成的列表)，未能连接时前者为None
+        """
+        from .chromium_frame import ChromiumFrame
+        try:
+            if frame is not None and (frame._backend_id != backend_id or frame._tab_obj._stopped.is_set()):
+                frame._tab_obj.stop()  # iframe元素已替换或连接已断开
+                frame = None
+            if frame is None:
+                frame = ChromiumFrame(self, ChromiumElement(self, backend_id=backend_id))
+            return frame, frame.eles_in_all_frames(loc)
+        except (ElementLossError, ContextLossError, TabClosedError, CallMethodError):  # 查找期间frame被移除
+            return frame, []
+
     def get_session_storage(self, item=None):
         """获取sessionStorage信息，不设置item则获取全部
         :param item: 要获取的项，不设置则返回全部
@@ -650,7 +915,7 @@ class ChromiumBase(BasePage):
         if full_page:
             vp = {'x': 0, 'y': 0, 'width': width, 'height': height, 'scale': 1}
             png = self.run_cdp_loaded('Page.captureScreenshot', format=pic_type,
-                                      captureBeyondViewport=True, clip=vp)['data']
+                                      captureBeyondViewport=True, clip=vp, _lazy=True)['data']
         else:
             if left_top and right_bottom:
                 x, y = left_top
@@ -658,21 +923,61 @@ class ChromiumBase(BasePage):
                 h = right_bottom[1] - y
                 vp = {'x': x, 'y': y, 'width': w, 'height': h, 'scale': 1}
                 png = self.run_cdp_loaded('Page.captureScreenshot', format=pic_type,
-                                          captureBeyondViewport=False, clip=vp)['data']
+                                          captureBeyondViewport=False, clip=vp, _lazy=True)['data']
             else:
-                png = self.run_cdp_loaded('Page.captureScreenshot', format=pic_type)['data']
+                png = self.run_cdp_loaded('Page.captureScreenshot', format=pic_type, _lazy=True)['data']
 
-        from base64 import b64decode
-        png = b64decode(png)
+        if as_bytes:
+            return b64decode_field(png)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        b64decode_to_file(png, path)
+        return str(path.absolute())
 
+    def get_pdf(self, path=None, as_bytes=False, chunk_size=1024 * 1024, **kwargs):
+        """把页面保存为pdf，以流方式分块读取并写入文件，内存占用不随页面大小增长
+        :param path: 完整路径，为None时保存到当前文件夹，以页面title为文件名
+        :param as_bytes: 是否以字节形式返回，为True时path参数无效
+        :param chunk_size: 每次读取的字节数
+        :param kwargs: Page.printToPDF的其它参数，如landscape、printBackground、scale、pageRanges等
+        :return: 文件完整路径或字节文本
+        """
         if as_bytes:
-            return png
+            return b''.join(self.iter_pdf(chunk_size, **kwargs))
 
+        path = get_usable_path(path or f'{self.title}.pdf')
         path.parent.mkdir(parents=True, exist_ok=True)
         with open(path, 'wb') as f:
-            f.write(png)
+            for chunk in self.iter_pdf(chunk_size, **kwargs):
+                f.write(chunk)
         return str(path.absolute())
 
+    def iter_pdf(self, chunk_size=1024 * 1024, **kwargs):
+        """以生成器方式分块返回页面的pdf数据
+        :param chunk_size: 每次读取的字节数
+        :param kwargs: Page.printToPDF的其它参数
+        :return: 生成器，每次返回一块bytes
+        """
+        kwargs['transferMode'] = 'ReturnAsStream'
+        stream = self.run_cdp_loaded('Page.printToPDF', **kwargs)['stream']
+        return self._read_stream(stream, chunk_size)
+
+    def _read_stream(self, handle, chunk_size=1024 * 1024):
+        """用IO.read分块读取cdp数据流，读完后关闭
+        :param handle: 数据流句柄
+        :param chunk_size: 每次读取的字节数
+        :return: 生成器，每次返回一块bytes
+        """
+        try:
+            while True:
+                r = self.run_cdp('IO.read', handle=handle, size=chunk_size, _lazy=True)
+                if r.get('data'):
+                    yield b64decode_field(r['data']) if r.get('base64Encoded') else str(r['data']).encode()
+                if r.get('eof', True):
+                    break
+        finally:
+            self.run_cdp('IO.close', handle=handle)
+
     def clear_cache(self, session_storage=True, local_storage=True, cache=True, cookies=True):
         """清除缓存，可选要清除的项
         :param session_storage: 是否清除sessionStorage
@@ -813,6 +1118,17 @@ class ChromiumBase(BasePage):
         return self.set.load_strategy
 
 
+def _frame_ids(frame_tree):
+    """按深度优先顺序返回frame树中所有frame的id
+    :param frame_tree: Page.getFrameTree返回的frameTree
+    :return: frame id组成的列表，第一个是主frame
+    """
+    ids = [frame_tree['frame']['id']]
+    for i in frame_tree.get('childFrames', ()):
+        ids.extend(_frame_ids(i))
+    return ids
+
+
 class Screencast(object):
     def __init__(self, page):
         self._page = page
@@ -829,6 +1145,7 @@ class Screencast(object):
         if self._path is None:
             raise ValueError('save_path必须设置。')
         clean_folder(self._path)
+        self._page.driver.domains.enable('Page', 'screencast')
         self._page.driver.Page.screencastFrame = self._onScreencastFrame
         self._page.run_cdp('Page.startScreencast', everyNthFrame=1, quality=self._quality)
 
@@ -840,6 +1157,7 @@ class Screencast(object):
         """
         self._page.driver.Page.screencastFrame = None
         self._page.run_cdp('Page.stopScreencast')
+        self._page.driver.domains.disable('Page', 'screencast')
         if not to_mp4:
             return str(Path(self._path).absolute())
 
@@ -890,14 +1208,193 @@ class Screencast(object):
 
     def _onScreencastFrame(self, **kwargs):
         with open(f'{self._path}\\{kwargs["metadata"]["timestamp"]}.jpg', 'wb') as f:
-            f.write(b64decode(kwargs['data']))
+            f.write(b64decode_field(kwargs['data']))
         self._page.run_cdp('Page.screencastFrameAck', sessionId=kwargs['sessionId'])
 
 
+class ObjectScope(object):
+    """page.scope()返回的上下文管理器，用于批量释放js对象"""
+    _count = count()
+
+    def __init__(self, page, group=None):
+        """
+        :param page: 页面对象
+        :param group: objectGroup名称，为None时自动生成
+        """
+        self._page = page
+        self.group = group or f'drission-scope-{next(self._count)}'
+        self._last_group = None
+
+    def __enter__(self):
+        self._last_group = self._page._object_group
+        self._page._object_group = self.group
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._page._object_group = self._last_group
+        self.release()
+
+    def release(self):
+        """释放objectGroup中的所有对象
+        :return: None
+        """
+        try:
+            self._page.run_cdp('Runtime.releaseObjectGroup', objectGroup=self.group)
+        except (ContextLossError, TabClosedError):
+            pass
+
+
+class NodeCache(object):
+    """缓存元素的attribute、tag和子节点数，根据DOM事件使相应节点的缓存失效，节点未变化时读取不需要访问浏览器"""
+    EVENTS = ('DOM.attributeModified', 'DOM.attributeRemoved', 'DOM.inlineStyleInvalidated',
+              'DOM.childNodeInserted', 'DOM.childNodeRemoved', 'DOM.childNodeCountUpdated', 'DOM.documentUpdated')
+
+    def __init__(self, page):
+        """
+        :param page: 所属页面对象
+        """
+        self._page = page
+        self._driver = None
+        self._subscribers = []
+        self._lock = Lock()
+        self._nodes = {}  # {node_id: {'tag': str, 'attrs': dict, 'child_count': int}}
+        self._pending = {}  # {node_id: 获取期间是否未收到该节点的事件}
+
+    def start(self):
+        """绑定到页面当前的driver，开始接收DOM事件
+        :return: None
+        """
+        if self._driver is self._page.driver:
+            return
+        self.stop()
+        self._driver = self._page.driver
+        self._driver.domains.enable('DOM', 'node_cache')
+        self._subscribers = [self._driver.subscribe(i, getattr(self, f'_on_{i[4:]}')) for i in self.EVENTS]
+
+    def stop(self):
+        """停止接收事件并清空缓存
+        :return: None
+        """
+        if self._driver is not None:
+            for i in self._subscribers:
+                self._driver.unsubscribe(i)
+            self._driver.domains.disable('DOM', 'node_cache')
+        self._driver = None
+        self._subscribers = []
+        self.clear()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._nodes.clear()
+            for i in self._pending:
+                self._pending[i] = False
+
+    def get(self, ele):
+        """返回元素的缓存信息，没有缓存时向浏览器获取
+        :param ele: ChromiumElement对象
+        :return: {'tag': str, 'attrs': dict, 'child_count': int}，不要修改其内容
+        """
+        node_id = ele.ids.node_id  # 浏览器只发送已获取node id的节点的事件
+        record = self._nodes.get(node_id, None)
+        if record is not None:
+            return record
+
+        with self._lock:
+            self._pending[node_id] = True
+        try:
+            node = self._page.run_cdp('DOM.describeNode', nodeId=node_id)['node']
+        finally:
+            with self._lock:
+                unchanged = self._pending.pop(node_id, False)
+
+        attrs = node.get('attributes', [])
+        record = {'tag': node['localName'].lower(),
+                  'attrs': {attrs[i]: attrs[i + 1] for i in range(0, len(attrs), 2)},
+                  'child_count': node.get('childNodeCount', 0)}
+        if unchanged:  # 获取期间节点有变化时不缓存，避免存入旧数据
+            with self._lock:
+                self._nodes[node_id] = record
+        return record
+
+    def _invalidate(self, *node_ids):
+        """使节点的缓存失效
+        :param node_ids: 节点的node id
+        :return: None
+        """
+        with self._lock:
+            for i in node_ids:
+                self._nodes.pop(i, None)
+                if i in self._pending:
+                    self._pending[i] = False
+
+    def _on_attributeModified(self, **kwargs):
+        self._invalidate(kwargs['nodeId'])
+
+    def _on_attributeRemoved(self, **kwargs):
+        self._invalidate(kwargs['nodeId'])
+
+    def _on_inlineStyleInvalidated(self, **kwargs):
+        self._invalidate(*kwargs['nodeIds'])
+
+    def _on_childNodeInserted(self, **kwargs):
+        self._invalidate(kwargs['parentNodeId'])
+
+    def _on_childNodeRemoved(self, **kwargs):
+        self._invalidate(kwargs['parentNodeId'], kwargs['nodeId'])
+
+    def _on_childNodeCountUpdated(self, **kwargs):
+        self._invalidate(kwargs['nodeId'])
+
+    def _on_documentUpdated(self, **kwargs):
+        self.clear()
+
+
 class ChromiumBaseSetter(object):
     def __init__(self, page):
         self._page = page
 
+    def node_cache(self, on_off=True):
+        """设置是否缓存元素的attribute、tag和子节点数，开启后DOM未变化时重复读取不访问浏览器
+        :param on_off: bool表示开或关
+        :return: None
+        """
+        if on_off:
+            if self._page._node_cache is None:
+                self._page._node_cache = NodeCache(self._page)
+            self._page._node_cache.start()
+        elif self._page._node_cache is not None:
+            self._page._node_cache.stop()
+            self._page._node_cache = None
+
+    def helper_runtime(self, on_off=True):
+        """设置是否使用内置js函数库，开启后函数库在每个新文档中注入一次，已打开的文档在首次调用时注入，
+        获取文本、元素路径、用xpath查找元素等操作只需发送函数名和参数
+        :param on_off: bool表示开或关
+        :return: None
+        """
+        if on_off:
+            if self._page._helper_id is None:
+                self._page._helper_id = self._page.run_cdp('Page.addScriptToEvaluateOnNewDocument',
+                                                           source=HELPER_JS)['identifier']
+        elif self._page._helper_id is not None:
+            self._page.run_cdp('Page.removeScriptToEvaluateOnNewDocument', identifier=self._page._helper_id)
+            self._page._helper_id = None
+
+    def script_cache(self, on_off=True):
+        """设置是否缓存run_js()中作为表达式运行的js的编译结果，开启后同一表达式只编译一次，页面刷新后自动重新编译
+        开启时会启用Runtime domain，且表达式运行不受脚本超时时间限制
+        :param on_off: bool表示开或关
+        :return: None
+        """
+        if on_off:
+            if self._page._script_cache is None:
+                self._page.driver.domains.enable('Runtime', 'script_cache')
+                self._page._script_cache = {}
+        elif self._page._script_cache is not None:
+            self._page.driver.domains.disable('Runtime', 'script_cache')
+            self._page._script_cache = None
+
     @property
     def load_strategy(self):
         """返回用于设置页面加载策略的对象"""
@@ -970,6 +1467,7 @@ class ChromiumBaseSetter(object):
         :return: None
         """
         if not self._page._upload_list:
+            self._page.driver.domains.enable('Page', 'file_chooser')
             self._page.driver.Page.fileChooserOpened = self._page._onFileChooserOpened
             self._page.run_cdp('Page.setInterceptFileChooserDialog', enabled=True)
 
@@ -1016,6 +1514,14 @@ class ChromiumBaseWaiter(object):
         """
         return ChromiumElementWaiter(self._driver, loc_or_ele).hidden(timeout)
 
+    def any_of(self, *locs, timeout=None):
+        """等待多个定位符中任意一个出现
+        :param locs: 要等待的定位符，同时出现时以排在前面的为准
+        :param timeout: 超时时间，默认读取页面超时时间
+        :return: 最先出现的定位符的序号（可能为0），超时返回None
+        """
+        return self._driver.ele_any(locs, timeout=timeout, raise_err=False)[0]
+
     def load_start(self, timeout=None):
         """等待页面开始加载
         :param timeout: 超时时间，为None时使用页面timeout属性
@@ -4,7 +4,8 @@
 @Contact :   g1879@qq.com
 """
 from pathlib import Path
-from typing import Union, Tuple, List, Any
+from threading import Lock
+from typing import Union, Tuple, List, Any, Iterator, Dict, Optional
 
 from DataRecorder import Recorder
 from requests import Session
@@ -12,10 +13,10 @@ from requests.cookies import RequestsCookieJar
 
 from .commons.constants import NoneElement
 from .base import BasePage
-from .chromium_driver import ChromiumDriver
-from .chromium_element import ChromiumElement, ChromiumScroll
+from .chromium_driver import ChromiumDriver, EventSubscriber
+from .chromium_element import ChromiumElement, ChromiumScroll, ElementSnapshot, ChromiumElementList
 from .chromium_frame import ChromiumFrame
-from .session_element import SessionElement
+from .session_element import SessionElement, SessionElementList
 
 
 class ChromiumBase(BasePage):
@@ -41,12 +42,18 @@ class ChromiumBase(BasePage):
         self._wait: ChromiumBaseWaiter = ...
         self._set: ChromiumBaseSetter = ...
         self._screencast: Screencast = ...
+        self._node_cache: Union[NodeCache, None] = ...
+        self._object_group: Union[str, None] = ...
+        self._helper_id: Union[str, None] = ...
+        self._script_cache: Union[Dict[str, str], None] = ...
+        self._remote_frames: Dict[str, ChromiumFrame] = ...
 
     def _connect_browser(self, tab_id: str = None) -> None: ...
 
     def _chromium_init(self): ...
 
-    def _driver_init(self, tab_id: str) -> None: ...
+    def _driver_init(self, tab_id: str,
+                     parked: Tuple[ChromiumDriver, Union[str, None], Union[dict, None]] = None) -> None: ...
 
     def _get_document(self) -> None: ...
 
@@ -74,6 +81,9 @@ class ChromiumBase(BasePage):
     @property
     def title(self) -> str: ...
 
+    @property
+    def _multiplex_driver(self) -> Union[ChromiumDriver, None]: ...
+
     @property
     def driver(self) -> ChromiumDriver: ...
 
@@ -122,9 +132,10 @@ class ChromiumBase(BasePage):
     @property
     def screencast(self) -> Screencast: ...
 
-    def run_js(self, script: str, *args: Any, as_expr: bool = False) -> Any: ...
+    def run_js(self, script: str, *args: Any, as_expr: bool = False, by_value: bool = False) -> Any: ...
 
-    def run_js_loaded(self, script: str, *args: Any, as_expr: bool = False) -> Any: ...
+    def run_js_loaded(self, script: str, *args: Any, as_expr: bool = False,
+                      by_value: bool = False) -> Any: ...
 
     def run_async_js(self, script: str, *args: Any, as_expr: bool = False) -> None: ...
 
@@ -143,18 +154,40 @@ class ChromiumBase(BasePage):
 
     def eles(self,
              loc_or_str: Union[Tuple[str, str], str],
-             timeout: float = None) -> List[Union[ChromiumElement, ChromiumFrame]]: ...
+             timeout: float = None) -> ChromiumElementList: ...
+
+    def extract(self, schema: dict) -> dict: ...
+
+    def ele_any(self,
+                locs: Union[List[Union[Tuple[str, str], str]], Tuple[Union[Tuple[str, str], str], ...]],
+                timeout: float = None,
+                raise_err: bool = None) -> Tuple[Union[int, None], Union[ChromiumElement, ChromiumFrame, str, NoneElement]]: ...
+
+    def snapshots(self,
+                  loc_or_eles: Union[Tuple[str, str], str, List[ChromiumElement]],
+                  fields: Union[str, List[str], Tuple[str, ...]] = None,
+                  timeout: float = None) -> List[Union[ElementSnapshot, str]]: ...
 
     def s_ele(self, loc_or_ele: Union[Tuple[str, str], str] = None) \
             -> Union[SessionElement, str, NoneElement]: ...
 
-    def s_eles(self, loc_or_str: Union[Tuple[str, str], str]) -> List[Union[SessionElement, str]]: ...
+    def s_eles(self, loc_or_str: Union[Tuple[str, str], str]) -> SessionElementList: ...
 
     def _find_elements(self,
                        loc_or_ele: Union[Tuple[str, str], str, ChromiumElement, ChromiumFrame],
                        timeout: float = None, single: bool = True, relative: bool = False, raise_err: bool = None) \
             -> Union[ChromiumElement, ChromiumFrame, NoneElement, List[Union[ChromiumElement, ChromiumFrame]]]: ...
 
+    def _wait_loc(self, loc: Tuple[str, str], timeout: float) -> bool: ...
+
+    def _discard_search(self, search_id: str) -> None: ...
+
+    def _release_object(self, obj_id: str) -> None: ...
+
+    def _run_helper(self, name: str, *args: Any) -> Any: ...
+
+    def scope(self, group: str = None) -> ObjectScope: ...
+
     def refresh(self, ignore_cache: bool = False) -> None: ...
 
     def forward(self, steps: int = 1) -> None: ...
@@ -169,8 +202,18 @@ class ChromiumBase(BasePage):
 
     def get_frame(self, loc_ind_ele: Union[str, int, ChromiumFrame]) -> ChromiumFrame: ...
 
+    def eles_in_all_frames(self, loc: Union[Tuple[str, str], str]) -> List[
+        Tuple[str, Union[ChromiumElement, ChromiumFrame, str]]]: ...
+
+    def _eles_in_remote_frame(self, frame: Optional[ChromiumFrame], backend_id: int, loc: Tuple[str, str]) \
+            -> Tuple[Optional[ChromiumFrame], List[Tuple[str, Union[ChromiumElement, ChromiumFrame, str]]]]: ...
+
     def run_cdp(self, cmd: str, **cmd_args) -> dict: ...
 
+    def run_cdp_many(self, cmds: List[Tuple[str, dict]], timeout: float = None) -> List[dict]: ...
+
+    def _check_cdp_result(self, r: dict) -> dict: ...
+
     def run_cdp_loaded(self, cmd: str, **cmd_args) -> dict: ...
 
     def get_session_storage(self, item: str = None) -> Union[str, dict, None]: ...
@@ -183,6 +226,15 @@ class ChromiumBase(BasePage):
                        left_top: Tuple[int, int] = None,
                        right_bottom: Tuple[int, int] = None) -> Union[str, bytes]: ...
 
+    def get_pdf(self, path: Union[str, Path] = None,
+                as_bytes: bool = False,
+                chunk_size: int = 1048576,
+                **kwargs) -> Union[str, bytes]: ...
+
+    def iter_pdf(self, chunk_size: int = 1048576, **kwargs) -> Iterator[bytes]: ...
+
+    def _read_stream(self, handle: str, chunk_size: int = 1048576) -> Iterator[bytes]: ...
+
     def clear_cache(self,
                     session_storage: bool = True,
                     local_storage: bool = True,
@@ -197,6 +249,9 @@ class ChromiumBase(BasePage):
                    timeout: float = None) -> Union[bool, None]: ...
 
 
+def _frame_ids(frame_tree: dict) -> List[str]: ...
+
+
 class Screencast(object):
     def __init__(self, page: ChromiumBase):
         self._page: ChromiumBase = ...
@@ -222,6 +277,8 @@ class ChromiumBaseWaiter(object):
 
     def ele_hidden(self, loc_or_ele: Union[str, tuple, ChromiumElement], timeout: float = None) -> bool: ...
 
+    def any_of(self, *locs: Union[str, Tuple[str, str]], timeout: float = None) -> Union[int, None]: ...
+
     def _loading(self, timeout: float = None, start: bool = True, gap: float = .01) -> bool: ...
 
     def load_start(self, timeout: float = None) -> bool: ...
@@ -237,10 +294,67 @@ class ChromiumPageScroll(ChromiumScroll):
     def to_see(self, loc_or_ele: Union[str, tuple, ChromiumElement]) -> None: ...
 
 
+class ObjectScope(object):
+    _count: Iterator[int] = ...
+
+    def __init__(self, page: ChromiumBase, group: str = None):
+        self._page: ChromiumBase = ...
+        self.group: str = ...
+        self._last_group: Union[str, None] = ...
+
+    def __enter__(self) -> ObjectScope: ...
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None: ...
+
+    def release(self) -> None: ...
+
+
+class NodeCache(object):
+    EVENTS: Tuple[str, ...] = ...
+
+    def __init__(self, page: ChromiumBase):
+        self._page: ChromiumBase = ...
+        self._driver: Union[ChromiumDriver, None] = ...
+        self._subscribers: List[EventSubscriber] = ...
+        self._lock: Lock = ...
+        self._nodes: Dict[int, dict] = ...
+        self._pending: Dict[int, bool] = ...
+
+    def start(self) -> None: ...
+
+    def stop(self) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def get(self, ele: ChromiumElement) -> dict: ...
+
+    def _invalidate(self, *node_ids: int) -> None: ...
+
+    def _on_attributeModified(self, **kwargs) -> None: ...
+
+    def _on_attributeRemoved(self, **kwargs) -> None: ...
+
+    def _on_inlineStyleInvalidated(self, **kwargs) -> None: ...
+
+    def _on_childNodeInserted(self, **kwargs) -> None: ...
+
+    def _on_childNodeRemoved(self, **kwargs) -> None: ...
+
+    def _on_childNodeCountUpdated(self, **kwargs) -> None: ...
+
+    def _on_documentUpdated(self, **kwargs) -> None: ...
+
+
 class ChromiumBaseSetter(object):
     def __init__(self, page):
         self._page: ChromiumBase = ...
 
+    def node_cache(self, on_off: bool = True) -> None: ...
+
+    def helper_runtime(self, on_off: bool = True) -> None: ...
+
+    def script_cache(self, on_off: bool = True) -> None: ...
+
     @property
     def load_strategy(self) -> PageLoadStrategy: ...
 
@@ -3,15 +3,25 @@
 @Author  :   g1879
 @Contact :   g1879@qq.com
 """
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from functools import partial
-from json import dumps, loads
-from queue import Queue, Empty
-from threading import Thread, Event
+from queue import Queue, Empty, Full
+from threading import Thread, Event, Lock, current_thread
+from time import perf_counter
+from warnings import warn
 
-from websocket import WebSocketTimeoutException, WebSocketException, WebSocketConnectionClosedException, \
-    create_connection
+from websocket import WebSocketException, WebSocketConnectionClosedException, create_connection
 
-from .errors import CallMethodError
+from .commons.codec import dumps, loads_message, plain_fields
+from .commons.constants import HANDLE_ALERT_METHOD
+from .commons.stats import DriverStats, byte_len
+from .errors import CallMethodError, BrowserConnectError
+
+_ALERT_RESULT = {'error': {'message': 'alert exists'}, 'type': 'alert_exists'}
+# 断开连接时等待浏览器回复关闭帧的时间
+CLOSE_TIMEOUT = .5
+# 无论是否有人接收都要解析的事件
+_ALWAYS_DECODE = ('Target.detachedFromTarget',)
 
 
 class GenericAttr(object):
@@ -36,6 +46,7 @@ class ChromiumDriver(object):
     _INITIAL_ = 'initial'
     _STARTED_ = 'started'
     _STOPPED_ = 'stopped'
+    recorder = None  # CdpRecorder对象，设置后记录所有收发的消息
 
     def __init__(self, tab_id, tab_type, address):
         """
@@ -47,10 +58,11 @@ class ChromiumDriver(object):
         self.address = address
         self.type = tab_type
         self.debug = False
-        self.has_alert = False
+        self._has_alert = False
 
         self._websocket_url = f'ws://{address}/devtools/{tab_type}/{tab_id}'
         self._cur_id = 0
+        self._id_lock = Lock()
         self._ws = None
 
         self._recv_th = Thread(target=self._recv_loop)
@@ -65,75 +77,128 @@ class ChromiumDriver(object):
         self.event_handlers = {}
         self.method_results = {}
         self.event_queue = Queue()
-
-    def _send(self, message, timeout=None):
+        self.sessions = {}
+        self.subscribers = {}
+        self._subscribe_lock = Lock()
+        self._event_pool = None
+        self.stats = DriverStats()
+        self._stats_pending = {}
+        self._lazy_ids = set()  # 结果中保留LazyField的消息id
+        self.domains = DomainManager(self)
+
+    def _send(self, message, timeout=None, lazy=False):
         """发送信息到浏览器，并返回浏览器返回的信息
         :param message: 发送给浏览器的数据
         :param timeout: 超时时间
+        :param lazy: 结果中的大字段是否以LazyField返回
         :return: 浏览器返回的数据
         """
-        if 'id' not in message:
-            self._cur_id += 1
-            message['id'] = self._cur_id
-
-        message_json = dumps(message)
-
-        if self.debug:
-            print(f"发> {message_json}")
-
-        if not isinstance(timeout, (int, float)) or timeout > 1:
-            q_timeout = 1
-        else:
-            q_timeout = timeout / 2.0
-
+        end_time = perf_counter() + timeout if isinstance(timeout, (int, float)) else None
+        future = self._send_async(message, lazy=lazy)
         try:
-            self.method_results[message['id']] = Queue()
-            self._ws.send(message_json)
-
-            while not self._stopped.is_set():
-                try:
-                    if isinstance(timeout, (int, float)):
-                        if timeout < q_timeout:
-                            q_timeout = timeout
-                        timeout -= q_timeout
-
-                    return self.method_results[message['id']].get(timeout=q_timeout)
-
-                except Empty:
-                    if self.has_alert:
-                        return {'error': {'message': 'alert exists'}, 'type': 'alert_exists'}
-
-                    if isinstance(timeout, (int, float)) and timeout <= 0:
-                        raise TimeoutError(f"调用{message['method']}超时。")
-
-                    continue
-
+            return self._wait_future(future, end_time)
+        except TimeoutError:
+            raise TimeoutError(f"调用{message['method']}超时。")
         finally:
-            self.method_results.pop(message['id'], None)
+            self._drop_pending(message['id'])
+
+    def _drop_pending(self, msg_id):
+        """丢弃等待中的调用，超时等未收到回复的调用在统计中记为错误
+        :param msg_id: 消息id
+        :return: None
+        """
+        self.method_results.pop(msg_id, None)
+        self._lazy_ids.discard(msg_id)
+        info = self._stats_pending.pop(msg_id, None)
+        if info is not None:
+            info[0].record(info[1], perf_counter() - info[3], info[2], 0, True)
+
+    def _next_id(self):
+        """返回下一个消息id，多线程同时调用时不会重复"""
+        with self._id_lock:
+            self._cur_id += 1
+            return self._cur_id
+
+    @property
+    def has_alert(self):
+        """返回是否存在未处理的提示框"""
+        return self._has_alert
+
+    @has_alert.setter
+    def has_alert(self, on_off):
+        """设置是否存在提示框，出现提示框时立即唤醒所有等待结果的调用
+        :param on_off: 是否存在
+        :return: None
+        """
+        self._has_alert = on_off
+        if on_off:
+            for future in self._pending_futures():
+                self._set_future(future, _ALERT_RESULT)
+
+    def _pending_futures(self):
+        """返回本连接中等待结果的Future对象"""
+        return list(self.method_results.values())
+
+    @staticmethod
+    def _set_future(future, result):
+        """给Future对象填入结果，已有结果时忽略
+        :param future: Future对象
+        :param result: 结果
+        :return: None
+        """
+        if not future.done():
+            try:
+                future.set_result(result)
+            except Exception:  # 被其它线程抢先填入
+                pass
 
     def _recv_loop(self):
-        """接收浏览器信息的守护线程方法"""
+        """接收浏览器信息的守护线程方法，阻塞接收，停止时由浏览器回复的关闭帧或stop()关闭socket唤醒"""
+        ws = self._ws
         while not self._stopped.is_set():
             try:
-                self._ws.settimeout(1)
-                message_json = self._ws.recv()
-                message = loads(message_json)
-            except WebSocketTimeoutException:
-                continue
+                message_json = ws.recv()
+                if not message_json:  # 关闭帧等非文本消息
+                    continue
+                if self.recorder is not None:
+                    self.recorder.record('<', self._websocket_url, message_json)
+                if message_json.startswith('{"method":"') and self._skip_event(message_json):
+                    continue
+                message = loads_message(message_json)
+                if message.get('id', None) in self._lazy_ids:  # 内部调用要求保留LazyField
+                    self._lazy_ids.discard(message['id'])
+                else:
+                    plain_fields(message, message_json)
             except (WebSocketException, OSError, WebSocketConnectionClosedException):
                 if not self._stopped.is_set():
                     self.stop()
                 return
+            except ValueError:
+                continue
 
             if self.debug:
                 print(f'<收 {message_json}')
 
             if "method" in message:
-                self.event_queue.put(message)
+                if message['method'] == 'Target.detachedFromTarget':
+                    session = self.sessions.pop(message['params']['sessionId'], None)
+                    if session is not None:
+                        session._on_detached()
+
+                driver = self.sessions.get(message['sessionId'], None) if 'sessionId' in message else self
+                if driver is not None:
+                    if driver.stats.enabled:
+                        driver.stats.record_event(message['method'], byte_len(message_json))
+                    driver._publish(message)
 
             elif "id" in message:
-                if message["id"] in self.method_results:
-                    self.method_results[message['id']].put(message)
+                info = self._stats_pending.pop(message['id'], None)
+                if info is not None:
+                    info[0].record(info[1], perf_counter() - info[3], info[2], byte_len(message_json),
+                                   'error' in message)
+                future = self.method_results.pop(message['id'], None)
+                if future is not None:
+                    self._set_future(future, message)
 
             elif self.debug:
                 print(f'未知信息：{message}')
@@ -141,19 +206,83 @@ class ChromiumDriver(object):
     def _handle_event_loop(self):
         """当接收到浏览器信息，执行已绑定的方法"""
         while not self._stopped.is_set():
-            try:
-                event = self.event_queue.get(timeout=1)
-            except Empty:
-                continue
+            event = self.event_queue.get()
+            if event is None:  # stop()放入的唤醒标记
+                return
+
+            if 'sessionId' in event:  # 扁平化会话的事件，交给对应会话的回调方法
+                session = self.sessions.get(event['sessionId'], None)
+                handlers = session.event_handlers if session is not None else {}
+            else:
+                handlers = self.event_handlers
 
-            if event['method'] in self.event_handlers:
+            if event['method'] in handlers:
                 try:
-                    self.event_handlers[event['method']](**event['params'])
+                    handlers[event['method']](**event['params'])
                 except Exception as e:
-                    raise RuntimeError(f"\n回调函数 {self.event_handlers[event['method']].__name__} 错误：\n{e}")
+                    raise RuntimeError(f"\n回调函数 {handlers[event['method']].__name__} 错误：\n{e}")
 
             self.event_queue.task_done()
 
+    def _skip_event(self, text):
+        """不解析json，只从文本判断事件是否有人接收，没有的直接丢弃并计数
+        只识别浏览器发出的{"method":"...","params":{...},"sessionId":"..."}格式（sessionId可无），
+        其它顺序或格式无法确定事件归属，返回False交给完整解析
+        :param text: 浏览器发来的事件json文本
+        :return: 是否已丢弃
+        """
+        end = text.find('"', 11)
+        method = text[11:end]
+        if method in _ALWAYS_DECODE or not text.startswith('","params":', end):
+            return False
+
+        driver = self
+        i = text.rfind(',"sessionId":"')
+        if i != -1:  # 扁平化会话的事件，sessionId须在最后一项
+            session_id = text[i + 14:-2]
+            if not text.endswith('"}') or '"' in session_id:
+                return False
+            driver = self.sessions.get(session_id, None)
+            if driver is None:
+                return False
+        elif '"sessionId"' in text:
+            return False
+
+        if method in driver.event_handlers or method in driver.subscribers:
+            return False
+
+        driver.domains.suppress(method)
+        if driver.stats.enabled:
+            driver.stats.record_event(method, byte_len(text))
+        return True
+
+    def _publish(self, event):
+        """在接收线程中把事件分发给订阅者，并把需要回调方法处理的事件放入事件队列
+        :param event: 浏览器发来的事件信息
+        :return: None
+        """
+        for subscriber in self.subscribers.get(event['method'], ()):
+            subscriber._offer(event['params'])
+
+        if event['method'] in self.event_handlers:
+            self.event_queue.put(event)
+
+    def _get_event_pool(self):
+        """返回订阅者共用的线程池，第一次使用时创建"""
+        with self._subscribe_lock:
+            if self._event_pool is None:
+                self._event_pool = ThreadPoolExecutor(thread_name_prefix=f'cdp_event_{self.id}')
+            return self._event_pool
+
+    def _close_subscribers(self):
+        """关闭所有订阅者"""
+        with self._subscribe_lock:
+            subscribers = self.subscribers
+            self.subscribers = {}
+        for event_subscribers in subscribers.values():
+            for subscriber in event_subscribers:
+                subscriber.close()
+
     def __getattr__(self, item):
         attr = GenericAttr(item, self)
         setattr(self, item, attr)
@@ -163,7 +292,7 @@ class ChromiumDriver(object):
         """执行cdp方法
         :param _method: cdp方法名
         :param args: cdp参数
-        :param kwargs: cdp参数
+        :param kwargs: cdp参数，_timeout为超时时间，_lazy为True时结果中的大字段以LazyField返回，供内部使用
         :return: 执行结果
         """
         if not self._started:
@@ -176,13 +305,114 @@ class ChromiumDriver(object):
             return {'error': 'tab closed', 'type': 'tab_closed'}
 
         timeout = kwargs.pop("_timeout", None)
-        result = self._send({"method": _method, "params": kwargs}, timeout=timeout)
+        lazy = kwargs.pop("_lazy", False)
+        result = self._send({"method": _method, "params": kwargs}, timeout=timeout, lazy=lazy)
+        return self._make_result(_method, kwargs, result)
+
+    def call_method_async(self, _method, *args, **kwargs):
+        """执行cdp方法，不等待结果，立即返回Future对象，结果由接收线程填入
+        :param _method: cdp方法名
+        :param args: cdp参数
+        :param kwargs: cdp参数
+        :return: Future对象，其结果格式与call_method()返回值一致
+        """
+        if not self._started:
+            self.start()
+        if args:
+            raise CallMethodError("参数必须是key=value形式。")
+
+        future = Future()
+        if self._stopped.is_set():
+            future.set_result({'error': 'tab closed', 'type': 'tab_closed'})
+            return future
+
+        kwargs.pop("_timeout", None)
+        lazy = kwargs.pop("_lazy", False)
+        raw = self._send_async({"method": _method, "params": kwargs}, lazy=lazy)
+        raw.add_done_callback(lambda f: future.set_result(self._make_result(_method, kwargs, f.result())))
+        return future
+
+    def call_many(self, cmds, timeout=None):
+        """一次性发出多条cdp命令，再统一等待结果，节省逐条往返的时间
+        :param cmds: 由(cdp方法名, 参数dict)组成的列表
+        :param timeout: 等待所有结果的总超时时间，为None时一直等待
+        :return: 结果列表，顺序与cmds一致，每项格式与call_method()返回值一致
+        """
+        if not self._started:
+            self.start()
+
+        cmds = [(method, params or {}) for method, params in cmds]
+        messages = [{"method": method, "params": params} for method, params in cmds]
+        futures = [self._send_async(message) for message in messages]
+        end_time = None if timeout is None else perf_counter() + timeout
+        try:
+            return [self._make_result(method, params, self._wait_future(f, end_time))
+                    for (method, params), f in zip(cmds, futures)]
+        finally:
+            for message in messages:
+                self._drop_pending(message['id'])
+
+    def _send_async(self, message, stats=None, lazy=False):
+        """发送信息到浏览器，不等待结果
+        :param message: 发送给浏览器的数据
+        :param stats: 记录本次调用的DriverStats对象，为None时使用本连接的
+        :param lazy: 结果中的大字段是否以LazyField返回
+        :return: Future对象，接收到浏览器返回的信息时填入结果
+        """
+        if 'id' not in message:
+            message['id'] = self._next_id()
+
+        message_json = dumps(message)
+
+        if self.debug:
+            print(f"发> {message_json}")
+
+        future = Future()
+        if self.has_alert and message['method'] != HANDLE_ALERT_METHOD:
+            future.set_result(_ALERT_RESULT)
+            return future
+
+        self.method_results[message['id']] = future
+        if lazy:
+            self._lazy_ids.add(message['id'])
+        stats = stats or self.stats
+        if stats.enabled:
+            self._stats_pending[message['id']] = (stats, message['method'], byte_len(message_json), perf_counter())
+        if self.recorder is not None:
+            self.recorder.record('>', self._websocket_url, message_json)
+        try:
+            self._ws.send(message_json)
+        except Exception:
+            self._drop_pending(message['id'])
+            self._set_future(future, None)
+        return future
+
+    def _wait_future(self, future, end_time=None):
+        """等待Future对象的结果，连接断开或出现alert时Future会被立即填入结果，不需要轮询
+        :param future: _send_async()返回的Future对象
+        :param end_time: 超时的时间点，为None时一直等待
+        :return: 浏览器返回的原始信息，连接已断开时返回None
+        """
+        timeout = None if end_time is None else max(end_time - perf_counter(), 0)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise TimeoutError("调用cdp方法超时。")
+
+    @staticmethod
+    def _make_result(method, kwargs, result):
+        """把浏览器返回的原始信息整理成call_method()的返回格式
+        :param method: cdp方法名
+        :param kwargs: cdp参数
+        :param result: 浏览器返回的原始信息
+        :return: 整理后的结果
+        """
         if result is None:
             return {'error': 'tab closed', 'type': 'tab_closed'}
         if 'result' not in result and 'error' in result:
             return {'error': result['error']['message'],
                     'type': result.get('type', 'call_method_error'),
-                    'method': _method,
+                    'method': method,
                     'args': kwargs}
 
         return result['result']
@@ -211,14 +441,82 @@ class ChromiumDriver(object):
 
         self.status = self._STOPPED_
         self._stopped.set()
-        if self._ws:
-            self._ws.close()
-            self._ws = None
+        ws, self._ws = self._ws, None
+        if ws:
+            try:
+                ws.settimeout(CLOSE_TIMEOUT)
+                ws.send_close()  # 正常关闭，浏览器回复关闭帧后接收线程自行退出
+            except Exception:
+                pass
+            if current_thread() is not self._recv_th:
+                self._recv_th.join(CLOSE_TIMEOUT)
+            try:
+                if self._recv_th.is_alive():
+                    ws.abort()  # 浏览器没有回复，关闭读写以唤醒阻塞在recv()的接收线程
+                ws.shutdown()
+            except Exception:
+                pass
         self.event_handlers.clear()
-        self.method_results.clear()
+        self._close_subscribers()
+        if self._event_pool is not None:
+            self._event_pool.shutdown(wait=False)
+        while self.sessions:
+            try:
+                self.sessions.popitem()[1]._on_detached()
+            except KeyError:
+                break
+        while self.method_results:
+            try:
+                self._set_future(self.method_results.popitem()[1], None)
+            except KeyError:
+                break
+        self._stats_pending.clear()
         self.event_queue.queue.clear()
+        self.event_queue.put(None)
         return True
 
+    def attach(self, target_id, target_type='page'):
+        """在本连接上以扁平化会话方式连接一个target，多个标签页和frame可共用一个websocket和接收线程
+        :param target_id: 标签页或frame的id
+        :param target_type: target类型
+        :return: ChromiumSessionDriver对象
+        """
+        return ChromiumSessionDriver(self, target_id, target_type)
+
+    def subscribe(self, event, callback, predicate=None, max_size=0, policy='drop', use_pool=False):
+        """订阅cdp event，一个event可有多个订阅者，每个订阅者有独立的队列，互不阻塞
+        :param event: cdp event
+        :param callback: 回调方法，以event参数作为关键字参数调用
+        :param predicate: 过滤方法，接收event参数dict，返回False的事件在接收线程中直接丢弃
+        :param max_size: 订阅者队列最大长度，0为不限制
+        :param policy: 队列满时的策略，'drop'丢弃新事件，'drop_oldest'丢弃最旧事件，'block'阻塞接收线程直到有空位
+        :param use_pool: 是否用线程池执行回调，为False时订阅者使用独立线程
+        :return: EventSubscriber对象，用于取消订阅
+        """
+        if not callable(callback):
+            raise RuntimeError("方法不能调用。")
+        if policy not in ('drop', 'drop_oldest', 'block'):
+            raise ValueError("policy参数只能是'drop'、'drop_oldest'或'block'。")
+
+        pool = self._get_event_pool() if use_pool else None
+        subscriber = EventSubscriber(self, event, callback, predicate, max_size, policy, pool)
+        with self._subscribe_lock:
+            self.subscribers[event] = self.subscribers.get(event, ()) + (subscriber,)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """取消订阅
+        :param subscriber: subscribe()返回的EventSubscriber对象
+        :return: None
+        """
+        with self._subscribe_lock:
+            subscribers = tuple(i for i in self.subscribers.get(subscriber.event, ()) if i is not subscriber)
+            if subscribers:
+                self.subscribers[subscriber.event] = subscribers
+            else:
+                self.subscribers.pop(subscriber.event, None)
+        subscriber.close()
+
     def set_listener(self, event, callback):
         """绑定cdp event和回调方法
         :param event: cdp event
@@ -244,3 +542,321 @@ class ChromiumDriver(object):
         return f"<ChromiumDriver {self.id}>"
 
     __repr__ = __str__
+
+
+class ChromiumSessionDriver(ChromiumDriver):
+    """通过浏览器级连接上的扁平化会话（Target.attachToTarget flatten=True）控制target，
+    接口与ChromiumDriver一致，但不占用独立的websocket和线程"""
+
+    def __init__(self, browser_driver, tab_id, tab_type='page'):
+        """
+        :param browser_driver: 浏览器级的ChromiumDriver对象
+        :param tab_id: 标签页或frame的id
+        :param tab_type: target类型
+        """
+        self.id = tab_id
+        self.address = browser_driver.address
+        self.type = tab_type
+        self.debug = False
+        self._has_alert = False
+        self.session_id = None
+        self._futures = {}
+
+        self._browser = browser_driver
+        self._websocket_url = browser_driver._websocket_url
+        self._stopped = Event()
+        self._started = False
+        self.status = self._INITIAL_
+
+        self.event_handlers = {}
+        self.method_results = browser_driver.method_results
+        self.event_queue = browser_driver.event_queue
+        self.subscribers = {}
+        self._subscribe_lock = Lock()
+        self._event_pool = None
+        self.stats = DriverStats()
+        self.domains = DomainManager(self)
+
+    def _send_async(self, message, stats=None, lazy=False):
+        """通过浏览器连接发送信息，不等待结果
+        :param message: 发送给浏览器的数据
+        :param stats: 记录本次调用的DriverStats对象，为None时使用本会话的
+        :param lazy: 结果中的大字段是否以LazyField返回
+        :return: Future对象，接收到浏览器返回的信息时填入结果
+        """
+        if self.has_alert and message['method'] != HANDLE_ALERT_METHOD:
+            future = Future()
+            future.set_result(_ALERT_RESULT)
+            return future
+
+        message['sessionId'] = self.session_id
+        future = self._browser._send_async(message, stats or self.stats, lazy)
+        if not future.done():
+            self._futures[message['id']] = future
+            future.add_done_callback(lambda f: self._futures.pop(message['id'], None))
+        return future
+
+    def _drop_pending(self, msg_id):
+        """丢弃等待中的调用，统计数据由浏览器连接记录
+        :param msg_id: 消息id
+        :return: None
+        """
+        self._browser._drop_pending(msg_id)
+
+    def _pending_futures(self):
+        """返回本会话中等待结果的Future对象"""
+        return list(self._futures.values())
+
+    def start(self):
+        """连接到target"""
+        if self._started:
+            return False
+
+        r = self._browser.call_method('Target.attachToTarget', targetId=self.id, flatten=True)
+        if 'error' in r:
+            raise BrowserConnectError(f'连接target失败：{r["error"]}')
+
+        self.session_id = r['sessionId']
+        self._browser.sessions[self.session_id] = self
+        self._started = True
+        self.status = self._STARTED_
+        self._stopped.clear()
+        return True
+
+    def stop(self):
+        """断开与target的会话，不影响浏览器连接"""
+        if self._stopped.is_set():
+            return False
+        if not self._started:
+            return True
+
+        self._browser.sessions.pop(self.session_id, None)
+        if not self._browser._stopped.is_set():
+            self._browser.call_method_async('Target.detachFromTarget', sessionId=self.session_id)
+        self._on_detached()
+        return True
+
+    def _get_event_pool(self):
+        """返回订阅者共用的线程池，与浏览器连接共用"""
+        return self._browser._get_event_pool()
+
+    def _on_detached(self):
+        """会话被断开时调用"""
+        self.status = self._STOPPED_
+        self._stopped.set()
+        self.event_handlers.clear()
+        self._close_subscribers()
+        for msg_id, future in list(self._futures.items()):
+            self._drop_pending(msg_id)
+            self._set_future(future, None)
+
+    def __str__(self):
+        return f"<ChromiumSessionDriver {self.id}>"
+
+    __repr__ = __str__
+
+
+class DomainManager(object):
+    """按功能引用计数管理cdp domain的启用和停用，没有功能使用的domain不接收事件"""
+
+    def __init__(self, driver):
+        """
+        :param driver: 所属的ChromiumDriver对象
+        """
+        self._driver = driver
+        self._features = {}
+        self._lock = Lock()
+        self.suppressed = {}
+
+    def enable(self, domain, feature='default', **params):
+        """为某个功能启用domain，第一个使用该domain的功能才会真正调用enable
+        :param domain: domain名称，如 'DOM' 'Network'
+        :param feature: 使用该domain的功能名称，同一功能重复启用只计一次
+        :param params: enable方法的参数
+        :return: 调用了enable时返回其结果，否则返回None
+        """
+        with self._lock:
+            features = self._features.setdefault(domain, set())
+            first = not features
+            features.add(feature)
+
+        if not first:
+            return None
+
+        r = self._driver.call_method(f'{domain}.enable', **params)
+        if 'error' in r:
+            with self._lock:
+                self._features.get(domain, set()).discard(feature)
+        return r
+
+    def disable(self, domain, feature='default'):
+        """某个功能不再使用domain，最后一个功能停用时才会真正调用disable
+        :param domain: domain名称
+        :param feature: 功能名称
+        :return: 调用了disable时返回其结果，否则返回None
+        """
+        with self._lock:
+            features = self._features.get(domain, None)
+            if not features or feature not in features:
+                return None
+            features.discard(feature)
+            if features:
+                return None
+            self._features.pop(domain, None)
+
+        return self._driver.call_method(f'{domain}.disable')
+
+    def is_enabled(self, domain):
+        """返回domain是否已启用
+        :param domain: domain名称
+        :return: 是否已启用
+        """
+        return bool(self._features.get(domain, None))
+
+    def features(self, domain=None):
+        """返回使用domain的功能
+        :param domain: domain名称，为None时返回所有domain的功能
+        :return: 功能名称组成的集合，或{domain: 功能集合}
+        """
+        with self._lock:
+            if domain is None:
+                return {k: set(v) for k, v in self._features.items() if v}
+            return set(self._features.get(domain, ()))
+
+    def suppress(self, method):
+        """记录一个因无人接收而未解析的事件
+        :param method: 事件名称
+        :return: None
+        """
+        self.suppressed[method] = self.suppressed.get(method, 0) + 1
+
+    @property
+    def suppressed_count(self):
+        """返回未解析而丢弃的事件总数"""
+        return sum(self.suppressed.values())
+
+    def __repr__(self):
+        return f'<DomainManager {self.features()}>'
+
+
+class EventSubscriber(object):
+    """cdp event的订阅者，拥有独立的有界队列，回调方法在独立线程或线程池中执行"""
+    _STOP = object()
+
+    def __init__(self, driver, event, callback, predicate=None, max_size=0, policy='drop', pool=None):
+        """
+        :param driver: 所属的ChromiumDriver对象
+        :param event: cdp event
+        :param callback: 回调方法
+        :param predicate: 过滤方法，在接收线程中执行
+        :param max_size: 队列最大长度，0为不限制
+        :param policy: 队列满时的策略，'drop'、'drop_oldest'或'block'
+        :param pool: 执行回调的线程池，为None时使用独立线程
+        """
+        self.driver = driver
+        self.event = event
+        self.callback = callback
+        self.predicate = predicate
+        self.policy = policy
+        self.dropped = 0
+        self.queue = Queue(max_size)
+
+        self._pool = pool
+        self._lock = Lock()
+        self._scheduled = False
+        self._closed = False
+        if pool is None:
+            self._thread = Thread(target=self._run_loop, daemon=True)
+            self._thread.start()
+
+    def _offer(self, params):
+        """在接收线程中调用，过滤事件并放入队列
+        :param params: event参数
+        :return: None
+        """
+        if self._closed:
+            return
+        if self.predicate is not None:
+            try:
+                if not self.predicate(params):
+                    return
+            except Exception as e:
+                warn(f'过滤方法 {self.predicate} 错误：{e}')
+                return
+
+        if self.policy == 'block':
+            self.queue.put(params)
+        else:
+            while True:
+                try:
+                    self.queue.put_nowait(params)
+                    break
+                except Full:
+                    self.dropped += 1
+                    if self.policy == 'drop':
+                        return
+                    try:
+                        self.queue.get_nowait()
+                    except Empty:
+                        pass
+
+        if self._pool is not None:
+            self._schedule()
+
+    def _schedule(self):
+        """让线程池处理队列中的事件，同一订阅者同一时间只占用一个线程，保证顺序"""
+        with self._lock:
+            if self._scheduled or self._closed:
+                return
+            self._scheduled = True
+        try:
+            self._pool.submit(self._drain)
+        except RuntimeError:  # 线程池已关闭
+            self._scheduled = False
+
+    def _drain(self):
+        """在线程池中依次执行队列中的事件"""
+        while not self._closed:
+            try:
+                params = self.queue.get_nowait()
+            except Empty:
+                with self._lock:
+                    if self.queue.empty():
+                        self._scheduled = False
+                        return
+                continue
+            self._call(params)
+
+    def _run_loop(self):
+        """独立线程中依次执行队列中的事件"""
+        while True:
+            params = self.queue.get()
+            if params is self._STOP or self._closed:
+                return
+            self._call(params)
+
+    def _call(self, params):
+        """执行回调方法，出错时给出警告，不影响后续事件"""
+        try:
+            self.callback(**params)
+        except Exception as e:
+            warn(f"\n回调函数 {getattr(self.callback, '__name__', self.callback)} 错误：\n{e}")
+
+    def close(self):
+        """停止接收事件，丢弃未处理的事件"""
+        if self._closed:
+            return
+        self._closed = True
+        while True:
+            try:
+                self.queue.get_nowait()
+            except Empty:
+                break
+        if self._pool is None:
+            try:
+                self.queue.put_nowait(self._STOP)
+            except Full:
+                pass
+
+    def __repr__(self):
+        return f'<EventSubscriber {self.event} {getattr(self.callback, "__name__", self.callback)}>'
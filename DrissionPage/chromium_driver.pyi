@@ -3,9 +3,15 @@
 @Author  :   g1879
 @Contact :   g1879@qq.com
 """
+from concurrent.futures import Future, ThreadPoolExecutor
 from queue import Queue
-from threading import Thread, Event
-from typing import Union, Callable
+from threading import Thread, Event, Lock
+from typing import Union, Callable, List, Tuple
+
+from .cdp_recorder import CdpRecorder
+from .commons.stats import DriverStats
+
+CLOSE_TIMEOUT: float
 
 
 class GenericAttr(object):
@@ -20,13 +26,15 @@ class ChromiumDriver(object):
     _INITIAL_: str
     _STARTED_: str
     _STOPPED_: str
+    recorder: Union[CdpRecorder, None]
     id: str
     address: str
     type: str
     debug: bool
-    has_alert: bool
+    _has_alert: bool
     _websocket_url: str
     _cur_id: int
+    _id_lock: Lock
     _ws = None
     _recv_th: Thread
     _handle_event_th: Thread
@@ -36,25 +44,162 @@ class ChromiumDriver(object):
     event_handlers: dict
     method_results: dict
     event_queue: Queue
+    stats: DriverStats
+    _stats_pending: dict
+    _lazy_ids: set
+    domains: DomainManager
+    sessions: dict
+    subscribers: dict
+    _subscribe_lock: Lock
+    _event_pool: Union[ThreadPoolExecutor, None]
 
     def __init__(self, tab_id: str, tab_type: str, address: str): ...
 
-    def _send(self, message: dict, timeout: float = None) -> dict: ...
+    def _send(self, message: dict, timeout: float = None, lazy: bool = False) -> dict: ...
+
+    def _drop_pending(self, msg_id: int) -> None: ...
+
+    def _next_id(self) -> int: ...
+
+    @property
+    def has_alert(self) -> bool: ...
+
+    @has_alert.setter
+    def has_alert(self, on_off: bool) -> None: ...
+
+    def _pending_futures(self) -> List[Future]: ...
+
+    @staticmethod
+    def _set_future(future: Future, result: Union[dict, None]) -> None: ...
 
     def _recv_loop(self) -> None: ...
 
     def _handle_event_loop(self) -> None: ...
 
+    def _skip_event(self, text: str) -> bool: ...
+
+    def _publish(self, event: dict) -> None: ...
+
+    def _get_event_pool(self) -> ThreadPoolExecutor: ...
+
+    def _close_subscribers(self) -> None: ...
+
     def __getattr__(self, item: str) -> Callable: ...
 
     def call_method(self, _method: str, *args, **kwargs) -> dict: ...
 
+    def call_method_async(self, _method: str, *args, **kwargs) -> Future: ...
+
+    def call_many(self, cmds: List[Tuple[str, dict]], timeout: float = None) -> List[dict]: ...
+
+    def _send_async(self, message: dict, stats: DriverStats = None, lazy: bool = False) -> Future: ...
+
+    def _wait_future(self, future: Future, end_time: float = None) -> dict: ...
+
+    @staticmethod
+    def _make_result(method: str, kwargs: dict, result: Union[dict, None]) -> dict: ...
+
     def start(self) -> bool: ...
 
     def stop(self) -> bool: ...
 
+    def attach(self, target_id: str, target_type: str = 'page') -> ChromiumSessionDriver: ...
+
+    def subscribe(self,
+                  event: str,
+                  callback: Callable,
+                  predicate: Callable[[dict], bool] = None,
+                  max_size: int = 0,
+                  policy: str = 'drop',
+                  use_pool: bool = False) -> EventSubscriber: ...
+
+    def unsubscribe(self, subscriber: EventSubscriber) -> None: ...
+
     def set_listener(self, event: str, callback: Callable) -> Union[Callable, None, bool]: ...
 
     def get_listener(self, event: str) -> Union[Callable, None]: ...
 
     def __str__(self) -> str: ...
+
+
+class ChromiumSessionDriver(ChromiumDriver):
+    session_id: str
+    _browser: ChromiumDriver
+    _futures: dict
+
+    def __init__(self, browser_driver: ChromiumDriver, tab_id: str, tab_type: str = 'page'): ...
+
+    def _send_async(self, message: dict, stats: DriverStats = None, lazy: bool = False) -> Future: ...
+
+    def _drop_pending(self, msg_id: int) -> None: ...
+
+    def _pending_futures(self) -> List[Future]: ...
+
+    def start(self) -> bool: ...
+
+    def stop(self) -> bool: ...
+
+    def _get_event_pool(self) -> ThreadPoolExecutor: ...
+
+    def _on_detached(self) -> None: ...
+
+    def __str__(self) -> str: ...
+
+
+class DomainManager(object):
+    _driver: ChromiumDriver
+    _features: dict
+    _lock: Lock
+    suppressed: dict
+
+    def __init__(self, driver: ChromiumDriver): ...
+
+    def enable(self, domain: str, feature: str = 'default', **params) -> Union[dict, None]: ...
+
+    def disable(self, domain: str, feature: str = 'default') -> Union[dict, None]: ...
+
+    def is_enabled(self, domain: str) -> bool: ...
+
+    def features(self, domain: str = None) -> Union[set, dict]: ...
+
+    def suppress(self, method: str) -> None: ...
+
+    @property
+    def suppressed_count(self) -> int: ...
+
+
+class EventSubscriber(object):
+    _STOP: object
+    driver: ChromiumDriver
+    event: str
+    callback: Callable
+    predicate: Union[Callable[[dict], bool], None]
+    policy: str
+    dropped: int
+    queue: Queue
+    _pool: Union[ThreadPoolExecutor, None]
+    _lock: Lock
+    _scheduled: bool
+    _closed: bool
+    _thread: Thread
+
+    def __init__(self,
+                 driver: ChromiumDriver,
+                 event: str,
+                 callback: Callable,
+                 predicate: Callable[[dict], bool] = None,
+                 max_size: int = 0,
+                 policy: str = 'drop',
+                 pool: ThreadPoolExecutor = None): ...
+
+    def _offer(self, params: dict) -> None: ...
+
+    def _schedule(self) -> None: ...
+
+    def _drain(self) -> None: ...
+
+    def _run_loop(self) -> None: ...
+
+    def _call(self, params: dict) -> None: ...
+
+    def close(self) -> None: ...
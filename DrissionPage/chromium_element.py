@@ -3,6 +3,7 @@
 @Author  :   g1879
 @Contact :   g1879@qq.com
 """
+from json import dumps, loads
 from os import sep
 from os.path import basename
 from pathlib import Path
@@ -10,20 +11,167 @@ from time import perf_counter, sleep
 from warnings import warn
 
 from .base import DrissionElement, BaseElement
-from .commons.constants import FRAME_ELEMENT, NoneElement, Settings
+from .commons.constants import FRAME_ELEMENT, FRAME_CLASS_NAMES, NoneElement, Settings
 from .commons.keys import keys_to_typing, keyDescriptionForString, keyDefinitions
-from .commons.locator import get_loc
-from .commons.web import make_absolute_link, get_ele_txt, format_html, is_js_func, location_in_viewport, offset_scroll
+from .commons.locator import get_loc, parse_schema
+from .commons.web import make_absolute_link, format_html, is_js_func, location_in_viewport, offset_scroll, \
+    ELE_TXT_JS, IN_VIEWPORT_JS, ele_txt_by_js
 from .errors import ContextLossError, ElementLossError, JavaScriptError, NoRectError, ElementNotFoundError, \
     CallMethodError, NoResourceError
 from .session_element import make_session_ele
 
 
+# 穿透所有open shadow root查找元素的js函数，选择器中可用>>>分隔多段，后一段在前一段找到的元素（含其shadow root）内查找，
+# 以:scope开头的段只匹配相对于查找起点的元素，不进入更下级的shadow root
+DEEP_QUERY_JS = '''function deepQuery(root, sel, all){
+    function search(node, s, found, first){
+        var r = node.querySelectorAll(s), i;
+        for (i = 0; i < r.length; i++) {found.push(r[i]); if (first) {return true;}}
+        if (node.shadowRoot && search(node.shadowRoot, s, found, first)) {return true;}
+        var hosts = node.querySelectorAll('*');
+        for (i = 0; i < hosts.length; i++) {
+            if (hosts[i].shadowRoot && search(hosts[i].shadowRoot, s, found, first)) {return true;}
+        }
+        return false;
+    }
+    function topIndex(s, re){
+        var depth = 0, q = null;
+        for (var i = 0; i < s.length; i++) {
+            var ch = s.charAt(i);
+            if (ch === '\\\\') {i++;}
+            else if (q) {if (ch === q) {q = null;}}
+            else if (ch === '"' || ch === "'") {q = ch;}
+            else if (ch === '[' || ch === '(') {depth++;}
+            else if (ch === ']' || ch === ')') {depth--;}
+            else if (!depth && re.test(ch)) {return i;}
+        }
+        return -1;
+    }
+    function scoped(node, s, found){
+        if (node.nodeType !== 11) {
+            Array.prototype.push.apply(found, node.querySelectorAll(s));
+            if (node.shadowRoot) {scoped(node.shadowRoot, s, found);}
+            return;
+        }
+        var i = topIndex(s, /,/);
+        if (i >= 0) {scoped(node, s.slice(0, i), found); scoped(node, s.slice(i + 1), found); return;}
+        s = s.trim();
+        if (!/^:scope/.test(s)) {Array.prototype.push.apply(found, node.querySelectorAll(s)); return;}
+        // ShadowRoot中:scope不匹配任何元素，改为从其子元素开始逐段匹配
+        s = s.slice(6).replace(/^\\s+/, '');
+        if (!/^[>+~]/.test(s)) {Array.prototype.push.apply(found, node.querySelectorAll(s)); return;}
+        if (s.charAt(0) !== '>') {return;}
+        var eles = Array.prototype.slice.call(node.children), comb;
+        s = s.slice(1).replace(/^\\s+/, '');
+        while (true) {
+            i = topIndex(s, /[\\s>+~]/);
+            var compound = i < 0 ? s : s.slice(0, i);
+            s = i < 0 ? '' : s.slice(i).replace(/^\\s+/, '');
+            eles = eles.filter(function(e){return e.matches(compound);});
+            if (!/^[+~]/.test(s)) {break;}
+            comb = s.charAt(0);
+            s = s.slice(1).replace(/^\\s+/, '');
+            var sibs = [];
+            eles.forEach(function(e){
+                for (var n = e.nextElementSibling; n; n = comb === '~' ? n.nextElementSibling : null) {
+                    if (sibs.indexOf(n) < 0) {sibs.push(n);}
+                }
+            });
+            eles = sibs;
+        }
+        eles.forEach(function(e){
+            if (s) {Array.prototype.push.apply(found, e.querySelectorAll(':scope ' + s));}
+            else {found.push(e);}
+        });
+    }
+    var parts = sel.split('>>>').map(function(i){return i.trim();}).filter(function(i){return i;}), ctxs = [root];
+    for (var p = 0; p < parts.length; p++) {
+        var found = [], first = !all && p === parts.length - 1;
+        for (var c = 0; c < ctxs.length; c++) {
+            if (/^:scope/.test(parts[p])) {  // 相对于查找起点的语句，不进入下级shadow root
+                scoped(ctxs[c], parts[p], found);
+                if (first && found.length) {return found[0];}
+            } else if (search(ctxs[c], parts[p], found, first)) {return found[0];}
+        }
+        ctxs = Array.from(new Set(found));
+    }
+    return all ? ctxs : null;
+}'''
+
+# 定位方式在js中的编号
+JS_LOC_TYPES = {'css selector': 0, 'xpath': 1, 'deep css': 2}
+# 获取元素绝对路径的js函数，xpath为false时返回css路径（不含开头的:root），el不是元素时返回undefined
+ELE_PATH_JS = '''function elePath(el, xpath){
+    if (!el || el.nodeType !== Node.ELEMENT_NODE) {return;}
+    var p = '';
+    while (el.nodeType === Node.ELEMENT_NODE) {
+        var tag = el.nodeName.toLowerCase(), sib = el, nth = 0;
+        while (sib) {
+            if (sib.nodeType === Node.ELEMENT_NODE && (!xpath || sib.nodeName.toLowerCase() == tag)) {nth += 1;}
+            sib = sib.previousSibling;
+        }
+        if (xpath) {p = nth > 1 ? '/' + tag + '[' + nth + ']' + p : '/' + tag + p;}
+        else {p = '>:nth-child(' + nth + ')' + p;}
+        el = el.parentNode;
+    }
+    return xpath ? p : p.substr(1);
+}'''
+# 用xpath在节点中查找的js函数，type为document.evaluate()的结果类型，inDoc为true时在frame元素的document中查找
+FIND_XPATH_JS = '''function findXpath(node, xpath, type, inDoc){
+    var e = document.evaluate(xpath, inDoc ? node.contentDocument : node, null, type, null);
+    function val(n){
+        var c = n.constructor.name;
+        return c == 'Text' ? n.data : c == 'Attr' || c == 'Comment' ? n.nodeValue : n;
+    }
+    if (type === 9) {return e.singleNodeValue == null ? null : val(e.singleNodeValue);}
+    if (type === 7) {
+        var a = [];
+        for (var i = 0; i < e.snapshotLength; i++) {a.push(val(e.snapshotItem(i)));}
+        return a;
+    }
+    if (type === 2) {return e.stringValue;}
+    if (type === 1) {return e.numberValue;}
+    return e.singleNodeValue;
+}'''
+# 按值返回时结果中节点占位符的键名，占位符格式为{键名: [节点序号, 元素tag]}
+BY_VALUE_NODE_KEY = '\x00node'
+# 把js结果转换为json文本的js函数，其中的节点换成占位符，NodeList、HTMLCollection转换为数组，
+# 没有节点时返回json文本，有节点时返回[json文本, 节点1, 节点2...]
+PACK_JS = '''function packValue(v){
+    var nodes = [];
+    var s = JSON.stringify(v, function(k, o){
+        if (!o || typeof o !== 'object') {return o;}
+        if (typeof o.nodeType === 'number' && typeof o.nodeName === 'string') {
+            nodes.push(o);
+            var p = {};
+            p[''' + dumps(BY_VALUE_NODE_KEY) + '''] = [nodes.length - 1, o.nodeType === 1 ? o.localName : null];
+            return p;
+        }
+        var t = Object.prototype.toString.call(o);
+        if (t === '[object NodeList]' || t === '[object HTMLCollection]') {return Array.prototype.slice.call(o);}
+        return o;
+    });
+    if (s === undefined) {s = 'null';}
+    return nodes.length ? [s].concat(nodes) : s;
+}'''
+# 内置js函数库，每个函数的第一个参数都是调用时的this对象，开启helper_runtime后注入页面，调用时只需发送函数名和参数
+HELPER_NAME = '__drissionHelper'
+HELPER_FUNCS = {'eleTxt': ELE_TXT_JS, 'deepQuery': DEEP_QUERY_JS, 'elePath': ELE_PATH_JS,
+                'findXpath': FIND_XPATH_JS, 'inViewport': IN_VIEWPORT_JS, 'packValue': PACK_JS}
+HELPER_JS = (f'if (!window.{HELPER_NAME}) {{Object.defineProperty(window, "{HELPER_NAME}", {{value: (function(){{\n'
+             + '\n'.join(HELPER_FUNCS.values())
+             + '\nreturn {' + ', '.join(f'{i}: {i}' for i in HELPER_FUNCS) + '};})(), configurable: true});}')
+# run_js()中表达式编译结果的最大缓存数量
+SCRIPT_CACHE_SIZE = 128
+# 在页面中等待时，python端比页面中的超时多等待的秒数
+WAIT_MARGIN = 2
+
+
 class ChromiumElement(DrissionElement):
     """控制浏览器元素的对象"""
 
     def __init__(self, page, node_id=None, obj_id=None, backend_id=None):
-        """node_id、obj_id和backend_id必须至少传入一个
+        """node_id、obj_id和backend_id必须至少传入一个，其余id在首次使用时才向浏览器获取
         :param page: 元素所在ChromePage页面对象
         :param node_id: cdp中的node id
         :param obj_id: js中的object id
@@ -39,25 +187,7 @@ class ChromiumElement(DrissionElement):
         self._click = None
         self._tag = None
         self._wait = None
-
-        if node_id:
-            self._node_id = node_id
-            self._obj_id = self._get_obj_id(node_id)
-            self._backend_id = self._get_backend_id(self._node_id)
-        elif obj_id:
-            self._node_id = self._get_node_id(obj_id)
-            self._obj_id = obj_id
-            self._backend_id = self._get_backend_id(self._node_id)
-        elif backend_id:
-            self._obj_id = self._get_obj_id(backend_id=backend_id)
-            self._node_id = self._get_node_id(obj_id=self._obj_id)
-            self._backend_id = backend_id
-        else:
-            raise ElementLossError
-
-        self._ids = ChromiumElementIds(self)
-        doc = self.run_js('return this.ownerDocument;')
-        self._doc_id = doc['objectId'] if doc else None
+        self._ids = ChromiumElementIds(self, node_id=node_id, obj_id=obj_id, backend_id=backend_id)
 
     def __repr__(self):
         attrs = self.attrs
@@ -76,14 +206,14 @@ class ChromiumElement(DrissionElement):
     def tag(self):
         """返回元素tag"""
         if self._tag is None:
-            self._tag = self.page.run_cdp('DOM.describeNode',
-                                          backendNodeId=self._backend_id)['node']['localName'].lower()
+            cache = self.page._node_cache
+            self._tag = cache.get(self)['tag'] if cache is not None else self._ids._describe()['localName'].lower()
         return self._tag
 
     @property
     def html(self):
         """返回元素outerHTML文本"""
-        return self.page.run_cdp('DOM.getOuterHTML', backendNodeId=self._backend_id)['outerHTML']
+        return self.page.run_cdp('DOM.getOuterHTML', **self._ids._cdp_kwargs())['outerHTML']
 
     @property
     def inner_html(self):
@@ -93,16 +223,22 @@ class ChromiumElement(DrissionElement):
     @property
     def attrs(self):
         """返回元素所有attribute属性"""
-        try:
-            attrs = self.page.run_cdp('DOM.getAttributes', nodeId=self._node_id)['attributes']
-            return {attrs[i]: attrs[i + 1] for i in range(0, len(attrs), 2)}
-        except CallMethodError:  # 文档根元素不能调用此方法
-            return {}
+        cache = self.page._node_cache
+        if cache is not None:
+            record = cache.get(self)
+            self._tag = record['tag']
+            return dict(record['attrs'])
+
+        node = self._ids._describe()
+        if self._tag is None:
+            self._tag = node['localName'].lower()
+        attrs = node.get('attributes', [])  # 文档根元素没有attributes
+        return {attrs[i]: attrs[i + 1] for i in range(0, len(attrs), 2)}
 
     @property
     def text(self):
         """返回元素内所有文本，文本已格式化"""
-        return get_ele_txt(make_session_ele(self.html))
+        return ele_txt_by_js(self._run_helper('eleTxt'))
 
     @property
     def raw_text(self):
@@ -118,7 +254,7 @@ class ChromiumElement(DrissionElement):
     @property
     def size(self):
         """返回元素宽和高组成的元组"""
-        model = self.page.run_cdp('DOM.getBoxModel', backendNodeId=self._backend_id)['model']
+        model = self.page.run_cdp('DOM.getBoxModel', **self._ids._cdp_kwargs())['model']
         return model['height'], model['width']
 
     @property
@@ -157,7 +293,7 @@ class ChromiumElement(DrissionElement):
     @property
     def shadow_root(self):
         """返回当前元素的shadow_root元素对象"""
-        info = self.page.run_cdp('DOM.describeNode', backendNodeId=self._backend_id)['node']
+        info = self._ids._describe()
         if not info.get('shadowRoots', None):
             return None
 
@@ -318,7 +454,7 @@ class ChromiumElement(DrissionElement):
         :param prop: 属性名
         :return: 属性值文本
         """
-        p = self.page.run_cdp('Runtime.getProperties', objectId=self._obj_id)['result']
+        p = self.page.run_cdp('Runtime.getProperties', objectId=self._ids.obj_id)['result']
         for i in p:
             if i['name'] == prop:
                 if 'value' not in i or 'value' not in i['value']:
@@ -326,14 +462,22 @@ class ChromiumElement(DrissionElement):
 
                 return format_html(i['value']['value'])
 
-    def run_js(self, script, *args, as_expr=False):
+    def run_js(self, script, *args, as_expr=False, by_value=False):
         """对本元素执行javascript代码
         :param script: js文本
         :param args: 参数，按顺序在js文本中对应argument[0]、argument[1]...
         :param as_expr: 是否作为表达式运行，为True时args无效
+        :param by_value: 是否按值返回结果，为True时结果转换为json返回，其中的节点再用一次调用批量获取
         :return: 运行的结果
         """
-        return run_js(self, script, as_expr, self.page.timeouts.script, args)
+        return run_js(self, script, as_expr, self.page.timeouts.script, args, by_value)
+
+    def snapshot(self, fields=None):
+        """用一次js调用获取元素的多项数据
+        :param fields: 要获取的项组成的列表，可选项见SNAPSHOT_FIELDS，为None时获取全部
+        :return: ElementSnapshot对象，未获取的项为None
+        """
+        return snapshot_eles([self], fields)[0]
 
     def run_async_js(self, script, *args, as_expr=False):
         """以异步方式对本元素执行javascript代码
@@ -343,7 +487,14 @@ class ChromiumElement(DrissionElement):
         :return: None
         """
         from threading import Thread
-        Thread(target=run_js, args=(self, script, as_expr, self.page.timeouts.script, args, True)).start()
+        Thread(target=run_js, args=(self, script, as_expr, self.page.timeouts.script, args)).start()
+
+    def extract(self, schema):
+        """按schema在元素内获取数据，整个schema编译成一个js函数，用一次cdp调用完成
+        :param schema: {字段名: 规则}格式的dict，规则格式见parse_schema()
+        :return: 与schema结构对应的dict
+        """
+        return extract_in_chromium(self, schema)
 
     def ele(self, loc_or_str, timeout=None):
         """返回当前元素下级符合条件的第一个元素、属性或节点文本
@@ -357,9 +508,18 @@ class ChromiumElement(DrissionElement):
         """返回当前元素下级所有符合条件的子元素、属性或节点文本
         :param loc_or_str: 元素的定位信息，可以是loc元组，或查询字符串
         :param timeout: 查找元素超时时间，默认与元素所在页面等待时间一致
-        :return: ChromiumElement对象或属性、文本组成的列表
+        :return: ChromiumElement对象或属性、文本组成的ChromiumElementList
+        """
+        return ChromiumElementList(self._ele(loc_or_str, timeout=timeout, single=False))
+
+    def ele_any(self, locs, timeout=None, raise_err=None):
+        """同时查找多个定位符，所有定位符在一次js调用中检查，返回最先找到的一个
+        :param locs: 定位符组成的列表或元组，同时出现时以排在前面的为准
+        :param timeout: 查找元素超时时间，默认与元素所在页面等待时间一致
+        :param raise_err: 找不到元素是是否抛出异常，为None时根据全局设置
+        :return: (定位符在locs中的序号, 元素对象或属性、文本)，都找不到时返回(None, NoneElement)
         """
-        return self._ele(loc_or_str, timeout=timeout, single=False)
+        return find_any(self, locs, timeout, raise_err)
 
     def s_ele(self, loc_or_str=None):
         """查找第一个符合条件的元素，以SessionElement形式返回
@@ -420,7 +580,7 @@ class ChromiumElement(DrissionElement):
             while not self.run_js(js) and perf_counter() < end_time:
                 sleep(.1)
 
-        node = self.page.run_cdp('DOM.describeNode', backendNodeId=self._backend_id)['node']
+        node = self._ids._describe()
         frame = node.get('frameId', None)
         frame = frame or self.page.tab_id
 
@@ -497,7 +657,7 @@ class ChromiumElement(DrissionElement):
             return self._set_file_input(vals)
 
         try:
-            self.page.run_cdp('DOM.focus', backendNodeId=self._backend_id)
+            self.page.run_cdp('DOM.focus', **self._ids._cdp_kwargs())
         except Exception:
             self.click(by_js=True)
 
@@ -587,75 +747,25 @@ class ChromiumElement(DrissionElement):
             actions.wait(.05)
         actions.release()
 
-    def _get_obj_id(self, node_id=None, backend_id=None):
-        """根据传入node id或backend id获取js中的object id
-        :param node_id: cdp中的node id
-        :param backend_id: backend id
-        :return: js中的object id
-        """
-        if node_id:
-            return self.page.run_cdp('DOM.resolveNode', nodeId=node_id)['object']['objectId']
-        else:
-            return self.page.run_cdp('DOM.resolveNode', backendNodeId=backend_id)['object']['objectId']
-
-    def _get_node_id(self, obj_id=None, backend_id=None):
-        """根据传入object id或backend id获取cdp中的node id
-        :param obj_id: js中的object id
-        :param backend_id: backend id
-        :return: cdp中的node id
-        """
-        if obj_id:
-            return self.page.run_cdp('DOM.requestNode', objectId=obj_id)['nodeId']
-        else:
-            return self.page.run_cdp('DOM.describeNode', backendNodeId=backend_id)['node']['nodeId']
-
-    def _get_backend_id(self, node_id):
-        """根据传入node id获取backend id
-        :param node_id:
-        :return: backend id
-        """
-        return self.page.run_cdp('DOM.describeNode', nodeId=node_id)['node']['backendNodeId']
-
     def _get_ele_path(self, mode):
         """返获取绝对的css路径或xpath路径"""
-        if mode == 'xpath':
-            txt1 = 'var tag = el.nodeName.toLowerCase();'
-            txt3 = ''' && sib.nodeName.toLowerCase()==tag'''
-            txt4 = '''
-            if(nth>1){path = '/' + tag + '[' + nth + ']' + path;}
-                    else{path = '/' + tag + path;}'''
-            txt5 = '''return path;'''
-
-        elif mode == 'css':
-            txt1 = ''
-            txt3 = ''
-            txt4 = '''path = '>' + ":nth-child(" + nth + ")" + path;'''
-            txt5 = '''return path.substr(1);'''
-
-        else:
+        if mode not in ('xpath', 'css'):
             raise ValueError(f"mode参数只能是'xpath'或'css'，现在是：'{mode}'。")
 
-        js = '''function(){
-        function e(el) {
-            if (!(el instanceof Element)) return;
-            var path = '';
-            while (el.nodeType === Node.ELEMENT_NODE) {
-                ''' + txt1 + '''
-                    var sib = el, nth = 0;
-                    while (sib) {
-                        if(sib.nodeType === Node.ELEMENT_NODE''' + txt3 + '''){nth += 1;}
-                        sib = sib.previousSibling;
-                    }
-                    ''' + txt4 + '''
-                el = el.parentNode;
-            }
-            ''' + txt5 + '''
-        }
-        return e(this);}
-        '''
-        t = self.run_js(js)
+        t = self._run_helper('elePath', mode == 'xpath')
         return f':root{t}' if mode == 'css' else t
 
+    def _run_helper(self, name, *args):
+        """以当前元素为第一个参数调用内置js函数库中的函数
+        :param name: 函数名
+        :param args: 其余参数
+        :return: 函数返回值
+        """
+        r = call_helper(self.page, self._ids.obj_id, name, args)
+        if 'exceptionDetails' in r:
+            raise JavaScriptError(f'\njavascript运行错误：\n{r["exceptionDetails"]}')
+        return r['result'].get('value')
+
     def _set_file_input(self, files):
         """对上传控件写入路径
         :param files: 文件路径列表或字符串，字符串时多个文件用回车分隔
@@ -664,7 +774,7 @@ class ChromiumElement(DrissionElement):
         if isinstance(files, str):
             files = files.split('\n')
         files = [str(Path(i).absolute()) for i in files]
-        self.page.run_cdp('DOM.setFileInputFiles', files=files, backendNodeId=self._backend_id)
+        self.page.run_cdp('DOM.setFileInputFiles', files=files, **self._ids._cdp_kwargs())
 
     # ---------------准备废弃-----------------
 
@@ -787,25 +897,25 @@ class ChromiumElement(DrissionElement):
     def obj_id(self):
         """返回js中的object id"""
         warn("obj_id属性即将弃用，请用ids.obj_id属性代替。", DeprecationWarning)
-        return self._obj_id
+        return self._ids.obj_id
 
     @property
     def node_id(self):
         """返回cdp中的node id"""
         warn("node_id属性即将弃用，请用ids.node_id属性代替。", DeprecationWarning)
-        return self._node_id
+        return self._ids.node_id
 
     @property
     def backend_id(self):
         """返回backend id"""
         warn("backend_id属性即将弃用，请用ids.backend_id属性代替。", DeprecationWarning)
-        return self._backend_id
+        return self._ids.backend_id
 
     @property
     def doc_id(self):
         """返回所在document的object id"""
         warn("doc_id属性即将弃用，请用ids.doc_id属性代替。", DeprecationWarning)
-        return self._doc_id
+        return self._ids.doc_id
 
 
 class ChromiumShadowRoot(BaseElement):
@@ -819,15 +929,7 @@ class ChromiumShadowRoot(BaseElement):
         """
         super().__init__(parent_ele.page)
         self.parent_ele = parent_ele
-        if backend_id:
-            self._backend_id = backend_id
-            self._obj_id = self._get_obj_id(backend_id)
-            self._node_id = self._get_node_id(self._obj_id)
-        elif obj_id:
-            self._obj_id = obj_id
-            self._node_id = self._get_node_id(obj_id)
-            self._backend_id = self._get_backend_id(self._node_id)
-        self._ids = Ids(self)
+        self._ids = Ids(self, obj_id=obj_id, backend_id=backend_id)
         self._states = None
 
     def __repr__(self):
@@ -869,14 +971,15 @@ class ChromiumShadowRoot(BaseElement):
             self._states = ShadowRootStates(self)
         return self._states
 
-    def run_js(self, script, *args, as_expr=False):
+    def run_js(self, script, *args, as_expr=False, by_value=False):
         """运行javascript代码
         :param script: js文本
         :param args: 参数，按顺序在js文本中对应argument[0]、argument[1]...
         :param as_expr: 是否作为表达式运行，为True时args无效
+        :param by_value: 是否按值返回结果，为True时结果转换为json返回，其中的节点再用一次调用批量获取
         :return: 运行的结果
         """
-        return run_js(self, script, as_expr, self.page.timeouts.script, args)
+        return run_js(self, script, as_expr, self.page.timeouts.script, args, by_value)
 
     def run_async_js(self, script, *args, as_expr=False):
         """以异步方式执行js代码
@@ -899,7 +1002,7 @@ class ChromiumShadowRoot(BaseElement):
         elif isinstance(level_or_loc, (tuple, str)):
             loc = get_loc(level_or_loc, True)
 
-            if loc[0] == 'css selector':
+            if loc[0] != 'xpath':
                 raise ValueError('此css selector语法不受支持，请换成xpath。')
 
             loc = f'xpath:./ancestor-or-self::{loc[1].lstrip(". / ")}'
@@ -957,7 +1060,7 @@ class ChromiumShadowRoot(BaseElement):
         :return: ChromiumElement对象组成的列表
         """
         loc = get_loc(filter_loc, True)
-        if loc[0] == 'css selector':
+        if loc[0] != 'xpath':
             raise ValueError('此css selector语法不受支持，请换成xpath。')
 
         loc = loc[1].lstrip('./')
@@ -970,7 +1073,7 @@ class ChromiumShadowRoot(BaseElement):
         :return: 本元素前面的元素或节点组成的列表
         """
         loc = get_loc(filter_loc, True)
-        if loc[0] == 'css selector':
+        if loc[0] != 'xpath':
             raise ValueError('此css selector语法不受支持，请换成xpath。')
 
         loc = loc[1].lstrip('./')
@@ -999,9 +1102,9 @@ class ChromiumShadowRoot(BaseElement):
         """返回当前元素下级所有符合条件的子元素
         :param loc_or_str: 元素的定位信息，可以是loc元组，或查询字符串
         :param timeout: 查找元素超时时间，默认与元素所在页面等待时间一致
-        :return: ChromiumElement对象组成的列表
+        :return: ChromiumElement对象组成的ChromiumElementList
         """
-        return self._ele(loc_or_str, timeout=timeout, single=False)
+        return ChromiumElementList(self._ele(loc_or_str, timeout=timeout, single=False))
 
     def s_ele(self, loc_or_str=None):
         """查找第一个符合条件的元素以SessionElement形式返回，处理复杂页面时效率很高
@@ -1030,6 +1133,10 @@ class ChromiumShadowRoot(BaseElement):
         if loc[0] == 'css selector' and str(loc[1]).startswith(':root'):
             loc = loc[0], loc[1][5:]
 
+        if loc[0] == 'deep css':
+            selector = f':scope{loc[1]}' if loc[1].lstrip().startswith('>') else loc[1]
+            return find_by_deep(self, selector, single, self.page.timeout if timeout is None else timeout)
+
         timeout = timeout if timeout is not None else self.page.timeout
         t1 = perf_counter()
         eles = make_session_ele(self.html).eles(loc)
@@ -1041,47 +1148,35 @@ class ChromiumShadowRoot(BaseElement):
 
         css_paths = [i.css_path[47:] for i in eles]
         if single:
-            node_id = self.page.run_cdp('DOM.querySelector', nodeId=self._node_id, selector=css_paths[0])['nodeId']
+            node_id = self.page.run_cdp('DOM.querySelector', nodeId=self._ids.node_id, selector=css_paths[0])['nodeId']
             return make_chromium_ele(self.page, node_id=node_id) if node_id else NoneElement()
 
         else:
             results = []
             for i in css_paths:
-                node_id = self.page.run_cdp('DOM.querySelector', nodeId=self._node_id, selector=i)['nodeId']
+                node_id = self.page.run_cdp('DOM.querySelector', nodeId=self._ids.node_id, selector=i)['nodeId']
                 if node_id:
                     results.append(make_chromium_ele(self.page, node_id=node_id))
             return results
 
-    def _get_node_id(self, obj_id):
-        """返回元素node id"""
-        return self.page.run_cdp('DOM.requestNode', objectId=obj_id)['nodeId']
-
-    def _get_obj_id(self, back_id):
-        """返回元素object id"""
-        return self.page.run_cdp('DOM.resolveNode', backendNodeId=back_id)['object']['objectId']
-
-    def _get_backend_id(self, node_id):
-        """返回元素object id"""
-        return self.page.run_cdp('DOM.describeNode', nodeId=node_id)['node']['backendNodeId']
-
     # ------------准备废弃--------------
     @property
     def obj_id(self):
         """返回js中的object id"""
         warn("obj_id属性即将弃用，请用ids.obj_id属性代替。", DeprecationWarning)
-        return self._obj_id
+        return self._ids.obj_id
 
     @property
     def node_id(self):
         """返回cdp中的node id"""
         warn("node_id属性即将弃用，请用ids.node_id属性代替。", DeprecationWarning)
-        return self._node_id
+        return self._ids.node_id
 
     @property
     def backend_id(self):
         """返回backend id"""
         warn("backend_id属性即将弃用，请用ids.backend_id属性代替。", DeprecationWarning)
-        return self._backend_id
+        return self._ids.backend_id
 
     @property
     def is_enabled(self):
@@ -1097,30 +1192,92 @@ class ChromiumShadowRoot(BaseElement):
 
 
 class Ids(object):
-    def __init__(self, ele):
+    """保存元素的各种id，只记录创建元素时传入的id，其余的在首次使用时才获取"""
+
+    def __init__(self, ele, node_id=None, obj_id=None, backend_id=None):
+        """node_id、obj_id和backend_id必须至少传入一个
+        :param ele: 所属的元素对象
+        :param node_id: cdp中的node id
+        :param obj_id: js中的object id
+        :param backend_id: backend id
+        """
+        if not (node_id or obj_id or backend_id):
+            raise ElementLossError
         self._ele = ele
+        self._node_id = node_id
+        self._obj_id = obj_id
+        self._backend_id = backend_id
+        self._group = ele.page._object_group  # 创建时所在的objectGroup，之后获取的object id也只放在其中
 
     @property
     def node_id(self):
         """返回元素cdp中的node id"""
-        return self._ele._node_id
+        if not self._node_id:
+            self._node_id = self._ele.page.run_cdp('DOM.requestNode', objectId=self.obj_id)['nodeId']
+        return self._node_id
 
     @property
     def obj_id(self):
         """返回元素js中的object id"""
-        return self._ele._obj_id
+        if not self._obj_id:
+            self._obj_id = self._ele.page.run_cdp('DOM.resolveNode', **self._resolve_kwargs())['object']['objectId']
+        return self._obj_id
 
     @property
     def backend_id(self):
         """返回backend id"""
-        return self._ele._backend_id
+        if not self._backend_id:
+            self._describe()
+        return self._backend_id
+
+    def _resolve_kwargs(self):
+        """返回用DOM.resolveNode获取object id的参数"""
+        kwargs = {'backendNodeId': self._backend_id} if self._backend_id else {'nodeId': self._node_id}
+        if self._group:  # 不用页面当前的objectGroup，避免scope()之前创建的元素的id在退出时被释放
+            kwargs['objectGroup'] = self._group
+        return kwargs
+
+    def _cdp_kwargs(self):
+        """返回在cdp方法中指定本元素的参数，使用已有的id，不额外获取"""
+        if self._backend_id:
+            return {'backendNodeId': self._backend_id}
+        elif self._obj_id:
+            return {'objectId': self._obj_id}
+        return {'nodeId': self._node_id}
+
+    def _describe(self):
+        """调用DOM.describeNode获取节点信息，顺便记录backend id和node id
+        :return: 节点信息dict，包含localName、attributes等
+        """
+        node = self._ele.page.run_cdp('DOM.describeNode', **self._cdp_kwargs())['node']
+        self._backend_id = node['backendNodeId']
+        if not self._node_id and node.get('nodeId'):  # 未推送到前端的节点nodeId为0
+            self._node_id = node['nodeId']
+        return node
 
 
 class ChromiumElementIds(Ids):
+    def __init__(self, ele, node_id=None, obj_id=None, backend_id=None):
+        """node_id、obj_id和backend_id必须至少传入一个
+        :param ele: 所属的元素对象
+        :param node_id: cdp中的node id
+        :param obj_id: js中的object id
+        :param backend_id: backend id
+        """
+        super().__init__(ele, node_id=node_id, obj_id=obj_id, backend_id=backend_id)
+        self._doc_id = None
+
     @property
     def doc_id(self):
         """返回所在document的object id"""
-        return self._ele._doc_id
+        if self._doc_id is not None:
+            return self._doc_id
+
+        doc = self._ele.run_js('return this.ownerDocument;')
+        doc_id = doc['objectId'] if doc else None
+        if self._ele.page._object_group == self._group:  # 在其它scope()中获取的会随其释放，不缓存
+            self._doc_id = doc_id
+        return doc_id
 
 
 def find_in_chromium_ele(ele, loc, single=True, timeout=None, relative=True):
@@ -1134,23 +1291,19 @@ def find_in_chromium_ele(ele, loc, single=True, timeout=None, relative=True):
     """
     # ---------------处理定位符---------------
     if isinstance(loc, (str, tuple)):
-        loc = get_loc(loc)
+        loc = make_relative_loc(get_loc(loc), lambda: ele.css_path)
     else:
         raise ValueError(f"定位符必须为str或长度为2的tuple对象。现在是：{loc}")
 
-    loc_str = loc[1]
-    if loc[0] == 'xpath' and loc[1].lstrip().startswith('/'):
-        loc_str = f'.{loc_str}'
-    elif loc[0] == 'css selector' and loc[1].lstrip().startswith('>'):
-        loc_str = f'{ele.css_path}{loc[1]}'
-    loc = loc[0], loc_str
-
     timeout = timeout if timeout is not None else ele.page.timeout
 
     # ---------------执行查找-----------------
     if loc[0] == 'xpath':
         return find_by_xpath(ele, loc[1], single, timeout, relative=relative)
 
+    elif loc[0] == 'deep css':
+        return find_by_deep(ele, loc[1], single, timeout)
+
     else:
         return find_by_css(ele, loc[1], single, timeout)
 
@@ -1165,43 +1318,38 @@ def find_by_xpath(ele, xpath, single, timeout, relative=True):
     :return: ChromiumElement或其组成的列表
     """
     type_txt = '9' if single else '7'
-    node_txt = 'this.contentDocument' if ele.tag in FRAME_ELEMENT and not relative else 'this'
-    js = make_js_for_find_ele_by_xpath(xpath, type_txt, node_txt)
-    r = ele.page.run_cdp('Runtime.callFunctionOn',
-                         functionDeclaration=js, objectId=ele.ids.obj_id, returnByValue=False, awaitPromise=True,
-                         userGesture=True)
+    in_doc = ele.tag in FRAME_ELEMENT and not relative
+    r = call_helper(ele.page, ele.ids.obj_id, 'findXpath', (xpath, int(type_txt), in_doc), by_value=False)
     if r['result']['type'] == 'string':
         return r['result']['value']
 
     if 'exceptionDetails' in r:
         if 'The result is not a node set' in r['result']['description']:
-            js = make_js_for_find_ele_by_xpath(xpath, '1', node_txt)
-            r = ele.page.run_cdp('Runtime.callFunctionOn',
-                                 functionDeclaration=js, objectId=ele.ids.obj_id, returnByValue=False,
-                                 awaitPromise=True,
-                                 userGesture=True)
+            r = call_helper(ele.page, ele.ids.obj_id, 'findXpath', (xpath, 1, in_doc), by_value=False)
             return r['result']['value']
         else:
             raise SyntaxError(f'查询语句错误：\n{r}')
 
+    # 等待时在页面中反复执行，须发送完整的查找函数
+    js = make_js_for_find_ele_by_xpath(xpath, type_txt, 'this.contentDocument' if in_doc else 'this')
     end_time = perf_counter() + timeout
-    while (r['result']['subtype'] == 'null'
-           or r['result']['description'] == 'NodeList(0)') and perf_counter() < end_time:
-        r = ele.page.run_cdp('Runtime.callFunctionOn',
-                             functionDeclaration=js, objectId=ele.ids.obj_id, returnByValue=False, awaitPromise=True,
-                             userGesture=True)
+    while is_empty_result(r['result']) and perf_counter() < end_time:
+        if 'objectId' in r['result']:  # 释放上一次查询得到的空NodeList
+            ele.page._release_object(r['result']['objectId'])
+        r = wait_in_page(ele.page, ele.ids.obj_id, js, end_time - perf_counter())
+
+    if r['result']['type'] == 'string':
+        return r['result']['value']
 
     if single:
         return NoneElement() if r['result']['subtype'] == 'null' \
-            else make_chromium_ele(ele.page, obj_id=r['result']['objectId'])
+            else make_chromium_ele(ele.page, obj_id=r['result']['objectId'], class_name=r['result'].get('className'))
 
-    if r['result']['description'] == 'NodeList(0)':
+    if r['result']['description'] in ('NodeList(0)', 'Array(0)'):
+        ele.page._release_object(r['result']['objectId'])
         return []
     else:
-        r = ele.page.run_cdp('Runtime.getProperties', objectId=r['result']['objectId'], ownProperties=True)['result']
-        return [make_chromium_ele(ele.page, obj_id=i['value']['objectId'])
-                if i['value']['type'] == 'object' else i['value']['value']
-                for i in r[:-1]]
+        return make_chromium_eles(ele.page, list_obj_id=r['result']['objectId'])
 
 
 def find_by_css(ele, selector, single, timeout):
@@ -1212,49 +1360,633 @@ def find_by_css(ele, selector, single, timeout):
     :param timeout: 超时时间
     :return: ChromiumElement或其组成的列表
     """
-    selector = selector.replace('"', r'\"')
-    find_all = '' if single else 'All'
     node_txt = 'this.contentDocument' if ele.tag in ('iframe', 'frame', 'shadow-root') else 'this'
-    js = f'function(){{return {node_txt}.querySelector{find_all}("{selector}");}}'
+    js = make_js_for_find_ele_by_css(selector, single, node_txt)
     r = ele.page.run_cdp('Runtime.callFunctionOn',
                          functionDeclaration=js, objectId=ele.ids.obj_id, returnByValue=False, awaitPromise=True,
-                         userGesture=True)
+                         userGesture=True, **_group_arg(ele.page))
     if 'exceptionDetails' in r:
         raise SyntaxError(f'查询语句错误：\n{r}')
 
     end_time = perf_counter() + timeout
-    while (r['result']['subtype'] == 'null'
-           or r['result']['description'] == 'NodeList(0)') and perf_counter() < end_time:
-        r = ele.page.run_cdp('Runtime.callFunctionOn',
-                             functionDeclaration=js, objectId=ele.ids.obj_id, returnByValue=False, awaitPromise=True,
-                             userGesture=True)
+    while is_empty_result(r['result']) and perf_counter() < end_time:
+        if 'objectId' in r['result']:  # 释放上一次查询得到的空NodeList
+            ele.page._release_object(r['result']['objectId'])
+        r = wait_in_page(ele.page, ele.ids.obj_id, js, end_time - perf_counter())
 
     if single:
         return NoneElement() if r['result']['subtype'] == 'null' \
-            else make_chromium_ele(ele.page, obj_id=r['result']['objectId'])
+            else make_chromium_ele(ele.page, obj_id=r['result']['objectId'], class_name=r['result'].get('className'))
 
     if r['result']['description'] == 'NodeList(0)':
+        ele.page._release_object(r['result']['objectId'])
+        return []
+    else:
+        return make_chromium_eles(ele.page, list_obj_id=r['result']['objectId'])
+
+
+def find_by_deep(page_or_ele, selector, single, timeout):
+    """用css selector查找元素，穿透所有open shadow root，整个查找在页面中一次完成
+    :param page_or_ele: 页面对象、ChromiumElement或ChromiumShadowRoot对象
+    :param selector: css selector，可用>>>分隔多段
+    :param single: 是否只返回第一个结果
+    :param timeout: 超时时间
+    :return: ChromiumElement或其组成的列表
+    """
+    if isinstance(page_or_ele, BaseElement):
+        page, obj_id = page_or_ele.page, page_or_ele.ids.obj_id
+    else:
+        page, obj_id = page_or_ele, page_or_ele._root_id
+
+    js = make_js_for_find_ele_by_deep(selector, single)
+    # shadow root中的变化不会通知到文档的MutationObserver，所以同时定时检查
+    r = wait_in_page(page, obj_id, js, timeout, .1)
+    if 'exceptionDetails' in r:
+        raise SyntaxError(f'查询语句错误：\n{r}')
+
+    if single:
+        return NoneElement() if r['result'].get('subtype', None) == 'null' \
+            else make_chromium_ele(page, obj_id=r['result']['objectId'], class_name=r['result'].get('className'))
+
+    if r['result'].get('description', None) == 'Array(0)':
+        page._release_object(r['result']['objectId'])
         return []
+    return make_chromium_eles(page, list_obj_id=r['result']['objectId'])
+
+
+def find_any(page_or_ele, locs, timeout=None, raise_err=None):
+    """在页面或元素中同时查找多个定位符，用一个js函数按顺序检查全部定位符，都没有结果时在页面中等待，
+    有任意一个出现即返回，整个过程只需一次cdp调用
+    :param page_or_ele: 页面对象或ChromiumElement对象，在元素中查找时定位符为相对定位
+    :param locs: 定位符组成的列表或元组，同时出现时以排在前面的为准
+    :param timeout: 超时时间，为None时使用页面timeout
+    :param raise_err: 找不到元素是是否抛出异常，为None时根据全局设置
+    :return: (定位符在locs中的序号, 元素对象或属性、文本)，都找不到时返回(None, NoneElement)
+    """
+    if isinstance(page_or_ele, ChromiumElement):
+        page, obj_id = page_or_ele.page, page_or_ele.ids.obj_id
     else:
-        r = ele.page.run_cdp('Runtime.getProperties', objectId=r['result']['objectId'], ownProperties=True)['result']
-        return [make_chromium_ele(ele.page, obj_id=i['value']['objectId']) for i in r]
+        page, obj_id = page_or_ele, page_or_ele._root_id
 
+    items = []
+    for loc in locs:
+        if not isinstance(loc, (str, tuple)):
+            raise ValueError(f"定位符必须为str或长度为2的tuple对象。现在是：{loc}")
+        loc = get_loc(loc)
+        loc_str = loc[1]
+        if page is not page_or_ele:
+            if loc[0] == 'xpath' and loc[1].lstrip().startswith('/'):
+                loc_str = f'.{loc_str}'
+            elif loc[0] == 'css selector' and loc[1].lstrip().startswith('>'):
+                loc_str = f'{page_or_ele.css_path}{loc[1]}'
+            elif loc[0] == 'deep css' and loc[1].lstrip().startswith('>'):
+                loc_str = f':scope{loc[1]}'
+        items.append([JS_LOC_TYPES[loc[0]], loc_str])
+
+    js = f'''function(){{{DEEP_QUERY_JS}
+var locs = {dumps(items)}, doc = this.ownerDocument || this;
+for (var i = 0; i < locs.length; i++) {{
+    var r = locs[i][0] === 1 ? doc.evaluate(locs[i][1], this, null, 9, null).singleNodeValue
+          : locs[i][0] === 2 ? deepQuery(this, locs[i][1], false) : this.querySelector(locs[i][1]);
+    if (r) {{return [i, r.nodeType === 1 ? r : r.nodeValue];}}
+}}
+return null;}}'''
+    timeout = timeout if timeout is not None else page.timeout
+    interval = .1 if any(i[0] == 2 for i in items) else None
+    r = wait_in_page(page, obj_id, js, timeout, interval)
+    if 'exceptionDetails' in r:
+        raise SyntaxError(f'查询语句错误：\n{r}')
+
+    if 'objectId' not in r['result']:
+        if raise_err is not False and (Settings.raise_ele_not_found or raise_err is True):
+            raise ElementNotFoundError
+        return None, NoneElement()
+
+    props, _ = page.run_cdp_many([('Runtime.getProperties', {'objectId': r['result']['objectId'],
+                                                             'ownProperties': True}),
+                                  ('Runtime.releaseObject', {'objectId': r['result']['objectId']})])
+    props = {i['name']: i['value'] for i in props['result'] if i['name'].isdigit()}
+    value = props['1']
+    if value['type'] == 'object' and value.get('subtype') == 'node':
+        return props['0']['value'], make_chromium_ele(page, obj_id=value['objectId'],
+                                                      class_name=value.get('className'))
+    return props['0']['value'], value.get('value')
 
-def make_chromium_ele(page, node_id=None, obj_id=None):
+
+def make_chromium_ele(page, node_id=None, obj_id=None, class_name=None):
     """根据node id或object id生成相应元素对象
     :param page: ChromiumPage对象
     :param node_id: 元素的node id
     :param obj_id: 元素的object id
+    :param class_name: js对象的className，传入时据此判断是否frame元素，不用再获取tag
     :return: ChromiumElement对象或ChromiumFrame对象
     """
     ele = ChromiumElement(page, obj_id=obj_id, node_id=node_id)
-    if ele.tag in FRAME_ELEMENT:
+    if (class_name in FRAME_CLASS_NAMES) if class_name else (ele.tag in FRAME_ELEMENT):
         from .chromium_frame import ChromiumFrame
         ele = ChromiumFrame(page, ele)
 
     return ele
 
 
+def make_chromium_eles(page, node_ids=None, list_obj_id=None):
+    """批量生成元素对象，cdp往返次数固定为1次，不随元素数量增长
+    传入node_ids时（DOM.performSearch的结果），用一批并发的DOM.describeNode获取每个元素的tag和backend id，
+    共N条消息、1次往返；传入list_obj_id时（js返回的NodeList或数组），同时发送Runtime.getProperties
+    和一个按值返回全部tag的js调用，并在同一批中释放列表对象，共3条消息、1次往返。其余id在使用时才获取
+    :param page: 元素所在页面对象
+    :param node_ids: 元素node id组成的列表
+    :param list_obj_id: NodeList或数组的object id，其中不是元素的项（如xpath获取的文本）直接返回其值
+    :return: ChromiumElement、ChromiumFrame或文本组成的列表
+    """
+    if node_ids is not None:
+        nodes = page.run_cdp_many([('DOM.describeNode', {'nodeId': i}) for i in node_ids])
+        return [_make_ele_with_tag(page, n['node']['localName'], node_id=i, backend_id=n['node']['backendNodeId'])
+                for i, n in zip(node_ids, nodes)]
+
+    js = ('function(){return Array.prototype.map.call(this, '
+          'function(n){return n && n.nodeType === 1 ? n.localName : null;});}')
+    props, tags, _ = page.run_cdp_many([('Runtime.getProperties', {'objectId': list_obj_id, 'ownProperties': True}),
+                                        ('Runtime.callFunctionOn', {'functionDeclaration': js, 'objectId': list_obj_id,
+                                                                    'returnByValue': True}),
+                                        ('Runtime.releaseObject', {'objectId': list_obj_id})])
+    tags = tags['result']['value']
+    eles = []
+    for i in props['result']:
+        if not i['name'].isdigit():  # 跳过数组的length等属性
+            continue
+        value = i['value']
+        tag = tags[int(i['name'])]
+        if value['type'] == 'object' and tag:
+            eles.append(_make_ele_with_tag(page, tag, obj_id=value['objectId']))
+        elif value['type'] == 'object':
+            eles.append(make_chromium_ele(page, obj_id=value['objectId'], class_name=value.get('className')))
+        else:
+            eles.append(value.get('value'))
+    return eles
+
+
+def resolve_obj_ids(page, eles):
+    """给还没有object id的元素批量获取，用一批并发的DOM.resolveNode完成，共1次往返
+    :param page: 元素所在页面对象
+    :param eles: ChromiumElement组成的列表
+    :return: None
+    """
+    ids = [i.ids for i in eles if not i.ids._obj_id]
+    if ids:
+        r = page.run_cdp_many([('DOM.resolveNode', i._resolve_kwargs()) for i in ids])
+        for i, obj in zip(ids, r):
+            i._obj_id = obj['object']['objectId']
+
+
+def _make_ele_with_tag(page, tag, node_id=None, obj_id=None, backend_id=None):
+    """用已知的tag生成元素对象，不再向浏览器获取
+    :param page: 元素所在页面对象
+    :param tag: 元素tag
+    :param node_id: 元素的node id
+    :param obj_id: 元素的object id
+    :param backend_id: 元素的backend id
+    :return: ChromiumElement对象或ChromiumFrame对象
+    """
+    ele = ChromiumElement(page, node_id=node_id, obj_id=obj_id, backend_id=backend_id)
+    ele._tag = tag.lower()
+    if ele._tag in FRAME_ELEMENT:
+        from .chromium_frame import ChromiumFrame
+        ele = ChromiumFrame(page, ele)
+    return ele
+
+
+SNAPSHOT_FIELDS = ('tag', 'attrs', 'text', 'raw_text', 'html', 'inner_html', 'size', 'location',
+                   'viewport_location', 'is_displayed', 'is_enabled', 'is_selected', 'xpath', 'css_path')
+
+
+class ElementSnapshot(object):
+    """元素某一时刻的数据，由ChromiumElement.snapshot()或ChromiumBase.snapshots()生成"""
+    __slots__ = SNAPSHOT_FIELDS + ('fields',)
+
+    def __init__(self, fields, data):
+        """
+        :param fields: 获取了的项
+        :param data: js返回的数据dict
+        """
+        self.fields = fields
+        for i in SNAPSHOT_FIELDS:
+            setattr(self, i, data.get(i, None))
+
+    def as_dict(self):
+        """以dict形式返回获取了的项"""
+        return {i: getattr(self, i) for i in self.fields}
+
+    def __repr__(self):
+        return f'<ElementSnapshot {" ".join(f"{k}={v!r}" for k, v in self.as_dict().items())}>'
+
+
+def make_js_for_snapshot(fields):
+    """生成获取元素数据的js函数文本，函数对传入的每个元素返回一个dict
+    :param fields: 要获取的项组成的tuple
+    :return: js文本
+    """
+    items = {
+        'tag': 'r.tag = el.localName;',
+        'attrs': 'r.attrs = {}; for (var i = 0; i < el.attributes.length; i++) '
+                 '{r.attrs[el.attributes[i].name] = el.attributes[i].value;}',
+        'text': 'r.text = eleTxt(el);',
+        'raw_text': 'r.raw_text = el.innerText;',
+        'html': 'r.html = el.outerHTML;',
+        'inner_html': 'r.inner_html = el.innerHTML;',
+        'size': 'r.size = [Math.round(rect.height), Math.round(rect.width)];',
+        'location': 'r.location = [Math.trunc(rect.left) + visualViewport.pageLeft, '
+                    'Math.trunc(rect.top) + visualViewport.pageTop];',
+        'viewport_location': 'r.viewport_location = [Math.trunc(rect.left), Math.trunc(rect.top)];',
+        'is_displayed': 'var s = getComputedStyle(el); '
+                        'r.is_displayed = !(s.visibility == "hidden" || el.offsetParent === null '
+                        '|| s.display == "none");',
+        'is_enabled': 'r.is_enabled = !el.disabled;',
+        'is_selected': 'r.is_selected = el.selected === undefined ? null : el.selected;',
+        'xpath': 'r.xpath = elePath(el, true);',
+        'css_path': 'r.css_path = ":root" + elePath(el, false);',
+    }
+    body = '\n'.join(items[i] for i in fields)
+    return '''function(){
+''' + (ELE_TXT_JS if 'text' in fields else '') + '''
+''' + (ELE_PATH_JS if 'xpath' in fields or 'css_path' in fields else '') + '''
+return Array.prototype.map.call(arguments, function(el){
+    var r = {}, rect = el.getBoundingClientRect();
+''' + body + '''
+    return r;});}'''
+
+
+def snapshot_eles(eles, fields=None):
+    """用一次js调用获取多个元素的数据，元素须在同一页面中
+    :param eles: ChromiumElement或ChromiumFrame组成的列表，其中的文本原样返回
+    :param fields: 要获取的项组成的列表，可选项见SNAPSHOT_FIELDS，为None时获取全部
+    :return: ElementSnapshot或文本组成的列表
+    """
+    if isinstance(fields, str):
+        fields = (fields,)
+    fields = tuple(fields) if fields else SNAPSHOT_FIELDS
+    for i in fields:
+        if i not in SNAPSHOT_FIELDS:
+            raise ValueError(f'fields参数只能包含{SNAPSHOT_FIELDS}中的项，现在是：{i}。')
+
+    nodes = [i.frame_ele if str(type(i)).endswith(".ChromiumFrame'>") else i
+             for i in eles if not isinstance(i, str)]
+    if not nodes:
+        return list(eles)
+
+    page = nodes[0].page
+    resolve_obj_ids(page, nodes)
+    r = page.run_cdp('Runtime.callFunctionOn', functionDeclaration=make_js_for_snapshot(fields),
+                     objectId=nodes[0].ids.obj_id, arguments=[{'objectId': i.ids.obj_id} for i in nodes],
+                     returnByValue=True)
+    if 'exceptionDetails' in r:
+        raise JavaScriptError(f'\njavascript运行错误：\n{r["exceptionDetails"]}')
+
+    data = iter(r['result']['value'])
+    results = []
+    for i in eles:
+        if isinstance(i, str):
+            results.append(i)
+            continue
+        d = next(data)
+        if 'text' in d:
+            d['text'] = ele_txt_by_js(d['text'])
+        for k in ('size', 'location', 'viewport_location'):
+            if k in d:
+                d[k] = tuple(d[k])
+        results.append(ElementSnapshot(fields, d))
+    return results
+
+
+class ChromiumElementList(list):
+    """eles()返回的元素列表，批量获取数据或执行操作时，所有元素用一次js调用完成，元素须在同一页面中
+    列表中xpath获取到的文本原样保留，texts()返回其本身，其它方法对其返回None"""
+
+    def attrs(self, name):
+        """返回所有元素的一个attribute属性值
+        :param name: 属性名
+        :return: 属性值组成的列表，没有该属性时为None
+        """
+        return self._run(f'function(e){{return e.getAttribute({dumps(name)});}}')
+
+    def props(self, name):
+        """返回所有元素的一个property属性值，值须能转换为json
+        :param name: 属性名
+        :return: 属性值组成的列表
+        """
+        return self._run(f'function(e){{var v = e[{dumps(name)}]; return v === undefined ? null : v;}}')
+
+    def texts(self):
+        """返回所有元素的文本
+        :return: 文本组成的列表
+        """
+        return [i if isinstance(i, str) else ele_txt_by_js(i)
+                for i in self._run(f'function(e){{{ELE_TXT_JS}\nreturn eleTxt(e);}}', keep_str=True)]
+
+    def links(self):
+        """返回所有元素的href或src绝对url
+        :return: url组成的列表
+        """
+        return self._run('''function(e){var v = e.getAttribute('href') || e.getAttribute('src');
+if (v === null) {return null;}
+try {return new URL(v, e.baseURI).href;} catch (err) {return v;}}''')
+
+    def filter(self, loc):
+        """返回符合定位符的元素，定位符在页面中只执行一次
+        :param loc: 定位符，元素本身符合该定位符时保留
+        :return: 由符合的元素组成的新ChromiumElementList
+        """
+        loc = get_loc(loc)
+        matched = self._run(f'''function(){{
+{DEEP_QUERY_JS}
+var loc = {dumps([JS_LOC_TYPES[loc[0]], loc[1]])}, doc = arguments[0].ownerDocument, nodes = null;
+if (loc[0] === 1) {{
+    var r = doc.evaluate(loc[1], doc, null, 7, null);
+    nodes = new Set();
+    for (var i = 0; i < r.snapshotLength; i++) {{nodes.add(r.snapshotItem(i));}}
+}} else if (loc[0] === 2) {{
+    nodes = new Set(deepQuery(doc, loc[1], true));
+}}
+return Array.prototype.map.call(arguments, function(e){{return nodes ? nodes.has(e) : e.matches(loc[1]);}});}}''',
+                            as_func=False)
+        return ChromiumElementList(i for i, ok in zip(self, matched) if ok)
+
+    def click(self):
+        """用js点击所有元素
+        :return: None
+        """
+        self._run('function(e){e.click(); return true;}')
+
+    def _run(self, js, as_func=True, keep_str=False):
+        """对所有元素执行js，用一次cdp调用完成
+        :param js: js函数文本，as_func为True时是对单个元素执行的函数，否则是以全部元素为参数、返回数组的函数
+        :param as_func: js是否对单个元素执行的函数
+        :param keep_str: 列表中的文本是否原样返回，为False时返回None
+        :return: 结果组成的列表，与列表中的项一一对应
+        """
+        nodes = [i.frame_ele if str(type(i)).endswith(".ChromiumFrame'>") else i
+                 for i in self if not isinstance(i, str)]
+        values = []
+        if nodes:
+            resolve_obj_ids(nodes[0].page, nodes)
+            if as_func:
+                js = f'function(){{return Array.prototype.map.call(arguments, {js});}}'
+            r = nodes[0].page.run_cdp('Runtime.callFunctionOn', functionDeclaration=js,
+                                      objectId=nodes[0].ids.obj_id, returnByValue=True, userGesture=True,
+                                      arguments=[{'objectId': i.ids.obj_id} for i in nodes])
+            if 'exceptionDetails' in r:
+                raise JavaScriptError(f'\njavascript运行错误：\n{r["exceptionDetails"]}')
+            values = r['result']['value']
+
+        values = iter(values)
+        return [(i if keep_str else None) if isinstance(i, str) else next(values) for i in self]
+
+
+def extract_in_chromium(page_or_ele, schema):
+    """在页面或元素中按schema获取数据，用一次js调用完成
+    :param page_or_ele: 页面对象或ChromiumElement对象
+    :param schema: {字段名: 规则}格式的dict，规则格式见parse_schema()
+    :return: 与schema结构对应的dict
+    """
+    if isinstance(page_or_ele, ChromiumElement):
+        page, obj_id = page_or_ele.page, page_or_ele.ids.obj_id
+    else:
+        page, obj_id = page_or_ele, page_or_ele._root_id
+
+    schema = parse_schema(schema)
+    r = page.run_cdp('Runtime.callFunctionOn', functionDeclaration=make_js_for_extract(schema),
+                     objectId=obj_id, returnByValue=True, awaitPromise=True, userGesture=True)
+    if 'exceptionDetails' in r:
+        raise SyntaxError(f'查询语句错误：\n{r}')
+    return _format_extract_result(schema, r['result']['value'])
+
+
+def make_js_for_extract(schema):
+    """生成按schema获取数据的js函数文本
+    :param schema: parse_schema()处理过的schema
+    :return: js文本
+    """
+    def to_js(s):
+        rules = {}
+        for name, rule in s.items():
+            loc = rule['loc']
+            if loc is not None:
+                loc_str = loc[1]
+                if loc[0] == 'xpath' and loc_str.lstrip().startswith('/'):
+                    loc_str = f'.{loc_str}'
+                elif loc[0] != 'xpath' and loc_str.lstrip().startswith('>'):
+                    loc_str = f':scope{loc_str}'
+                loc = [JS_LOC_TYPES[loc[0]], loc_str]
+            rule = dict(rule, loc=loc)
+            if 'fields' in rule:
+                rule['fields'] = to_js(rule['fields'])
+            rules[name] = rule
+        return rules
+
+    return '''function(){
+''' + ELE_TXT_JS + '''
+''' + DEEP_QUERY_JS + '''
+function node(n){return n.nodeType === 1 ? n : n.nodeValue;}
+function find(ctx, loc, all){
+    if (!loc) {return all ? [ctx] : ctx;}
+    if (loc[0] === 2) {return deepQuery(ctx, loc[1], all);}
+    if (loc[0] === 1) {
+        var doc = ctx.ownerDocument || ctx;
+        if (!all) {var n = doc.evaluate(loc[1], ctx, null, 9, null).singleNodeValue; return n ? node(n) : null;}
+        var r = doc.evaluate(loc[1], ctx, null, 7, null), a = [];
+        for (var i = 0; i < r.snapshotLength; i++) {a.push(node(r.snapshotItem(i)));}
+        return a;
+    }
+    return all ? Array.prototype.slice.call(ctx.querySelectorAll(loc[1])) : ctx.querySelector(loc[1]);
+}
+function value(e, attr){
+    if (e === null) {return null;}
+    if (typeof e === 'string') {return attr === 'text' ? [true, e] : e;}
+    switch (attr) {
+        case 'text': return eleTxt(e);
+        case 'raw_text': return e.innerText;
+        case 'html': return e.outerHTML;
+        case 'inner_html': return e.innerHTML;
+        case 'tag': return e.localName;
+        case 'link':
+            var v = e.getAttribute('href') || e.getAttribute('src');
+            if (v === null) {return null;}
+            try {return new URL(v, e.baseURI).href;} catch (err) {return v;}
+        default: return e.getAttribute(attr);
+    }
+}
+function run(ctx, schema){
+    var data = {};
+    for (var k in schema) {
+        var s = schema[k];
+        if (s.fields && s.rows) {
+            data[k] = find(ctx, s.loc, true).filter(function(e){return typeof e !== 'string';})
+                                            .map(function(e){return run(e, s.fields);});
+        } else if (s.fields) {
+            var e = find(ctx, s.loc, false);
+            data[k] = e && typeof e !== 'string' ? run(e, s.fields) : null;
+        } else if (s.all) {
+            data[k] = find(ctx, s.loc, true).map(function(e){return value(e, s.attr);});
+        } else {
+            data[k] = value(find(ctx, s.loc, false), s.attr);
+        }
+    }
+    return data;
+}
+return run(this, ''' + dumps(to_js(schema)) + ''');}'''
+
+
+def _format_extract_result(schema, data):
+    """处理extract的js按值返回的结果，把eleTxt()的结果转换为文本
+    :param schema: parse_schema()处理过的schema
+    :param data: js返回的dict
+    :return: 处理后的dict
+    """
+    for name, rule in schema.items():
+        value = data.get(name, None)
+        if value is None:
+            continue
+        if 'fields' in rule:
+            data[name] = [_format_extract_result(rule['fields'], i) for i in value] if rule['rows'] \
+                else _format_extract_result(rule['fields'], value)
+        elif rule['attr'] == 'text':
+            data[name] = [ele_txt_by_js(i) for i in value] if rule['all'] else ele_txt_by_js(value)
+    return data
+
+
+def make_js_for_wait(js, timeout, interval=None):
+    """把查找用的js函数包装成等待函数，先执行一次，没有结果时用MutationObserver监听DOM变化，
+    每次变化后重新执行，有结果或超时时才返回，等待期间不需要python端轮询
+    元素在shadow root中时，从其所在根节点到文档的每一层都会监听
+    :param js: js函数文本，this为查找起点，没有结果时返回null、undefined或空列表；
+               定时检查、第一次和超时时以true为参数调用，可借此查找MutationObserver看不到的地方，如iframe
+    :param timeout: 超时时间（秒）
+    :param interval: 除DOM变化外，每隔多少秒再执行一次，用于检查不引起DOM变化的状态，如样式，为None时不定时执行
+    :return: 包装后的js函数文本，返回js函数最后一次的结果
+    """
+    timer = f'p = setInterval(function(){{check(true);}}, {int(interval * 1000)});' if interval else ''
+    return '''function(){
+var query = (''' + js + ''').bind(this), node = this.contentDocument || this, roots = [];
+node = node.getRootNode ? node.getRootNode() : node;
+while (node) {roots.push(node); node = node.host ? node.host.getRootNode() : null;}
+function found(r){return r !== null && r !== undefined
+                         && !(typeof r === 'object' && typeof r.length === 'number' && r.length === 0);}
+var r = query(true);
+if (found(r)) {return r;}
+return new Promise(function(resolve, reject){
+    var done = false, ob = null, t = null, p = null;
+    function finish(v){
+        if (done) {return;}
+        done = true; ob.disconnect(); clearTimeout(t); if (p) {clearInterval(p);} resolve(v);
+    }
+    function check(deep){
+        if (done) {return;}
+        try {var r = query(deep); if (found(r)) {finish(r);}}
+        catch (e) {done = true; ob.disconnect(); clearTimeout(t); if (p) {clearInterval(p);} reject(e);}
+    }
+    ob = new MutationObserver(function(){check(false);});
+    roots.forEach(function(i){ob.observe(i, {childList: true, subtree: true, attributes: true, characterData: true});});
+    t = setTimeout(function(){
+        if (done) {return;}
+        try {finish(query(true));} catch (e) {finish(null);}
+    }, ''' + str(max(int(timeout * 1000), 0)) + ''');
+    ''' + timer + '''
+});}'''
+
+
+def wait_in_page(page, obj_id, js, timeout, interval=None, by_value=False):
+    """执行make_js_for_wait()包装的等待函数，python端同样按超时时间等待，页面没有按时返回时视为没有结果
+    :param page: 页面对象
+    :param obj_id: 作为this的对象的object id
+    :param js: 查找用的js函数文本，见make_js_for_wait()
+    :param timeout: 超时时间（秒）
+    :param interval: 定时检查的间隔（秒），见make_js_for_wait()
+    :param by_value: 是否按值返回
+    :return: Runtime.callFunctionOn的结果，超时时result为null
+    """
+    timeout = max(timeout, 0)
+    try:
+        return page.run_cdp('Runtime.callFunctionOn', functionDeclaration=make_js_for_wait(js, timeout, interval),
+                            objectId=obj_id, returnByValue=by_value, awaitPromise=True, userGesture=True,
+                            _timeout=timeout + WAIT_MARGIN, **_group_arg(page))
+    except TimeoutError:
+        return {'result': {'type': 'object', 'subtype': 'null', 'value': None}}
+
+
+def make_js_for_find_all(loc):
+    """生成在文档中查找所有符合定位符的节点的js函数文本，this为文档
+    :param loc: 定位元组
+    :return: js文本，返回元素或文本组成的数组
+    """
+    return f'''function(){{{DEEP_QUERY_JS}
+var loc = {dumps([JS_LOC_TYPES[loc[0]], loc[1]])};
+if (loc[0] === 2) {{return deepQuery(this, loc[1], true);}}
+if (loc[0] === 0) {{return Array.prototype.slice.call(this.querySelectorAll(loc[1]));}}
+var r = this.evaluate(loc[1], this, null, 7, null), a = [];
+for (var i = 0; i < r.snapshotLength; i++) {{var n = r.snapshotItem(i); a.push(n.nodeType === 1 ? n : n.nodeValue);}}
+return a;}}'''
+
+
+def make_relative_loc(loc, css_prefix=None):
+    """把在元素中查找用的定位元组转换为相对于该元素的
+    :param loc: 定位元组
+    :param css_prefix: 拼接在以>开头的css selector前面的文本，可传入返回该文本的方法，需要时才调用，为None时使用:scope
+    :return: 转换后的定位元组
+    """
+    loc_type, loc_str = loc
+    if loc_type == 'xpath' and loc_str.lstrip().startswith('/'):
+        loc_str = f'.{loc_str}'
+    elif loc_type == 'css selector' and loc_str.lstrip().startswith('>'):
+        css_prefix = css_prefix() if callable(css_prefix) else css_prefix
+        loc_str = f'{":scope" if css_prefix is None else css_prefix}{loc_str}'
+    elif loc_type == 'deep css' and loc_str.lstrip().startswith('>'):
+        loc_str = f':scope{loc_str}'
+    return loc_type, loc_str
+
+
+def make_js_for_find(loc, single, node_txt='this'):
+    """生成用定位元组在节点中查找元素的js函数文本
+    :param loc: 定位元组
+    :param single: 是否只返回第一个结果
+    :param node_txt: 在其中查找的节点
+    :return: js文本
+    """
+    if loc[0] == 'xpath':
+        return make_js_for_find_ele_by_xpath(loc[1], '9' if single else '7', node_txt)
+    elif loc[0] == 'deep css':
+        return make_js_for_find_ele_by_deep(loc[1], single)
+    return make_js_for_find_ele_by_css(loc[1], single, node_txt)
+
+
+def make_js_for_find_ele_by_css(selector, single, node_txt):
+    """生成用css selector在元素中查找元素的js文本
+    :param selector: css selector
+    :param single: 是否只返回第一个结果
+    :param node_txt: 在其中查找的节点
+    :return: js文本
+    """
+    selector = selector.replace('"', r'\"')
+    return f'function(){{return {node_txt}.querySelector{"" if single else "All"}("{selector}");}}'
+
+
+def make_js_for_find_ele_by_deep(selector, single):
+    """生成穿透shadow root查找元素的js文本
+    :param selector: css selector，可用>>>分隔多段
+    :param single: 是否只返回第一个结果
+    :return: js文本
+    """
+    return (f'function(){{{DEEP_QUERY_JS}\n'
+            f'return deepQuery(this.contentDocument || this, {dumps(selector)}, {"false" if single else "true"});}}')
+
+
+def is_empty_result(result):
+    """返回查找元素的结果是否为空
+    :param result: cdp返回的RemoteObject
+    :return: bool
+    """
+    return result.get('subtype', None) == 'null' or result.get('description', None) in ('NodeList(0)', 'Array(0)')
+
+
 def make_js_for_find_ele_by_xpath(xpath, type_txt, node_txt):
     """生成用xpath在元素中查找元素的js文本
     :param xpath: xpath文本
@@ -1297,13 +2029,15 @@ else{a.push(e.snapshotItem(i));}}"""
     return js
 
 
-def run_js(page_or_ele, script, as_expr=False, timeout=None, args=None):
+def run_js(page_or_ele, script, as_expr=False, timeout=None, args=None, by_value=False):
     """运行javascript代码
     :param page_or_ele: 页面对象或元素对象
     :param script: js文本
     :param as_expr: 是否作为表达式运行，为True时args无效
     :param timeout: 超时时间
     :param args: 参数，按顺序在js文本中对应argument[0]、argument[1]...
+    :param by_value: 是否按值返回结果，为True时结果在页面中转换为json，与执行在同一次调用中返回，
+                     其中的节点再用一次调用批量获取；作为表达式运行且结果是对象时，转换需多一次调用
     :return: js执行结果
     """
     if isinstance(page_or_ele, (ChromiumElement, ChromiumShadowRoot)):
@@ -1316,17 +2050,21 @@ def run_js(page_or_ele, script, as_expr=False, timeout=None, args=None):
         is_page = True
 
     try:
-        if as_expr:
-            res = page.run_cdp('Runtime.evaluate', expression=script, returnByValue=False,
-                               awaitPromise=True, userGesture=True, timeout=timeout * 1000)
+        if as_expr and page._script_cache is not None:
+            res = _run_cached_script(page, script)
 
         else:
-            args = args or ()
-            if not is_js_func(script):
-                script = f'function(){{{script}}}'
-            res = page.run_cdp('Runtime.callFunctionOn', functionDeclaration=script, objectId=obj_id,
-                               arguments=[convert_argument(arg) for arg in args], returnByValue=False,
-                               awaitPromise=True, userGesture=True)
+            cmd, cmd_args = make_run_js_cmd(script, as_expr, timeout, obj_id,
+                                            [convert_argument(arg) for arg in args or ()], by_value)
+            res = page.run_cdp(cmd, **cmd_args, **_group_arg(page))
+
+        if by_value and as_expr and res and 'exceptionDetails' not in res:
+            if 'objectId' in res['result']:  # 表达式结果是对象，在页面中转换为json
+                res_id = res['result']['objectId']
+                res = call_helper(page, res_id, 'packValue', by_value=False)
+                page._release_object(res_id)
+            else:  # 结果已按值返回
+                by_value = False
 
     except ContextLossError:
         if is_page:
@@ -1342,61 +2080,196 @@ def run_js(page_or_ele, script, as_expr=False, timeout=None, args=None):
         raise JavaScriptError(f'\njavascript运行错误：\n{script}\n错误信息: \n{exceptionDetails}')
 
     try:
+        if by_value:
+            return parse_by_value_result(page, page_or_ele, res['result'])
         return parse_js_result(page, page_or_ele, res.get('result'))
     except Exception:
         return res
 
 
+def make_run_js_cmd(script, as_expr, timeout, obj_id, arguments, by_value=False):
+    """生成运行js的cdp语句
+    :param script: js文本
+    :param as_expr: 是否作为表达式运行，为True时obj_id和arguments无效
+    :param timeout: 作为表达式运行时的超时时间
+    :param obj_id: 作为this的js对象id
+    :param arguments: 已转换的参数列表
+    :param by_value: 是否按值返回结果，只对非表达式有效
+    :return: (cdp方法名, 参数dict)
+    """
+    if as_expr:
+        return 'Runtime.evaluate', {'expression': script, 'returnByValue': False, 'awaitPromise': True,
+                                    'userGesture': True, 'timeout': timeout * 1000}
+
+    if not is_js_func(script):
+        script = f'function(){{{script}}}'
+    return 'Runtime.callFunctionOn', {'functionDeclaration': make_js_for_by_value(script) if by_value else script,
+                                      'objectId': obj_id, 'arguments': arguments, 'returnByValue': False,
+                                      'awaitPromise': True, 'userGesture': True}
+
+
+def make_js_for_by_value(script):
+    """把js函数包装成按值返回结果的函数，返回值由PACK_JS转换，返回Promise时等待其结果再转换
+    :param script: js函数文本
+    :return: 包装后的js函数文本
+    """
+    return f'''function(){{{PACK_JS}
+var r = ({script}).apply(this, arguments);
+return r && typeof r.then === 'function' ? r.then(packValue) : packValue(r);}}'''
+
+
+def parse_by_value_result(page, ele, result):
+    """解析PACK_JS转换后的js结果，有节点时用一次cdp往返批量获取节点并替换占位符
+    :param page: 页面对象
+    :param ele: 执行js的元素对象或页面对象
+    :param result: cdp返回的结果，为json文本或[json文本, 节点1, 节点2...]数组
+    :return: 解析后的结果
+    """
+    if result['type'] == 'string':
+        return loads(result['value'])
+
+    props, _ = page.run_cdp_many([('Runtime.getProperties', {'objectId': result['objectId'], 'ownProperties': True}),
+                                  ('Runtime.releaseObject', {'objectId': result['objectId']})])
+    items = {int(i['name']): i['value'] for i in props['result'] if i['name'].isdigit()}
+
+    def to_node(obj):
+        if len(obj) != 1 or BY_VALUE_NODE_KEY not in obj:
+            return obj
+        num, tag = obj[BY_VALUE_NODE_KEY]
+        node = items[num + 1]
+        return _make_ele_with_tag(page, tag, obj_id=node['objectId']) if tag else parse_js_result(page, ele, node)
+
+    return loads(items[0]['value'], object_hook=to_node)
+
+
+def call_helper(page, obj_id, name, args=(), by_value=True):
+    """以obj_id对应的js对象为第一个参数，调用内置js函数库中的函数
+    开启helper_runtime时只发送函数名和参数，当前上下文中还没有函数库时连同函数库一起发送；未开启时发送该函数的源码
+    :param page: 页面对象
+    :param obj_id: 作为第一个参数的js对象id
+    :param name: 函数名，为HELPER_FUNCS中的键
+    :param args: 其余参数，须能转换为json
+    :param by_value: 是否按值返回结果
+    :return: cdp返回的结果
+    """
+    kwargs = {'objectId': obj_id, 'arguments': [{'value': i} for i in args], 'returnByValue': by_value,
+              'awaitPromise': True, 'userGesture': True}
+    if not by_value:
+        kwargs.update(_group_arg(page))
+
+    if page._helper_id is None:
+        js = f'function(){{{HELPER_FUNCS[name]}\nreturn {name}.apply(null, [this].concat([].slice.call(arguments)));}}'
+        return page.run_cdp('Runtime.callFunctionOn', functionDeclaration=js, **kwargs)
+
+    call = f'return {HELPER_NAME}.{name}.apply(null, [this].concat([].slice.call(arguments)));'
+    r = page.run_cdp('Runtime.callFunctionOn', functionDeclaration=f'function(){{{call}}}', **kwargs)
+    error = r.get('exceptionDetails', {}).get('exception', {}).get('description', '')
+    if error.startswith('ReferenceError') and HELPER_NAME in error:  # 当前上下文中还没有函数库，一起发送
+        r = page.run_cdp('Runtime.callFunctionOn', functionDeclaration=f'function(){{{HELPER_JS}\n{call}}}',
+                         **kwargs)
+    return r
+
+
+def _run_cached_script(page, script):
+    """运行js表达式，同一表达式只用Runtime.compileScript编译一次，之后用Runtime.runScript直接运行
+    :param page: 页面对象
+    :param script: js表达式文本
+    :return: cdp返回的结果
+    """
+    cache = page._script_cache
+    script_id = cache.get(script)
+    if script_id is not None:
+        try:
+            return page.run_cdp('Runtime.runScript', scriptId=script_id, returnByValue=False, awaitPromise=True,
+                                **_group_arg(page))
+        except CallMethodError:  # 页面已刷新，编译结果失效
+            cache.pop(script, None)
+
+    r = page.run_cdp('Runtime.compileScript', expression=script, sourceURL='', persistScript=True)
+    if 'exceptionDetails' in r:
+        return r
+    if len(cache) >= SCRIPT_CACHE_SIZE:
+        cache.pop(next(iter(cache)), None)
+    cache[script] = r['scriptId']
+    return page.run_cdp('Runtime.runScript', scriptId=r['scriptId'], returnByValue=False, awaitPromise=True,
+                        **_group_arg(page))
+
+
 def parse_js_result(page, ele, result):
     """解析js返回的结果"""
+    kind, value = parse_js_value(result)
+
+    if kind == 'node':
+        class_name = result['className']
+        if class_name == 'ShadowRoot':
+            return ChromiumShadowRoot(ele, obj_id=result['objectId'])
+        elif class_name == 'HTMLDocument':
+            return result
+        else:
+            return make_chromium_ele(page, obj_id=result['objectId'], class_name=class_name)
+
+    elif kind == 'array':
+        r, _ = page.run_cdp_many([('Runtime.getProperties', {'objectId': result['objectId'],
+                                                              'ownProperties': True}),
+                                  ('Runtime.releaseObject', {'objectId': result['objectId']})])
+        return [parse_js_result(page, ele, result=i['value']) for i in r['result'] if i['name'].isdigit()]
+
+    elif kind == 'object':
+        return result['value']
+
+    return value
+
+
+def parse_js_value(result):
+    """解析js返回的结果中不需要再访问浏览器的部分
+    :param result: cdp返回的RemoteObject
+    :return: (类型, 值)，类型为'value'时值就是结果；为'node'、'array'、'object'时值为None，须用objectId再获取
+    """
     if 'unserializableValue' in result:
-        return result['unserializableValue']
+        return 'value', result['unserializableValue']
 
     the_type = result['type']
-
     if the_type == 'object':
-        sub_type = result['subtype']
+        sub_type = result.get('subtype', None)
         if sub_type == 'null':
-            return None
-
-        elif sub_type == 'node':
-            class_name = result['className']
-            if class_name == 'ShadowRoot':
-                return ChromiumShadowRoot(ele, obj_id=result['objectId'])
-            elif class_name == 'HTMLDocument':
-                return result
-            else:
-                return make_chromium_ele(page, obj_id=result['objectId'])
+            return 'value', None
+        elif sub_type in ('node', 'array'):
+            return sub_type, None
+        return 'object', None
 
-        elif sub_type == 'array':
-            r = page.run_cdp('Runtime.getProperties', objectId=result['result']['objectId'],
-                             ownProperties=True)['result']
-            return [parse_js_result(page, ele, result=i['value']) for i in r]
+    elif the_type == 'undefined':
+        return 'value', None
 
-        else:
-            return result['value']
+    return 'value', result['value']
 
-    elif the_type == 'undefined':
-        return None
 
-    else:
-        return result['value']
+def _group_arg(page):
+    """返回指定objectGroup的cdp参数，页面不在scope()中时返回空dict
+    :param page: 页面对象
+    :return: 参数dict
+    """
+    group = page._object_group
+    return {'objectGroup': group} if group else {}
 
 
 def convert_argument(arg):
     """把参数转换成js能够接收的形式"""
     if isinstance(arg, ChromiumElement):
         return {'objectId': arg.ids.obj_id}
+    return convert_value(arg)
 
-    elif isinstance(arg, (int, float, str, bool)):
-        return {'value': arg}
 
+def convert_value(arg):
+    """把元素以外的参数转换成js能够接收的形式"""
     from math import inf
     if arg == inf:
         return {'unserializableValue': 'Infinity'}
     if arg == -inf:
         return {'unserializableValue': '-Infinity'}
 
+    if isinstance(arg, (int, float, str, bool)):
+        return {'value': arg}
+
 
 def send_enter(ele):
     """发送回车"""
@@ -1985,21 +2858,16 @@ class ChromiumElementWaiter(object):
             timeout = self._driver.page.timeout if isinstance(self._driver, ChromiumElement) else self._driver.timeout
 
         if isinstance(self._loc_or_ele, ChromiumElement):
-            end_time = perf_counter() + timeout
-            while perf_counter() < end_time:
-                if not self._loc_or_ele.states.is_alive:
-                    return True
-
-        ele = self._driver._ele(self._loc_or_ele, timeout=.5, raise_err=False)
-        if not ele:
-            return True
-
-        end_time = perf_counter() + timeout
-        while perf_counter() < end_time:
-            if not ele.states.is_alive:
+            ele = self._loc_or_ele
+        else:
+            ele = self._driver._ele(self._loc_or_ele, timeout=.5, raise_err=False)
+            if not ele:
                 return True
 
-        return False
+        try:
+            return self._wait_by_js(ele, 'function(){return this.isConnected ? null : true;}', timeout)
+        except Exception:  # 元素所在页面已刷新或关闭
+            return True
 
     def display(self, timeout=None):
         """等待元素从dom显示
@@ -2058,17 +2926,28 @@ class ChromiumElementWaiter(object):
         if not target:
             return None
 
-        end_time = perf_counter() + timeout
-        while perf_counter() < end_time:
-            if mode == 'display' and target.states.is_displayed:
-                return True
-
-            elif mode == 'hidden' and not target.states.is_displayed:
-                return True
-
-            sleep(.05)
+        want = 'true' if mode == 'display' else 'false'
+        js = f'''function(){{var s = window.getComputedStyle(this);
+        var shown = !(s.visibility == "hidden" || this.offsetParent === null || s.display == "none");
+        return shown === {want} ? true : null;}}'''
+        try:
+            return self._wait_by_js(target, js, timeout, interval=.1)
+        except (ElementLossError, ContextLossError):
+            return False
 
-        return False
+    @staticmethod
+    def _wait_by_js(ele, js, timeout, interval=None):
+        """在页面中等待js函数返回true，只调用一次cdp，等待由页面中的MutationObserver驱动
+        :param ele: 执行js的元素
+        :param js: js函数文本，条件满足时返回true，否则返回null
+        :param timeout: 超时时间
+        :param interval: 定时检查的间隔（秒），用于不引起DOM变化的条件，为None时只在DOM变化时检查
+        :return: 是否等待成功
+        """
+        r = wait_in_page(ele.page, ele.ids.obj_id, js, timeout, interval, by_value=True)
+        if 'exceptionDetails' in r:
+            raise JavaScriptError(f'\njavascript运行错误：\n{r["exceptionDetails"]}')
+        return r['result'].get('value', None) is True
 
 
 class Pseudo(object):
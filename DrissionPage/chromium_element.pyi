@@ -4,17 +4,30 @@
 @Contact :   g1879@qq.com
 """
 from pathlib import Path
-from typing import Union, Tuple, List, Any
+from typing import Union, Tuple, List, Any, Dict, Optional, Callable
 
 from .base import DrissionElement, BaseElement
 from .chromium_base import ChromiumBase
 from .chromium_frame import ChromiumFrame
 from .chromium_page import ChromiumPage
 from .commons.constants import NoneElement
-from .session_element import SessionElement
+from .session_element import SessionElement, SessionElementList
 from .web_page import WebPage
 
 
+DEEP_QUERY_JS: str = ...
+JS_LOC_TYPES: Dict[str, int] = ...
+ELE_PATH_JS: str = ...
+FIND_XPATH_JS: str = ...
+HELPER_NAME: str = ...
+HELPER_FUNCS: Dict[str, str] = ...
+HELPER_JS: str = ...
+SCRIPT_CACHE_SIZE: int = ...
+WAIT_MARGIN: float = ...
+BY_VALUE_NODE_KEY: str = ...
+PACK_JS: str = ...
+
+
 class ChromiumElement(DrissionElement):
 
     def __init__(self,
@@ -22,10 +35,6 @@ class ChromiumElement(DrissionElement):
                  node_id: str = None, obj_id: str = None, backend_id: str = None):
         self._tag: str = ...
         self.page: Union[ChromiumPage, WebPage] = ...
-        self._node_id: str = ...
-        self._obj_id: str = ...
-        self._backend_id: str = ...
-        self._doc_id: str = ...
         self._ids: ChromiumElementIds = ...
         self._scroll: ChromiumScroll = ...
         self._click: Click = ...
@@ -144,7 +153,9 @@ class ChromiumElement(DrissionElement):
 
     def prop(self, prop: str) -> Union[str, int, None]: ...
 
-    def run_js(self, script: str, *args: Any, as_expr: bool = False) -> Any: ...
+    def run_js(self, script: str, *args: Any, as_expr: bool = False, by_value: bool = False) -> Any: ...
+
+    def snapshot(self, fields: Union[str, List[str], Tuple[str, ...]] = None) -> ElementSnapshot: ...
 
     def run_async_js(self, script: str, *args: Any, as_expr: bool = False) -> None: ...
 
@@ -154,11 +165,18 @@ class ChromiumElement(DrissionElement):
 
     def eles(self,
              loc_or_str: Union[Tuple[str, str], str],
-             timeout: float = None) -> List[Union[ChromiumElement, ChromiumFrame, str]]: ...
+             timeout: float = None) -> ChromiumElementList: ...
+
+    def extract(self, schema: dict) -> dict: ...
+
+    def ele_any(self,
+                locs: Union[List[Union[Tuple[str, str], str]], Tuple[Union[Tuple[str, str], str], ...]],
+                timeout: float = None,
+                raise_err: bool = None) -> Tuple[Union[int, None], Union[ChromiumElement, ChromiumFrame, str, NoneElement]]: ...
 
     def s_ele(self, loc_or_str: Union[Tuple[str, str], str] = None) -> Union[SessionElement, str, NoneElement]: ...
 
-    def s_eles(self, loc_or_str: Union[Tuple[str, str], str] = None) -> List[Union[SessionElement, str]]: ...
+    def s_eles(self, loc_or_str: Union[Tuple[str, str], str] = None) -> SessionElementList: ...
 
     def _find_elements(self, loc_or_str: Union[Tuple[str, str], str], timeout: float = None,
                        single: bool = True, relative: bool = False, raise_err: bool = False) \
@@ -187,14 +205,10 @@ class ChromiumElement(DrissionElement):
                 ele_or_loc: Union[tuple, ChromiumElement],
                 speed: int = 40) -> None: ...
 
-    def _get_obj_id(self, node_id: str = None, backend_id: str = None) -> str: ...
-
-    def _get_node_id(self, obj_id: str = None, backend_id: str = None) -> str: ...
-
-    def _get_backend_id(self, node_id: str) -> str: ...
-
     def _get_ele_path(self, mode: str) -> str: ...
 
+    def _run_helper(self, name: str, *args: Any) -> Any: ...
+
 
 class ChromiumElementStates(object):
     def __init__(self, ele: ChromiumElement):
@@ -225,10 +239,7 @@ class ChromiumShadowRoot(BaseElement):
                  parent_ele: ChromiumElement,
                  obj_id: str = None,
                  backend_id: str = None):
-        self._obj_id: str = ...
         self._ids: Ids = ...
-        self._node_id: str = ...
-        self._backend_id: str = ...
         self.page: ChromiumPage = ...
         self.parent_ele: ChromiumElement = ...
         self._states: ShadowRootStates = ...
@@ -254,7 +265,7 @@ class ChromiumShadowRoot(BaseElement):
     @property
     def inner_html(self) -> str: ...
 
-    def run_js(self, script: str, *args: Any, as_expr: bool = False) -> Any: ...
+    def run_js(self, script: str, *args: Any, as_expr: bool = False, by_value: bool = False) -> Any: ...
 
     def run_async_js(self, script: str, *args: Any, as_expr: bool = False) -> None: ...
 
@@ -284,27 +295,26 @@ class ChromiumShadowRoot(BaseElement):
 
     def eles(self,
              loc_or_str: Union[Tuple[str, str], str],
-             timeout: float = None) -> List[Union[ChromiumElement, ChromiumFrame]]: ...
+             timeout: float = None) -> ChromiumElementList: ...
 
     def s_ele(self, loc_or_str: Union[Tuple[str, str], str] = None) -> Union[SessionElement, str, NoneElement]: ...
 
-    def s_eles(self, loc_or_str: Union[Tuple[str, str], str]) -> List[Union[SessionElement, str]]: ...
+    def s_eles(self, loc_or_str: Union[Tuple[str, str], str]) -> SessionElementList: ...
 
     def _find_elements(self, loc_or_str: Union[Tuple[str, str], str], timeout: float = None,
                        single: bool = True, relative: bool = False, raise_err: bool = None) \
             -> Union[
                 ChromiumElement, ChromiumFrame, NoneElement, str, List[Union[ChromiumElement, ChromiumFrame, str]]]: ...
 
-    def _get_node_id(self, obj_id: str) -> str: ...
-
-    def _get_obj_id(self, back_id: str) -> str: ...
-
-    def _get_backend_id(self, node_id: str) -> str: ...
-
 
 class Ids(object):
-    def __init__(self, ele: Union[ChromiumElement, ChromiumShadowRoot]):
+    def __init__(self, ele: Union[ChromiumElement, ChromiumShadowRoot],
+                 node_id: str = None, obj_id: str = None, backend_id: str = None):
         self._ele: Union[ChromiumElement, ChromiumShadowRoot] = ...
+        self._node_id: str = ...
+        self._obj_id: str = ...
+        self._backend_id: str = ...
+        self._group: Optional[str] = ...
 
     @property
     def node_id(self) -> str: ...
@@ -315,8 +325,18 @@ class Ids(object):
     @property
     def backend_id(self) -> str: ...
 
+    def _resolve_kwargs(self) -> dict: ...
+
+    def _cdp_kwargs(self) -> dict: ...
+
+    def _describe(self) -> dict: ...
+
 
 class ChromiumElementIds(Ids):
+    def __init__(self, ele: ChromiumElement,
+                 node_id: str = None, obj_id: str = None, backend_id: str = None):
+        self._doc_id: str = ...
+
     @property
     def doc_id(self) -> str: ...
 
@@ -342,23 +362,157 @@ def find_by_css(ele: ChromiumElement,
                 timeout: float) -> Union[ChromiumElement, List[ChromiumElement], NoneElement]: ...
 
 
-def make_chromium_ele(page: ChromiumBase, node_id: str = ..., obj_id: str = ...) -> Union[
+def find_by_deep(page_or_ele: Union[ChromiumBase, ChromiumElement, ChromiumShadowRoot],
+                 selector: str,
+                 single: bool,
+                 timeout: float) -> Union[ChromiumElement, ChromiumFrame, NoneElement, List[
+    Union[ChromiumElement, ChromiumFrame]]]: ...
+
+
+def find_any(page_or_ele: Union[ChromiumBase, ChromiumElement],
+             locs: Union[List[Union[Tuple[str, str], str]], Tuple[Union[Tuple[str, str], str], ...]],
+             timeout: float = None,
+             raise_err: bool = None) -> Tuple[Union[int, None], Union[ChromiumElement, ChromiumFrame, str, NoneElement]]: ...
+
+
+class ChromiumElementList(List[Union[ChromiumElement, ChromiumFrame, str]]):
+
+    def attrs(self, name: str) -> List[Union[str, None]]: ...
+
+    def props(self, name: str) -> list: ...
+
+    def texts(self) -> List[str]: ...
+
+    def links(self) -> List[Union[str, None]]: ...
+
+    def filter(self, loc: Union[Tuple[str, str], str]) -> ChromiumElementList: ...
+
+    def click(self) -> None: ...
+
+    def _run(self, js: str, as_func: bool = True, keep_str: bool = False) -> list: ...
+
+
+def extract_in_chromium(page_or_ele: Union[ChromiumBase, ChromiumElement], schema: dict) -> dict: ...
+
+
+def make_js_for_extract(schema: dict) -> str: ...
+
+
+def _format_extract_result(schema: dict, data: dict) -> dict: ...
+
+
+def make_chromium_ele(page: ChromiumBase, node_id: str = ..., obj_id: str = ..., class_name: str = None) -> Union[
     ChromiumElement, ChromiumFrame]: ...
 
 
+def make_chromium_eles(page: ChromiumBase,
+                       node_ids: List[int] = None,
+                       list_obj_id: str = None) -> List[Union[ChromiumElement, ChromiumFrame, str]]: ...
+
+
+def resolve_obj_ids(page: ChromiumBase, eles: List[ChromiumElement]) -> None: ...
+
+
+def _make_ele_with_tag(page: ChromiumBase, tag: str, node_id: int = None, obj_id: str = None,
+                       backend_id: int = None) -> Union[ChromiumElement, ChromiumFrame]: ...
+
+
+SNAPSHOT_FIELDS: Tuple[str, ...] = ...
+
+
+class ElementSnapshot(object):
+    tag: str
+    attrs: dict
+    text: str
+    raw_text: str
+    html: str
+    inner_html: str
+    size: Tuple[int, int]
+    location: Tuple[float, float]
+    viewport_location: Tuple[int, int]
+    is_displayed: bool
+    is_enabled: bool
+    is_selected: Union[bool, None]
+    xpath: str
+    css_path: str
+    fields: Tuple[str, ...]
+
+    def __init__(self, fields: Tuple[str, ...], data: dict): ...
+
+    def as_dict(self) -> dict: ...
+
+
+def make_js_for_snapshot(fields: Tuple[str, ...]) -> str: ...
+
+
+def snapshot_eles(eles: List[Union[ChromiumElement, ChromiumFrame, str]],
+                  fields: Union[str, List[str], Tuple[str, ...]] = None) -> List[Union[ElementSnapshot, str]]: ...
+
+
+def make_js_for_wait(js: str, timeout: float, interval: float = None) -> str: ...
+
+
+def wait_in_page(page: ChromiumBase, obj_id: str, js: str, timeout: float, interval: float = None,
+                 by_value: bool = False) -> dict: ...
+
+
+def make_js_for_find_all(loc: Tuple[str, str]) -> str: ...
+
+
+def make_relative_loc(loc: Tuple[str, str], css_prefix: Union[str, Callable[[], str], None] = None) -> Tuple[str, str]: ...
+
+
+def make_js_for_find(loc: Tuple[str, str], single: bool, node_txt: str = 'this') -> str: ...
+
+
+def make_js_for_find_ele_by_css(selector: str, single: bool, node_txt: str) -> str: ...
+
+
+def make_js_for_find_ele_by_deep(selector: str, single: bool) -> str: ...
+
+
+def is_empty_result(result: dict) -> bool: ...
+
+
 def make_js_for_find_ele_by_xpath(xpath: str, type_txt: str, node_txt: str) -> str: ...
 
 
 def run_js(page_or_ele: Union[ChromiumBase, ChromiumElement, ChromiumShadowRoot], script: str,
-           as_expr: bool = False, timeout: float = None, args: tuple = ...) -> Any: ...
+           as_expr: bool = False, timeout: float = None, args: tuple = ..., by_value: bool = False) -> Any: ...
+
+
+def make_run_js_cmd(script: str, as_expr: bool, timeout: Optional[float], obj_id: Optional[str], arguments: list,
+                    by_value: bool = False) -> Tuple[str, dict]: ...
+
+
+def make_js_for_by_value(script: str) -> str: ...
+
+
+def parse_by_value_result(page: ChromiumBase, ele: Union[ChromiumBase, ChromiumElement, ChromiumShadowRoot],
+                          result: dict) -> Any: ...
+
+
+def call_helper(page: ChromiumBase, obj_id: str, name: str, args: tuple = ..., by_value: bool = True) -> dict: ...
+
+
+def _run_cached_script(page: ChromiumBase, script: str) -> dict: ...
 
 
 def parse_js_result(page: ChromiumBase, ele: ChromiumElement, result: dict): ...
 
 
+def parse_js_value(result: dict) -> Tuple[str, Any]: ...
+
+
+def _group_arg(page: ChromiumBase) -> dict: ...
+
+
 def convert_argument(arg: Any) -> dict: ...
 
 
+def convert_value(arg: Any) -> dict: ...
+
+
 def send_enter(ele: ChromiumElement) -> None: ...
 
 
@@ -543,6 +697,9 @@ class ChromiumElementWaiter(object):
 
     def _wait_ele(self, mode: str, timeout: float = None) -> Union[None, bool]: ...
 
+    @staticmethod
+    def _wait_by_js(ele: ChromiumElement, js: str, timeout: float, interval: float = None) -> bool: ...
+
 
 class Pseudo(object):
     def __init__(self, ele: ChromiumElement):
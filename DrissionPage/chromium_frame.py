@@ -55,6 +55,11 @@ class ChromiumFrame(ChromiumBase):
         self._timeouts = self.page.timeouts
         self._page_load_strategy = self.page.page_load_strategy
 
+    @property
+    def _multiplex_driver(self):
+        """返回用于复用连接的浏览器级driver，不复用时返回None"""
+        return self.page._multiplex_driver
+
     def _driver_init(self, tab_id):
         """避免出现服务器500错误
         :param tab_id: 要跳转到的标签页id
@@ -72,6 +77,11 @@ class ChromiumFrame(ChromiumBase):
         if debug:
             print('reload')
 
+        node_cache = self._node_cache
+        if node_cache is not None:  # 重新初始化会替换driver，先解除旧driver上的订阅
+            node_cache.stop()
+        remote_frames = self._remote_frames
+
         self._frame_ele = ChromiumElement(self.page, backend_id=self._backend_id)
         node = self.page.run_cdp('DOM.describeNode', backendNodeId=self._frame_ele.ids.backend_id)['node']
 
@@ -88,6 +98,11 @@ class ChromiumFrame(ChromiumBase):
             self.doc_ele = ChromiumElement(self, obj_id=obj_id)
             self._debug = debug
 
+        self._remote_frames = remote_frames
+        if node_cache is not None:
+            self._node_cache = node_cache
+            node_cache.start()
+
     def _check_ok(self):
         """用于应付同域异域之间跳转导致元素丢失问题"""
         if self._tab_obj._stopped.is_set():
@@ -305,18 +320,28 @@ class ChromiumFrame(ChromiumBase):
         self._check_ok()
         self.frame_ele.remove_attr(attr)
 
-    def run_js(self, script, *args, as_expr=False):
+    def _run_helper(self, name, *args):
+        """以frame的document为第一个参数调用内置js函数库中的函数
+        :param name: 函数名
+        :param args: 其余参数
+        :return: 函数返回值
+        """
+        self._check_ok()
+        return self.doc_ele._run_helper(name, *args)
+
+    def run_js(self, script, *args, as_expr=False, by_value=False):
         """运行javascript代码
         :param script: js文本
         :param args: 参数，按顺序在js文本中对应argument[0]、argument[1]...
         :param as_expr: 是否作为表达式运行，为True时args无效
+        :param by_value: 是否按值返回结果，为True时结果转换为json返回，其中的节点再用一次调用批量获取
         :return: 运行的结果
         """
         self._check_ok()
         if script.startswith('this.scrollIntoView'):
-            return self.frame_ele.run_js(script, *args, as_expr=as_expr)
+            return self.frame_ele.run_js(script, *args, as_expr=as_expr, by_value=by_value)
         else:
-            return self.doc_ele.run_js(script, *args, as_expr=as_expr)
+            return self.doc_ele.run_js(script, *args, as_expr=as_expr, by_value=by_value)
 
     def parent(self, level_or_loc=1):
         """返回上面某一级父元素，可指定层数或用查询语法定位
@@ -418,6 +443,26 @@ class ChromiumFrame(ChromiumBase):
         else:
             raise RuntimeError('暂未实现对异域iframe内元素截图功能。')
 
+    def extract(self, schema):
+        """按schema在frame内获取数据，用一次cdp调用完成
+        :param schema: {字段名: 规则}格式的dict，规则格式见parse_schema()
+        :return: 与schema结构对应的dict
+        """
+        self._check_ok()
+        self.wait.load_complete()
+        return self.doc_ele.extract(schema)
+
+    def ele_any(self, locs, timeout=None, raise_err=None):
+        """在frame内同时查找多个定位符，返回最先出现的一个
+        :param locs: 定位符组成的列表或元组，同时出现时以排在前面的为准
+        :param timeout: 查找超时时间，默认与页面等待时间一致
+        :param raise_err: 找不到元素是是否抛出异常，为None时根据全局设置
+        :return: (定位符在locs中的序号, 元素对象或属性、文本)，都找不到时返回(None, NoneElement)
+        """
+        self._check_ok()
+        self.wait.load_complete()
+        return self.doc_ele.ele_any(locs, timeout, raise_err)
+
     def _find_elements(self, loc_or_ele, timeout=None, single=True, relative=False, raise_err=None):
         """在frame内查找单个元素
         :param loc_or_ele: 定位符或元素对象
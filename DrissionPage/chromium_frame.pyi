@@ -6,6 +6,7 @@
 from typing import Union, Tuple, List, Any
 
 from .chromium_base import ChromiumBase, ChromiumPageScroll, ChromiumBaseSetter
+from .chromium_driver import ChromiumDriver
 from .chromium_element import ChromiumElement, Locations
 
 
@@ -32,6 +33,9 @@ class ChromiumFrame(ChromiumBase):
 
     def _runtime_settings(self) -> None: ...
 
+    @property
+    def _multiplex_driver(self) -> Union[ChromiumDriver, None]: ...
+
     def _driver_init(self, tab_id: str) -> None: ...
 
     def _reload(self) -> None: ...
@@ -110,7 +114,9 @@ class ChromiumFrame(ChromiumBase):
 
     def remove_attr(self, attr: str) -> None: ...
 
-    def run_js(self, script: str, *args: Any, as_expr: bool = False) -> Any: ...
+    def _run_helper(self, name: str, *args: Any) -> Any: ...
+
+    def run_js(self, script: str, *args: Any, as_expr: bool = False, by_value: bool = False) -> Any: ...
 
     def parent(self, level_or_loc: Union[tuple, str, int] = 1) -> Union[ChromiumElement, None]: ...
 
@@ -150,6 +156,13 @@ class ChromiumFrame(ChromiumBase):
                filter_loc: Union[tuple, str] = ...,
                timeout: float = ...) -> List[Union[ChromiumElement, ChromiumFrame, str]]: ...
 
+    def extract(self, schema: dict) -> dict: ...
+
+    def ele_any(self,
+                locs: Union[List[Union[Tuple[str, str], str]], Tuple[Union[Tuple[str, str], str], ...]],
+                timeout: float = None,
+                raise_err: bool = None) -> Tuple[Union[int, None], Union[ChromiumElement, ChromiumFrame, str]]: ...
+
     def _find_elements(self, loc_or_ele: Union[Tuple[str, str], str, ChromiumElement, ChromiumFrame],
              timeout: float = None, single: bool = True, relative: bool = False, raise_err: bool=None) \
             -> Union[ChromiumElement, ChromiumFrame, None, List[Union[ChromiumElement, ChromiumFrame]]]: ...
@@ -32,6 +32,9 @@ class ChromiumPage(ChromiumBase):
         """
         self._download_set = None
         self._download_path = None
+        self._browser_driver = None
+        self._tab_drivers = {}  # {标签页id: (driver, 函数库脚本id, 编译缓存)}，切换标签页后保留的连接
+        self._alert = Alert()
         super().__init__(addr_driver_opts, tab_id, timeout)
 
     def _set_start_options(self, addr_driver_opts, none):
@@ -84,19 +87,24 @@ class ChromiumPage(ChromiumBase):
                     raise BrowserConnectError('浏览器连接失败，可能是浏览器版本原因。')
                 tab_id = tab_id[0]
 
+            self._browser_init()
             self._driver_init(tab_id)
 
         self._page_init()
         self._get_document()
         self._first_run = False
 
+    def _browser_init(self):
+        """连接浏览器级的cdp，已连接时跳过"""
+        if self._browser_driver is None or self._browser_driver._stopped.is_set():
+            ws = self._control_session.get(f'http://{self.address}/json/version').json()['webSocketDebuggerUrl']
+            self._browser_driver = ChromiumDriver(ws.split('/')[-1], 'browser', self.address)
+            self._browser_driver.start()
+
     def _page_init(self):
         """页面相关设置"""
-        ws = self._control_session.get(f'http://{self.address}/json/version').json()['webSocketDebuggerUrl']
-        self._browser_driver = ChromiumDriver(ws.split('/')[-1], 'browser', self.address)
-        self._browser_driver.start()
+        self._browser_init()
 
-        self._alert = Alert()
         self._tab_obj.Page.javascriptDialogOpening = self._on_alert_open
         self._tab_obj.Page.javascriptDialogClosed = self._on_alert_close
 
@@ -113,6 +121,42 @@ class ChromiumPage(ChromiumBase):
                 self._process_id = i['id']
                 break
 
+    def _driver_init(self, tab_id):
+        """连接标签页，切换到连接过的标签页时复用其driver，不重新连接
+        :param tab_id: 要跳转到的标签页id
+        :return: None
+        """
+        parked = self._tab_drivers.pop(tab_id, None)
+        if parked is not None and parked[0]._stopped.is_set():  # 标签页已关闭或连接已断开
+            parked = None
+        super()._driver_init(tab_id, parked)
+        self._tab_obj.Page.javascriptDialogOpening = self._on_alert_open
+        self._tab_obj.Page.javascriptDialogClosed = self._on_alert_close
+
+    def _park_driver(self):
+        """切换标签页前保留当前driver，只解除它与本对象的绑定，不断开连接"""
+        driver = self._tab_obj
+        if driver is None or driver._stopped.is_set():
+            return
+        driver.event_handlers.clear()
+        self._tab_drivers[driver.id] = (driver, self._helper_id, self._script_cache)
+
+    def _stop_tab_drivers(self, tab_ids=None):
+        """断开保留的标签页连接
+        :param tab_ids: 标签页id组成的集合，为None时断开全部
+        :return: None
+        """
+        for tab_id in list(self._tab_drivers) if tab_ids is None else tab_ids:
+            parked = self._tab_drivers.pop(tab_id, None)
+            if parked is not None:
+                parked[0].stop()
+
+    @property
+    def _multiplex_driver(self):
+        """返回用于复用连接的浏览器级driver，不复用时返回None"""
+        if getattr(self._driver_options, 'multiplex', False):
+            return self._browser_driver
+
     @property
     def browser_driver(self):
         """返回用于控制浏览器cdp的driver"""
@@ -252,7 +296,7 @@ class ChromiumPage(ChromiumBase):
         if tab_id == self.tab_id:
             return
 
-        self.driver.stop()
+        self._park_driver()
         self._driver_init(tab_id)
         if read_doc and self.ready_state == 'complete':
             self._get_document()
@@ -285,11 +329,12 @@ class ChromiumPage(ChromiumBase):
 
         if self.tab_id in tabs:
             self.driver.stop()
+        self._stop_tab_drivers(tabs)
 
         for tab in tabs:
             self._control_session.get(f'http://{self.address}/json/close/{tab}')
         while len(self.tabs) != end_len:
-            sleep(.1)
+            sleep(.01)
 
         if self._main_tab in tabs:
             self._main_tab = self.tabs[0]
@@ -329,6 +374,7 @@ class ChromiumPage(ChromiumBase):
         """关闭浏览器"""
         self._tab_obj.Browser.close()
         self._tab_obj.stop()
+        self._stop_tab_drivers()
 
     def _on_alert_close(self, **kwargs):
         """alert关闭时触发的方法"""
@@ -512,11 +558,14 @@ class ChromiumDownloadSetter(DownloadSetter):
 
     def by_browser(self):
         """设置使用浏览器下载文件"""
+        # eventsEnabled是下载行为的参数，不是domain的enable，下载拦截需要downloadWillBegin；
+        # 没有人接收的downloadProgress事件在接收线程中不解析直接丢弃
         try:
             self._page.browser_driver.Browser.setDownloadBehavior(behavior='allow', eventsEnabled=True,
                                                                   downloadPath=self._page.download_path)
             self._page.browser_driver.Browser.downloadWillBegin = self._download_by_browser
         except CallMethodError:
+            self._page.driver.domains.enable('Page', 'download')
             self._page.driver.Page.setDownloadBehavior(behavior='allow', downloadPath=self._page.download_path)
             self._page.driver.Page.downloadWillBegin = self._download_by_browser
 
@@ -6,7 +6,7 @@
 from os import popen
 from pathlib import Path
 from threading import Thread
-from typing import Union, Tuple, List
+from typing import Union, Tuple, List, Dict, Iterable
 
 from DownloadKit import DownloadKit
 from requests import Session
@@ -33,6 +33,7 @@ class ChromiumPage(ChromiumBase):
         self._download_path: str = ...
         self._download_set: ChromiumDownloadSetter = ...
         self._browser_driver: ChromiumDriver = ...
+        self._tab_drivers: Dict[str, Tuple[ChromiumDriver, Union[str, None], Union[dict, None]]] = ...
         self._rect: ChromiumTabRect = ...
 
     def _connect_browser(self,
@@ -41,8 +42,19 @@ class ChromiumPage(ChromiumBase):
 
     def _set_start_options(self, addr_driver_opts: Union[str, ChromiumDriver, DriverOptions], none) -> None: ...
 
+    def _browser_init(self) -> None: ...
+
     def _page_init(self) -> None: ...
 
+    def _driver_init(self, tab_id: str) -> None: ...
+
+    def _park_driver(self) -> None: ...
+
+    def _stop_tab_drivers(self, tab_ids: Iterable[str] = None) -> None: ...
+
+    @property
+    def _multiplex_driver(self) -> Union[ChromiumDriver, None]: ...
+
     @property
     def browser_driver(self) -> ChromiumDriver: ...
 
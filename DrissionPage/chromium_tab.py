@@ -30,6 +30,11 @@ class ChromiumTab(ChromiumBase):
         self.retry_interval = self.page.retry_interval
         self._page_load_strategy = self.page.page_load_strategy
 
+    @property
+    def _multiplex_driver(self):
+        """返回用于复用连接的浏览器级driver，不复用时返回None"""
+        return self.page._multiplex_driver
+
 
 class WebPageTab(SessionPage, ChromiumTab):
     def __init__(self, page, tab_id):
@@ -50,6 +55,15 @@ class WebPageTab(SessionPage, ChromiumTab):
         self._download_set = None
         self._download_path = None
         self._set = None
+        self._is_loading = None
+        self._root_id = None
+        self._tab_obj = None
+        self._screencast = None
+        self._node_cache = None
+        self._object_group = None
+        self._helper_id = None
+        self._script_cache = None
+        self._remote_frames = {}
         super(SessionPage, self)._set_runtime_settings()
         self._connect_browser(tab_id)
 
@@ -211,6 +225,28 @@ class WebPageTab(SessionPage, ChromiumTab):
         elif self._mode == 'd':
             return super(SessionPage, self).eles(loc_or_str, timeout=timeout)
 
+    def extract(self, schema):
+        """按schema在页面内获取数据，d模式用一次cdp调用完成，s模式页面html只解析一次
+        :param schema: {字段名: 规则}格式的dict，规则格式见parse_schema()
+        :return: 与schema结构对应的dict
+        """
+        if self._mode == 's':
+            return super().extract(schema)
+        elif self._mode == 'd':
+            return super(SessionPage, self).extract(schema)
+
+    def ele_any(self, locs, timeout=None, raise_err=None):
+        """同时查找多个定位符，返回最先找到的一个
+        :param locs: 定位符组成的列表或元组，同时找到时以排在前面的为准
+        :param timeout: 查找元素超时时间，d模式专用
+        :param raise_err: 找不到元素是是否抛出异常，为None时根据全局设置
+        :return: (定位符在locs中的序号, 元素对象或属性、文本)，都找不到时返回(None, NoneElement)
+        """
+        if self._mode == 's':
+            return super().ele_any(locs, raise_err=raise_err)
+        elif self._mode == 'd':
+            return super(SessionPage, self).ele_any(locs, timeout=timeout, raise_err=raise_err)
+
     def s_ele(self, loc_or_ele=None):
         """查找第一个符合条件的元素以SessionElement形式返回，d模式处理复杂页面时效率很高
         :param loc_or_ele: 元素的定位信息，可以是loc元组，或查询字符串
@@ -9,6 +9,7 @@ from DownloadKit import DownloadKit
 from requests import Session, Response
 
 from .chromium_base import ChromiumBase, ChromiumBaseSetter
+from .chromium_driver import ChromiumDriver
 from .chromium_element import ChromiumElement
 from .chromium_frame import ChromiumFrame
 from .chromium_page import ChromiumPage
@@ -24,6 +25,9 @@ class ChromiumTab(ChromiumBase):
 
     def _set_runtime_settings(self) -> None: ...
 
+    @property
+    def _multiplex_driver(self) -> Union[ChromiumDriver, None]: ...
+
 
 class WebPageTab(SessionPage, ChromiumTab):
     def __init__(self, page: WebPage, tab_id: str):
@@ -99,6 +103,13 @@ class WebPageTab(SessionPage, ChromiumTab):
              loc_or_str: Union[Tuple[str, str], str],
              timeout: float = None) -> List[Union[ChromiumElement, SessionElement, ChromiumFrame, str]]: ...
 
+    def extract(self, schema: dict) -> dict: ...
+
+    def ele_any(self,
+                locs: Union[List[Union[Tuple[str, str], str]], Tuple[Union[Tuple[str, str], str], ...]],
+                timeout: float = None,
+                raise_err: bool = None) -> Tuple[Union[int, None], Union[ChromiumElement, SessionElement, ChromiumFrame, str]]: ...
+
     def s_ele(self, loc_or_ele: Union[Tuple[str, str], str] = None) \
             -> Union[SessionElement, str, None]: ...
 
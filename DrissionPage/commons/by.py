@@ -8,3 +8,4 @@ class By:
     TAG_NAME = 'tag name'
     CLASS_NAME = 'class name'
     CSS_SELECTOR = 'css selector'
+    DEEP_CSS = 'deep css'
@@ -0,0 +1,235 @@
+# -*- coding:utf-8 -*-
+"""
+@Author  :   g1879
+@Contact :   g1879@qq.com
+"""
+from base64 import b64decode
+
+# 超过这个长度的消息才尝试延迟解析大字段
+LAZY_SIZE = 1024 * 256
+# 可延迟解析的字段名，如截图、pdf的data，Network.getResponseBody的body
+LAZY_FIELDS = ('data', 'body')
+
+_dumps = None
+_loads = None
+codec_name = None
+
+
+def set_json_codec(name=None):
+    """设置cdp通讯使用的json库
+    :param name: 'orjson'、'ujson'、'json'，为None时按顺序选用已安装的第一个
+    :return: 实际使用的库名称
+    """
+    global _dumps, _loads, codec_name
+
+    names = (name,) if name else ('orjson', 'ujson', 'json')
+    for i in names:
+        if i == 'orjson':
+            try:
+                import orjson
+            except ModuleNotFoundError:
+                if name:
+                    raise ModuleNotFoundError('请先安装orjson，pip install orjson')
+                continue
+            _dumps = lambda obj: orjson.dumps(obj).decode()
+            _loads = orjson.loads
+
+        elif i == 'ujson':
+            try:
+                import ujson
+            except ModuleNotFoundError:
+                if name:
+                    raise ModuleNotFoundError('请先安装ujson，pip install ujson')
+                continue
+            _dumps = lambda obj: ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+            _loads = ujson.loads
+
+        elif i == 'json':
+            from json import dumps, loads
+            _dumps = dumps
+            _loads = loads
+
+        else:
+            raise ValueError("name参数只能是'orjson'、'ujson'、'json'或None。")
+
+        codec_name = i
+        return i
+
+
+def dumps(obj):
+    """把对象转换为json文本
+    :param obj: 要转换的对象
+    :return: json文本
+    """
+    return _dumps(obj)
+
+
+def loads(text):
+    """把json文本转换为对象
+    :param text: json文本
+    :return: 转换后的对象
+    """
+    return _loads(text)
+
+
+def loads_message(text):
+    """解析浏览器发来的消息，大消息中的大字段不经json解析，只记录其在原文中的位置
+    :param text: 浏览器发来的json文本
+    :return: 解析后的dict
+    """
+    if len(text) < LAZY_SIZE:
+        return _loads(text)
+
+    fields = {}
+    spans = []
+    for field in LAZY_FIELDS:
+        key = f'"{field}":"'
+        start = text.find(key)
+        for s, e in spans:  # 跳过已截取字段的内容
+            if s <= start < e:
+                start = text.find(key, e)
+        if start <= 0 or text[start - 1] not in '{,':  # 确保找到的是键名
+            continue
+
+        value_start = start + len(key)
+        value_end = text.find('"', value_start)
+        if value_end - value_start < LAZY_SIZE or text.find('\\', value_start, value_end) != -1:
+            continue  # 太短或有转义字符的不处理
+
+        fields[field] = LazyField(text, value_start, value_end)  # 只记录位置，不复制内容
+        spans.append((value_start, value_end))
+
+    if not fields:
+        return _loads(text)
+
+    parts = []
+    end = 0
+    for s, e in sorted(spans):
+        parts.append(text[end:s - 1])
+        parts.append('null')
+        end = e + 1
+    parts.append(text[end:])
+    message = _loads(''.join(parts))
+    _fill_fields(message, fields)
+    return message
+
+
+def plain_fields(message, text):
+    """把loads_message()结果中的LazyField都换成str，不要求延迟解析的调用和事件都经过这一步
+    :param message: loads_message()返回的dict
+    :param text: 消息原文
+    :return: None
+    """
+    if len(text) >= LAZY_SIZE:
+        _plain_fields(message)
+
+
+def _plain_fields(obj):
+    """递归把dict中的LazyField换成str
+    :param obj: dict
+    :return: None
+    """
+    for key, value in obj.items():
+        if isinstance(value, LazyField):
+            obj[key] = str(value)
+        elif isinstance(value, dict):
+            _plain_fields(value)
+
+
+def _fill_fields(obj, fields):
+    """把截取出来的字段放回解析后的对象中
+    :param obj: 解析后的dict
+    :param fields: 截取出来的字段
+    :return: None
+    """
+    for key, value in obj.items():
+        if key in fields and value is None:
+            obj[key] = fields.pop(key)
+        elif isinstance(value, dict):
+            _fill_fields(value, fields)
+        if not fields:
+            return
+
+
+class LazyField(object):
+    """大字段的延迟解析结果，只记录在原始消息中的位置，不复制内容
+    不是str，需要文本时用str()获取，base64内容可用bytes()或save()直接从原始消息分块解码
+    只有以_lazy=True调用call_method()时结果中才会出现，公开接口返回的都是str
+    如要关闭延迟解析，把LAZY_SIZE设为float('inf')即可"""
+    __slots__ = ('_text', '_start', '_end')
+
+    def __init__(self, text, start, end):
+        """
+        :param text: 原始消息文本
+        :param start: 字段内容开始位置
+        :param end: 字段内容结束位置
+        """
+        self._text = text
+        self._start = start
+        self._end = end
+
+    def __str__(self):
+        return self._text[self._start:self._end]
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __eq__(self, other):
+        if isinstance(other, LazyField):
+            other = str(other)
+        return str(self) == other if isinstance(other, str) else NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return f'<LazyField len={len(self)}>'
+
+    def __getattr__(self, item):
+        return getattr(str(self), item)  # 其它str方法
+
+    def chunks(self, chunk_size=1024 * 1024 * 4):
+        """逐块返回文本内容
+        :param chunk_size: 每块的长度
+        :return: 生成器
+        """
+        for i in range(self._start, self._end, chunk_size):
+            yield self._text[i:min(i + chunk_size, self._end)]
+
+    def bytes(self):
+        """返回base64解码后的bytes"""
+        return b''.join(b64decode(i) for i in self.chunks())
+
+    def save(self, path):
+        """把base64解码后的内容分块写入文件，避免一次性生成完整的bytes
+        :param path: 文件路径
+        :return: 文件路径
+        """
+        return b64decode_to_file(self, path)
+
+
+def b64decode_field(data):
+    """对cdp返回的base64字段解码，可以是str或LazyField
+    :param data: base64文本或LazyField对象
+    :return: 解码后的bytes
+    """
+    return data.bytes() if isinstance(data, LazyField) else b64decode(data)
+
+
+def b64decode_to_file(data, path, chunk_size=1024 * 1024 * 4):
+    """把base64文本分块解码并写入文件，内存中只保留一个块的解码结果
+    :param data: base64文本或LazyField对象
+    :param path: 文件路径
+    :param chunk_size: 每块的长度，会向下取整为4的倍数
+    :return: 文件路径
+    """
+    chunk_size = max(chunk_size // 4 * 4, 4)
+    chunks = data.chunks(chunk_size) if isinstance(data, LazyField) \
+        else (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+    with open(path, 'wb') as f:
+        for i in chunks:
+            f.write(b64decode(i))
+    return path
+
+
+set_json_codec()
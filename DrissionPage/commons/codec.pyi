@@ -0,0 +1,59 @@
+# -*- coding:utf-8 -*-
+"""
+@Author  :   g1879
+@Contact :   g1879@qq.com
+"""
+from pathlib import Path
+from typing import Any, Callable, Iterator, Union
+
+LAZY_SIZE: int
+LAZY_FIELDS: tuple
+
+_dumps: Callable[[Any], str]
+_loads: Callable[[str], Any]
+codec_name: str
+
+
+def set_json_codec(name: str = None) -> str: ...
+
+
+def dumps(obj: Any) -> str: ...
+
+
+def loads(text: Union[str, bytes]) -> Any: ...
+
+
+def loads_message(text: Union[str, bytes]) -> dict: ...
+
+
+def plain_fields(message: dict, text: str) -> None: ...
+
+
+def _plain_fields(obj: dict) -> None: ...
+
+
+def _fill_fields(obj: dict, fields: dict) -> None: ...
+
+
+class LazyField(object):
+    _text: str
+    _start: int
+    _end: int
+
+    def __init__(self, text: str, start: int, end: int): ...
+
+    def __len__(self) -> int: ...
+
+    def __getattr__(self, item: str) -> Any: ...
+
+    def chunks(self, chunk_size: int = 4194304) -> Iterator[str]: ...
+
+    def bytes(self) -> bytes: ...
+
+    def save(self, path: Union[str, Path]) -> Union[str, Path]: ...
+
+
+def b64decode_field(data: Union[str, LazyField]) -> bytes: ...
+
+
+def b64decode_to_file(data: Union[str, LazyField], path: Union[str, Path], chunk_size: int = 4194304) -> Union[str, Path]: ...
@@ -7,6 +7,7 @@ from DrissionPage.errors import ElementNotFoundError
 
 HANDLE_ALERT_METHOD = 'Page.handleJavaScriptDialog'
 FRAME_ELEMENT = ('iframe', 'frame')
+FRAME_CLASS_NAMES = ('HTMLIFrameElement', 'HTMLFrameElement')
 ERROR = 'error'
 
 
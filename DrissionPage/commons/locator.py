@@ -34,10 +34,43 @@ def get_loc(loc, translate_css=False):
     return loc
 
 
+def parse_schema(schema):
+    """把extract()使用的schema转换为统一格式
+    schema是{字段名: 规则}格式的dict，规则可以是：
+    定位符：获取找到的第一个元素的文本
+    {'loc': 定位符, 'attr': 'text', 'all': False}：attr可以是'text'、'raw_text'、'html'、'inner_html'、'tag'、'link'
+    或属性名，默认为'text'；loc为None时使用当前元素；all为True时获取所有找到的元素的值组成的列表
+    {'loc': 定位符, 'fields': schema}：在找到的第一个元素中按fields获取数据，返回dict
+    {'rows': 定位符, 'fields': schema}：在找到的每个元素中按fields获取数据，返回dict组成的列表
+    :param schema: {字段名: 规则}格式的dict
+    :return: {字段名: {'loc': 定位元组或None, 'attr': str, 'all': bool}或{'loc': 定位元组或None, 'rows': bool,
+             'fields': dict}}格式的dict
+    """
+    if not isinstance(schema, dict):
+        raise TypeError('schema参数只能是dict。')
+
+    result = {}
+    for name, rule in schema.items():
+        if isinstance(rule, (str, tuple)):
+            rule = {'loc': rule}
+        elif not isinstance(rule, dict):
+            raise TypeError(f'规则只能是定位符或dict。现在是：{rule}')
+
+        loc = rule['rows'] if 'rows' in rule else rule.get('loc', None)
+        loc = get_loc(loc) if loc else None
+        if 'fields' in rule:
+            result[name] = {'loc': loc, 'rows': 'rows' in rule, 'fields': parse_schema(rule['fields'])}
+        else:
+            result[name] = {'loc': loc, 'attr': rule.get('attr', 'text'), 'all': rule.get('all', False)}
+
+    return result
+
+
 def str_to_loc(loc):
     """处理元素查找语句
     查找方式：属性、tag name及属性、文本、xpath、css selector、id、class
     @表示属性，.表示class，#表示id，=表示精确匹配，:表示模糊匹配，无控制字符串时默认搜索该字符串
+    deep:开头或包含>>>的css selector穿透shadow root查找，>>>表示在前面找到的元素（含其shadow root）内查找
     """
     loc_by = 'xpath'
 
@@ -104,12 +137,20 @@ def str_to_loc(loc):
         loc_by = 'css selector'
         loc_str = loc[2:]
 
+    # 穿透shadow root的css selector查找
+    elif loc.startswith(('deep:', 'deep=')) and loc not in ('deep:', 'deep='):
+        loc_by = 'deep css'
+        loc_str = loc[5:]
+
     # 根据文本模糊查找
     elif loc:
         loc_str = f'//*/text()[contains(., {_make_search_str(loc)})]/..'
     else:
         loc_str = '//*'
 
+    if loc_by == 'css selector' and '>>>' in loc_str:
+        loc_by = 'deep css'
+
     return loc_by, loc_str
 
 
@@ -226,7 +267,7 @@ def translate_loc(loc):
     if loc_0 == By.XPATH:
         loc_str = loc[1]
 
-    elif loc_0 == By.CSS_SELECTOR:
+    elif loc_0 in (By.CSS_SELECTOR, By.DEEP_CSS):
         loc_by = loc_0
         loc_str = loc[1]
 
@@ -9,6 +9,9 @@ from typing import Union
 def get_loc(loc: Union[tuple, str], translate_css: bool = False) -> tuple: ...
 
 
+def parse_schema(schema: dict) -> dict: ...
+
+
 def str_to_loc(loc: str) -> tuple: ...
 
 
@@ -0,0 +1,148 @@
+# -*- coding:utf-8 -*-
+"""
+@Author  :   g1879
+@Contact :   g1879@qq.com
+"""
+from json import dumps
+from threading import Lock
+
+# 耗时直方图的分桶上限（秒），最后一个桶收集超出的部分
+LATENCY_BUCKETS = (.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+
+class DriverStats(object):
+    """按cdp方法统计调用次数、耗时、收发字节数和错误数的类，默认不统计，设置enabled为True后开始"""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = Lock()
+        self._methods = {}
+        self._events = {}
+
+    def record(self, method, latency, sent, received, error=False):
+        """记录一次cdp调用
+        :param method: cdp方法名
+        :param latency: 耗时（秒）
+        :param sent: 发送的字节数
+        :param received: 接收的字节数
+        :param error: 是否返回错误或超时
+        :return: None
+        """
+        with self._lock:
+            item = self._methods.get(method)
+            if item is None:
+                item = self._methods[method] = {'count': 0, 'errors': 0, 'sent_bytes': 0, 'received_bytes': 0,
+                                                'latency_sum': 0., 'latency_max': 0.,
+                                                'buckets': [0] * (len(LATENCY_BUCKETS) + 1)}
+            item['count'] += 1
+            item['sent_bytes'] += sent
+            item['received_bytes'] += received
+            item['latency_sum'] += latency
+            if latency > item['latency_max']:
+                item['latency_max'] = latency
+            if error:
+                item['errors'] += 1
+
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    item['buckets'][i] += 1
+                    break
+            else:
+                item['buckets'][-1] += 1
+
+    def record_event(self, method, received):
+        """记录一个收到的cdp event
+        :param method: event名称
+        :param received: 接收的字节数
+        :return: None
+        """
+        with self._lock:
+            item = self._events.get(method)
+            if item is None:
+                item = self._events[method] = {'count': 0, 'received_bytes': 0}
+            item['count'] += 1
+            item['received_bytes'] += received
+
+    def snapshot(self):
+        """返回当前统计数据的副本
+        :return: {'methods': {方法名: 数据}, 'events': {event名: 数据}}
+        """
+        with self._lock:
+            methods = {k: dict(v, buckets=list(v['buckets'])) for k, v in self._methods.items()}
+            events = {k: dict(v) for k, v in self._events.items()}
+
+        for item in methods.values():
+            item['latency_avg'] = item['latency_sum'] / item['count'] if item['count'] else 0.
+            item['buckets'] = dict(zip([str(i) for i in LATENCY_BUCKETS] + ['+Inf'], item['buckets']))
+        return {'methods': methods, 'events': events}
+
+    def reset(self):
+        """清空统计数据"""
+        with self._lock:
+            self._methods = {}
+            self._events = {}
+
+    def top(self, key='count', num=10):
+        """返回按某项数据排序的前几个方法
+        :param key: 排序依据，如 'count' 'latency_sum' 'received_bytes' 'errors'
+        :param num: 返回的数量
+        :return: (方法名, 数据)组成的列表
+        """
+        methods = self.snapshot()['methods']
+        return sorted(methods.items(), key=lambda i: i[1][key], reverse=True)[:num]
+
+    def to_json(self):
+        """以json文本形式返回统计数据"""
+        return dumps(self.snapshot(), ensure_ascii=False)
+
+    def to_prometheus(self, prefix='drissionpage_cdp', labels=None):
+        """以Prometheus文本格式返回统计数据
+        :param prefix: 指标名前缀
+        :param labels: 附加到每个指标的标签，dict格式，如 {'tab': 'xxx'}
+        :return: Prometheus文本
+        """
+        data = self.snapshot()
+        extra = ''.join(f',{k}="{_escape(v)}"' for k, v in (labels or {}).items())
+        lines = []
+
+        for name, key, kind in (('calls_total', 'count', 'counter'),
+                                ('errors_total', 'errors', 'counter'),
+                                ('sent_bytes_total', 'sent_bytes', 'counter'),
+                                ('received_bytes_total', 'received_bytes', 'counter')):
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+            for method, item in data['methods'].items():
+                lines.append(f'{prefix}_{name}{{method="{_escape(method)}"{extra}}} {item[key]}')
+
+        lines.append(f'# TYPE {prefix}_latency_seconds histogram')
+        for method, item in data['methods'].items():
+            label = f'method="{_escape(method)}"{extra}'
+            total = 0
+            for bound, num in item['buckets'].items():
+                total += num
+                lines.append(f'{prefix}_latency_seconds_bucket{{{label},le="{bound}"}} {total}')
+            lines.append(f'{prefix}_latency_seconds_sum{{{label}}} {item["latency_sum"]}')
+            lines.append(f'{prefix}_latency_seconds_count{{{label}}} {item["count"]}')
+
+        for name, key in (('events_total', 'count'), ('event_bytes_total', 'received_bytes')):
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            for method, item in data['events'].items():
+                lines.append(f'{prefix}_{name}{{event="{_escape(method)}"{extra}}} {item[key]}')
+
+        return '\n'.join(lines) + '\n'
+
+    def __repr__(self):
+        with self._lock:
+            return f'<DriverStats methods={len(self._methods)} events={len(self._events)}>'
+
+
+def byte_len(text):
+    """返回文本按utf-8编码后的字节数，纯ascii文本不需编码
+    :param text: 文本
+    :return: 字节数
+    """
+    return len(text) if text.isascii() else len(text.encode())
+
+
+def _escape(value):
+    """转义Prometheus标签值"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,38 @@
+# -*- coding:utf-8 -*-
+"""
+@Author  :   g1879
+@Contact :   g1879@qq.com
+"""
+from threading import Lock
+from typing import List, Tuple, Any
+
+LATENCY_BUCKETS: Tuple[float, ...]
+
+
+class DriverStats(object):
+
+    def __init__(self):
+        self.enabled: bool = ...
+        self._lock: Lock = ...
+        self._methods: dict = ...
+        self._events: dict = ...
+
+    def record(self, method: str, latency: float, sent: int, received: int, error: bool = False) -> None: ...
+
+    def record_event(self, method: str, received: int) -> None: ...
+
+    def snapshot(self) -> dict: ...
+
+    def reset(self) -> None: ...
+
+    def top(self, key: str = 'count', num: int = 10) -> List[Tuple[str, dict]]: ...
+
+    def to_json(self) -> str: ...
+
+    def to_prometheus(self, prefix: str = 'drissionpage_cdp', labels: dict = None) -> str: ...
+
+
+def byte_len(text: str) -> int: ...
+
+
+def _escape(value: Any) -> str: ...
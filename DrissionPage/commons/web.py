@@ -78,6 +78,71 @@ def get_ele_txt(e):
     return format_html(re_str)
 
 
+# 与get_ele_txt()规则相同的js实现，在页面中直接生成文本，返回[是否不需格式化, 文本]，
+# 列表与get_ele_txt()保持一致（包括'address' 'article'连成一项的写法），修改时两边要同步
+ELE_TXT_JS = '''function eleTxt(e){
+function set(s){var o = Object.create(null); s.split(' ').forEach(function(k){o[k] = 1;}); return o;}
+var nowrap = set('br sub sup em strong a font b span s i del ins img td th abbr bdi bdo cite code data dfn kbd ' +
+                 'mark q rp rt ruby samp small time u var wbr button slot content');
+var wrapAfter = set('p div h1 h2 h3 h4 h5 h6 ol li blockquote header footer addressarticle aside main nav ' +
+                    'section figcaption summary');
+var noText = set('script style video audio iframe embed noscript canvas template');
+var tab = set('td th');
+function tagOf(n){return n.nodeName.toLowerCase();}
+function last(list){return list[list.length - 1];}
+function pushTxt(list, t, pre){
+    if (t === '\\n') {return;}  // get_ele_txt()用eles()获取子节点，其中去掉了只有一个换行符的文本
+    if (pre) {list.push(t);}
+    else if (t.replace(/[ \\n\\t\\r]/g, '') !== '') {
+        list.push(t.replace(/\\n/g, ' ').replace(/^ +| +$/g, '').replace(/ {2,}/g, ' '));
+    }
+}
+function nodeTxt(ele, pre){
+    var tag = tagOf(ele);
+    if (tag === 'br') {return [true];}
+    if (!pre && tag === 'pre') {pre = true;}
+    var list = [];
+    if (noText[tag] && !pre) {return list;}
+    var prev = '', txt = null, nodes = ele.childNodes;
+    for (var i = 0; i < nodes.length; i++) {
+        var n = nodes[i];
+        if (n.nodeType === 3) {txt = txt === null ? n.data : txt + n.data; continue;}
+        if (txt !== null) {pushTxt(list, txt, pre); txt = null;}
+        if (n.nodeType !== 1) {continue;}
+        var t = tagOf(n);
+        if (!nowrap[t] && list.length && last(list) !== '\\n') {list.push('\\n');}
+        if (tab[t] && tab[prev]) {list.push('\\t');}
+        var sub = nodeTxt(n, pre);
+        for (var j = 0; j < sub.length; j++) {list.push(sub[j]);}
+        prev = t;
+    }
+    if (txt !== null) {pushTxt(list, txt, pre);}
+    if (wrapAfter[tag] && list.length && last(list) !== '\\n' && last(list) !== true) {list.push('\\n');}
+    return list;
+}
+if (noText[tagOf(e)]) {return [true, e.textContent];}
+var r = nodeTxt(e, false);
+if (r.length && last(r) === '\\n') {r.pop();}
+return [false, r.map(function(i){return i === true ? '\\n' : i;}).join('')];
+}'''
+
+
+# 判断页面绝对坐标是否在视口中的js函数，node为document或其中的节点
+IN_VIEWPORT_JS = '''function inViewport(node, x, y){
+    var d = (node.ownerDocument || node).documentElement;
+    return !(x < d.scrollLeft || y < d.scrollTop || x > d.clientWidth + d.scrollLeft || y > d.clientHeight + d.scrollTop);
+}'''
+
+
+def ele_txt_by_js(result):
+    """处理ELE_TXT_JS按值返回的结果
+    :param result: js返回的[是否不需格式化, 文本]
+    :return: 元素内所有文本
+    """
+    raw, txt = result
+    return txt if raw else format_html(txt)
+
+
 def format_html(text):
     """处理html编码字符
     :param text: html文本
@@ -93,16 +158,7 @@ def location_in_viewport(page, loc_x, loc_y):
     :param loc_y: 页面绝对坐标y
     :return:
     """
-    js = f'''function(){{var x = {loc_x}; var y = {loc_y};
-    const scrollLeft = document.documentElement.scrollLeft;
-    const scrollTop = document.documentElement.scrollTop;
-    const vWidth = document.documentElement.clientWidth;
-    const vHeight = document.documentElement.clientHeight;
-    if (x< scrollLeft || y < scrollTop || x > vWidth + scrollLeft || y > vHeight + scrollTop){{return false;}}
-    return true;}}'''
-    return page.run_js(js)
-    # const vWidth = window.innerWidth || document.documentElement.clientWidth;
-    # const vHeight = window.innerHeight || document.documentElement.clientHeight;
+    return page._run_helper('inViewport', loc_x, loc_y)
 
 
 def offset_scroll(ele, offset_x, offset_y):
@@ -16,6 +16,13 @@ from DrissionPage.chromium_element import ChromiumElement
 def get_ele_txt(e: DrissionElement) -> str: ...
 
 
+ELE_TXT_JS: str = ...
+IN_VIEWPORT_JS: str = ...
+
+
+def ele_txt_by_js(result: list) -> str: ...
+
+
 def format_html(text: str) -> str: ...
 
 
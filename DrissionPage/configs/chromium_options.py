@@ -35,6 +35,7 @@ class ChromiumOptions(object):
             self._page_load_strategy = options.get('page_load_strategy', 'normal')
             self._proxy = om.proxies.get('http', None)
             self._system_user_path = options.get('system_user_path', False)
+            self._multiplex = options.get('multiplex', False)
 
             user_path = user = False
             for arg in self._arguments:
@@ -71,6 +72,7 @@ class ChromiumOptions(object):
         self._proxy = None
         self._auto_port = False
         self._system_user_path = False
+        self._multiplex = False
 
     @property
     def download_path(self):
@@ -137,6 +139,11 @@ class ChromiumOptions(object):
         """返回是否使用系统安装的浏览器所使用的用户数据文件夹"""
         return self._system_user_path
 
+    @property
+    def multiplex(self):
+        """返回是否让所有标签页和frame共用浏览器级连接"""
+        return self._multiplex
+
     def set_argument(self, arg, value=None):
         """设置浏览器配置的argument属性
         :param arg: 属性名
@@ -337,6 +344,14 @@ class ChromiumOptions(object):
         self._system_user_path = on_off
         return self
 
+    def set_multiplex(self, on_off=True):
+        """设置是否让所有标签页和frame以扁平化会话方式共用一个浏览器级websocket连接
+        :param on_off: 开或关
+        :return: 当前对象
+        """
+        self._multiplex = on_off
+        return self
+
     def auto_port(self, on_off=True):
         """自动获取可用端口
         :param on_off: 是否开启自动获取端口号
@@ -376,7 +391,7 @@ class ChromiumOptions(object):
 
         # 设置chrome_options
         attrs = ('debugger_address', 'binary_location', 'arguments', 'extensions', 'user', 'page_load_strategy',
-                 'auto_port')
+                 'auto_port', 'multiplex')
         for i in attrs:
             om.set_item('chrome_options', i, self.__getattribute__(f'_{i}'))
         # 设置代理
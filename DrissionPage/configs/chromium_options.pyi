@@ -25,6 +25,7 @@ class ChromiumOptions(object):
         self._prefs_to_del: list = ...
         self._auto_port: bool = ...
         self._system_user_path: bool = ...
+        self._multiplex: bool = ...
 
     @property
     def download_path(self) -> str: ...
@@ -65,6 +66,9 @@ class ChromiumOptions(object):
     @property
     def system_user_path(self) -> bool: ...
 
+    @property
+    def multiplex(self) -> bool: ...
+
     def set_argument(self, arg: str, value: Union[str, None, bool] = None) -> ChromiumOptions: ...
 
     def remove_argument(self, value: str) -> ChromiumOptions: ...
@@ -104,6 +108,8 @@ class ChromiumOptions(object):
 
     def use_system_user_path(self, on_off: bool = True) -> ChromiumOptions: ...
 
+    def set_multiplex(self, on_off: bool = True) -> ChromiumOptions: ...
+
     def auto_port(self, on_off: bool = True) -> ChromiumOptions: ...
 
     def save(self, path: Union[str, Path] = None) -> str: ...
@@ -10,9 +10,10 @@ from lxml.etree import tostring
 from lxml.html import HtmlElement, fromstring
 
 from .base import DrissionElement, BasePage, BaseElement
-from .commons.constants import NoneElement
-from .commons.locator import get_loc
+from .commons.constants import NoneElement, Settings
+from .commons.locator import get_loc, parse_schema
 from .commons.web import get_ele_txt, make_absolute_link
+from .errors import ElementNotFoundError
 
 
 class SessionElement(DrissionElement):
@@ -199,6 +200,22 @@ class SessionElement(DrissionElement):
         """
         return self._ele(loc_or_str, single=False)
 
+    def extract(self, schema):
+        """按schema在元素内获取数据，所有字段在同一个lxml元素树中查找
+        :param schema: {字段名: 规则}格式的dict，规则格式见parse_schema()
+        :return: 与schema结构对应的dict
+        """
+        return extract_in_session(self, schema)
+
+    def ele_any(self, locs, timeout=None, raise_err=None):
+        """同时查找多个定位符，返回第一个找到的
+        :param locs: 定位符组成的列表或元组，都能找到时以排在前面的为准
+        :param timeout: 不起实际作用，用于和ChromiumElement对应，便于无差别调用
+        :param raise_err: 找不到元素是是否抛出异常，为None时根据全局设置
+        :return: (定位符在locs中的序号, SessionElement对象或属性、文本)，都找不到时返回(None, NoneElement)
+        """
+        return find_any_in_session(self, locs, raise_err)
+
     def s_ele(self, loc_or_str=None):
         """返回当前元素下级符合条件的第一个元素、属性或节点文本
         :param loc_or_str: 元素的定位信息，可以是loc元组，或查询字符串
@@ -245,6 +262,57 @@ class SessionElement(DrissionElement):
         return f':root{path_str[1:]}' if mode == 'css' else path_str
 
 
+class SessionElementList(list):
+    """eles()返回的SessionElement列表，可批量获取数据，filter()中的定位符在每个元素树中只执行一次
+    列表中xpath获取到的文本原样保留，texts()返回其本身，其它方法对其返回None"""
+
+    def attrs(self, name):
+        """返回所有元素的一个属性值
+        :param name: 属性名
+        :return: 属性值组成的列表，没有该属性时为None
+        """
+        return [i.attr(name) if isinstance(i, SessionElement) else None for i in self]
+
+    def props(self, name):
+        """s模式元素没有property，与attrs()相同，用于和ChromiumElementList对应，便于无差别调用
+        :param name: 属性名
+        :return: 属性值组成的列表
+        """
+        return self.attrs(name)
+
+    def texts(self):
+        """返回所有元素的文本
+        :return: 文本组成的列表
+        """
+        return [i.text if isinstance(i, SessionElement) else i for i in self]
+
+    def links(self):
+        """返回所有元素的href或src绝对url
+        :return: url组成的列表
+        """
+        return [i.link if isinstance(i, SessionElement) else None for i in self]
+
+    def filter(self, loc):
+        """返回符合定位符的元素
+        :param loc: 定位符，元素本身符合该定位符时保留
+        :return: 由符合的元素组成的新SessionElementList
+        """
+        loc = get_loc(loc)
+        matched = {}  # {元素树: 符合定位符的lxml元素集合}
+        results = SessionElementList()
+        for i in self:
+            if not isinstance(i, SessionElement):
+                continue
+            tree = i.inner_ele.getroottree()
+            if tree not in matched:
+                root = tree.getroot()
+                r = root.xpath(loc[1]) if loc[0] == 'xpath' else root.cssselect(loc[1].replace('>>>', ' '))
+                matched[tree] = set(r) if isinstance(r, list) else set()
+            if i.inner_ele in matched[tree]:
+                results.append(i)
+        return results
+
+
 def make_session_ele(html_or_ele, loc=None, single=True):
     """从接收到的对象或html文本中查找元素，返回SessionElement对象
     如要直接从html生成SessionElement而不在下级查找，loc输入None即可
@@ -327,10 +395,108 @@ def make_session_ele(html_or_ele, loc=None, single=True):
     else:
         raise TypeError('html_or_ele参数只能是元素、页面对象或html文本。')
 
-    # ---------------执行查找-----------------
+    return _find_in_lxml(html_or_ele, loc, single, page)
+
+
+def find_any_in_session(html_or_ele, locs, raise_err=None):
+    """在元素、页面或html文本中同时查找多个定位符，页面和html文本只解析一次
+    :param html_or_ele: html文本、SessionElement对象或页面对象
+    :param locs: 定位符组成的列表或元组，都能找到时以排在前面的为准
+    :param raise_err: 找不到元素是是否抛出异常，为None时根据全局设置
+    :return: (定位符在locs中的序号, SessionElement对象或属性、文本)，都找不到时返回(None, NoneElement)
+    """
+    if isinstance(html_or_ele, SessionElement):
+        finder = lambda x: make_session_ele(html_or_ele, x)
+    else:
+        page = html_or_ele if isinstance(html_or_ele, BasePage) else None
+        root = fromstring(html_or_ele.html if page else html_or_ele)
+        finder = lambda x: _find_in_lxml(root, get_loc(x), True, page)
+
+    for num, loc in enumerate(locs):
+        if not isinstance(loc, (str, tuple)):
+            raise ValueError("定位符必须为str或长度为2的tuple。")
+        r = finder(loc)
+        if not isinstance(r, NoneElement):
+            return num, r
+
+    if raise_err is not False and (Settings.raise_ele_not_found or raise_err is True):
+        raise ElementNotFoundError
+    return None, NoneElement()
+
+
+def extract_in_session(html_or_ele, schema):
+    """在元素、页面或html文本中按schema获取数据，页面和html文本只解析一次
+    :param html_or_ele: html文本、SessionElement对象或页面对象
+    :param schema: {字段名: 规则}格式的dict，规则格式见parse_schema()
+    :return: 与schema结构对应的dict
+    """
+    schema = parse_schema(schema)
+    if isinstance(html_or_ele, SessionElement):
+        return _extract_in_lxml(html_or_ele, schema, html_or_ele.page)
+
+    page = html_or_ele if isinstance(html_or_ele, BasePage) else None
+    return _extract_in_lxml(fromstring(html_or_ele.html if page else html_or_ele), schema, page)
+
+
+def _extract_in_lxml(scope, schema, page):
+    """在lxml文档或SessionElement中按schema获取数据
+    :param scope: 文档根节点（HtmlElement对象）或SessionElement对象
+    :param schema: parse_schema()处理过的schema
+    :param page: 元素所在页面对象
+    :return: 与schema结构对应的dict
+    """
+    data = {}
+    for name, rule in schema.items():
+        single = not (rule.get('rows', False) or rule.get('all', False))
+        if rule['loc'] is None:
+            found = scope if isinstance(scope, SessionElement) else SessionElement(scope, page)
+            found = found if single else [found]
+        elif isinstance(scope, SessionElement):
+            found = make_session_ele(scope, rule['loc'], single)
+        else:
+            found = _find_in_lxml(scope, rule['loc'], single, page)
+
+        if 'fields' in rule:
+            if single:
+                data[name] = _extract_in_lxml(found, rule['fields'], page) \
+                    if isinstance(found, SessionElement) else None
+            else:
+                data[name] = [_extract_in_lxml(i, rule['fields'], page) for i in found
+                              if isinstance(i, SessionElement)]
+        elif single:
+            data[name] = _ele_value(found, rule['attr'])
+        else:
+            data[name] = [_ele_value(i, rule['attr']) for i in found]
+
+    return data
+
+
+def _ele_value(ele, attr):
+    """获取extract中一个字段的值
+    :param ele: SessionElement对象，或xpath获取到的文本
+    :param attr: 'text'、'raw_text'、'html'、'inner_html'、'tag'、'link'或属性名
+    :return: 字段值
+    """
+    if isinstance(ele, NoneElement):
+        return None
+    if not isinstance(ele, SessionElement):
+        return ele
+    return getattr(ele, attr) if attr in ('text', 'raw_text', 'html', 'inner_html', 'tag', 'link') else ele.attr(attr)
+
+
+def _find_in_lxml(html_or_ele, loc, single, page):
+    """在lxml元素对象中执行查找
+    :param html_or_ele: lxml的HtmlElement对象
+    :param loc: get_loc()返回的定位元组
+    :param single: True则返回第一个，False则返回全部
+    :param page: 元素所在页面对象
+    :return: 返回SessionElement元素或列表，或属性文本
+    """
     try:
         if loc[0] == 'xpath':  # 用lxml内置方法获取lxml的元素对象列表
             ele = html_or_ele.xpath(loc[1])
+        elif loc[0] == 'deep css':  # html文本中没有shadow root，>>>当作后代选择器
+            ele = html_or_ele.cssselect(loc[1].replace('>>>', ' '))
         else:  # 用css selector获取元素对象列表
             ele = html_or_ele.cssselect(loc[1])
 
@@ -348,7 +514,8 @@ def make_session_ele(html_or_ele, loc=None, single=True):
                 return NoneElement()
 
         else:  # 返回全部
-            return [SessionElement(e, page) if isinstance(e, HtmlElement) else e for e in ele if e != '\n']
+            return SessionElementList(SessionElement(e, page) if isinstance(e, HtmlElement) else e
+                                      for e in ele if e != '\n')
 
     except Exception as e:
         if 'Invalid expression' in str(e):
@@ -7,7 +7,7 @@ from typing import Union, List, Tuple
 
 from lxml.html import HtmlElement
 
-from .base import DrissionElement, BaseElement
+from .base import DrissionElement, BaseElement, BasePage
 from .chromium_base import ChromiumBase
 from .chromium_element import ChromiumElement
 from .chromium_frame import ChromiumFrame
@@ -96,13 +96,20 @@ class SessionElement(DrissionElement):
 
     def eles(self,
              loc_or_str: Union[Tuple[str, str], str],
-             timeout: float = None) -> List[Union['SessionElement', str]]: ...
+             timeout: float = None) -> SessionElementList: ...
+
+    def extract(self, schema: dict) -> dict: ...
+
+    def ele_any(self,
+                locs: Union[List[Union[Tuple[str, str], str]], Tuple[Union[Tuple[str, str], str], ...]],
+                timeout: float = None,
+                raise_err: bool = None) -> Tuple[Union[int, None], Union['SessionElement', str, NoneElement]]: ...
 
     def s_ele(self,
               loc_or_str: Union[Tuple[str, str], str] = None) -> Union['SessionElement', str, NoneElement]: ...
 
     def s_eles(self,
-               loc_or_str: Union[Tuple[str, str], str]) -> List[Union['SessionElement', str]]: ...
+               loc_or_str: Union[Tuple[str, str], str]) -> SessionElementList: ...
 
     def _find_elements(self,
              loc_or_str: Union[Tuple[str, str], str],
@@ -115,8 +122,41 @@ class SessionElement(DrissionElement):
     def _get_ele_path(self, mode: str) -> str: ...
 
 
+class SessionElementList(List[Union[SessionElement, str]]):
+
+    def attrs(self, name: str) -> List[Union[str, None]]: ...
+
+    def props(self, name: str) -> List[Union[str, None]]: ...
+
+    def texts(self) -> List[str]: ...
+
+    def links(self) -> List[Union[str, None]]: ...
+
+    def filter(self, loc: Union[Tuple[str, str], str]) -> SessionElementList: ...
+
+
 def make_session_ele(html_or_ele: Union[str, SessionElement, SessionPage, ChromiumElement, DriverElement, BaseElement,
                                         ChromiumFrame, ChromiumBase, DriverPage],
                      loc: Union[str, Tuple[str, str]] = None,
                      single: bool = True) -> Union[
     SessionElement, str, NoneElement, List[Union[SessionElement, str]]]: ...
+
+
+def find_any_in_session(html_or_ele: Union[str, SessionElement, SessionPage],
+                        locs: Union[List[Union[Tuple[str, str], str]], Tuple[Union[Tuple[str, str], str], ...]],
+                        raise_err: bool = None) -> Tuple[Union[int, None], Union[SessionElement, str, NoneElement]]: ...
+
+
+def extract_in_session(html_or_ele: Union[str, SessionElement, SessionPage], schema: dict) -> dict: ...
+
+
+def _extract_in_lxml(scope: Union[HtmlElement, SessionElement], schema: dict, page: Union[BasePage, None]) -> dict: ...
+
+
+def _ele_value(ele: Union[SessionElement, str, NoneElement], attr: str) -> Union[str, None]: ...
+
+
+def _find_in_lxml(html_or_ele: HtmlElement,
+                  loc: Tuple[str, str],
+                  single: bool,
+                  page: Union[BasePage, None]) -> Union[SessionElement, str, NoneElement, List[Union[SessionElement, str]]]: ...
@@ -16,7 +16,7 @@ from tldextract import extract
 from .base import BasePage
 from .commons.web import cookie_to_dict, set_session_cookies
 from .configs.session_options import SessionOptions
-from .session_element import SessionElement, make_session_ele
+from .session_element import SessionElement, make_session_ele, find_any_in_session, extract_in_session
 
 
 class SessionPage(BasePage):
@@ -156,6 +156,22 @@ class SessionPage(BasePage):
         """
         return self._ele(loc_or_str, single=False)
 
+    def extract(self, schema):
+        """按schema在页面内获取数据，页面html只解析一次
+        :param schema: {字段名: 规则}格式的dict，规则格式见parse_schema()
+        :return: 与schema结构对应的dict
+        """
+        return extract_in_session(self, schema)
+
+    def ele_any(self, locs, timeout=None, raise_err=None):
+        """同时查找多个定位符，页面html只解析一次，返回第一个找到的
+        :param locs: 定位符组成的列表或元组，都能找到时以排在前面的为准
+        :param timeout: 不起实际作用，用于和ChromiumElement对应，便于无差别调用
+        :param raise_err: 找不到元素是是否抛出异常，为None时根据全局设置
+        :return: (定位符在locs中的序号, SessionElement对象或属性、文本)，都找不到时返回(None, NoneElement)
+        """
+        return find_any_in_session(self, locs, raise_err)
+
     def s_ele(self, loc_or_ele=None):
         """返回页面中符合条件的第一个元素、属性或节点文本
         :param loc_or_ele: 元素的定位信息，可以是元素对象，loc元组，或查询字符串
@@ -17,7 +17,7 @@ from .commons.constants import NoneElement
 from .base import BasePage
 from .chromium_page import ChromiumPage
 from .configs.session_options import SessionOptions
-from .session_element import SessionElement
+from .session_element import SessionElement, SessionElementList
 from .web_page import WebPage
 
 
@@ -92,13 +92,20 @@ class SessionPage(BasePage):
 
     def eles(self,
              loc_or_str: Union[Tuple[str, str], str],
-             timeout: float = None) -> List[Union[SessionElement, str]]: ...
+             timeout: float = None) -> SessionElementList: ...
+
+    def extract(self, schema: dict) -> dict: ...
+
+    def ele_any(self,
+                locs: Union[List[Union[Tuple[str, str], str]], Tuple[Union[Tuple[str, str], str], ...]],
+                timeout: float = None,
+                raise_err: bool = None) -> Tuple[Union[int, None], Union[SessionElement, str, NoneElement]]: ...
 
     def s_ele(self,
               loc_or_ele: Union[Tuple[str, str], str, SessionElement] = None) \
             -> Union[SessionElement, str, NoneElement]: ...
 
-    def s_eles(self, loc_or_str: Union[Tuple[str, str], str]) -> List[Union[SessionElement, str]]: ...
+    def s_eles(self, loc_or_str: Union[Tuple[str, str], str]) -> SessionElementList: ...
 
     def _find_elements(self, loc_or_ele: Union[Tuple[str, str], str, SessionElement],
                        timeout: float = None, single: bool = True, raise_err: bool = None) \
@@ -12,7 +12,7 @@ from tldextract import extract
 from .base import BasePage
 from .chromium_base import ChromiumBase, Timeout
 from .chromium_driver import ChromiumDriver
-from .chromium_page import ChromiumPage, ChromiumDownloadSetter, ChromiumPageSetter
+from .chromium_page import ChromiumPage, ChromiumDownloadSetter, ChromiumPageSetter, Alert
 from .chromium_tab import WebPageTab
 from .configs.chromium_options import ChromiumOptions
 from .configs.session_options import SessionOptions
@@ -42,12 +42,20 @@ class WebPage(SessionPage, ChromiumPage, BasePage):
 
         self._session = None
         self._tab_obj = None
+        self._browser_driver = None
         self._driver_options = None
         self._session_options = None
         self._response = None
         self._download_set = None
         self._set = None
         self._screencast = None
+        self._node_cache = None
+        self._object_group = None
+        self._helper_id = None
+        self._script_cache = None
+        self._remote_frames = {}
+        self._tab_drivers = {}
+        self._alert = Alert()
 
         self._set_start_options(driver_or_options, session_or_options)
         self._set_runtime_settings()
@@ -284,6 +292,28 @@ class WebPage(SessionPage, ChromiumPage, BasePage):
         elif self._mode == 'd':
             return super(SessionPage, self).eles(loc_or_str, timeout=timeout)
 
+    def extract(self, schema):
+        """按schema在页面内获取数据，d模式用一次cdp调用完成，s模式页面html只解析一次
+        :param schema: {字段名: 规则}格式的dict，规则格式见parse_schema()
+        :return: 与schema结构对应的dict
+        """
+        if self._mode == 's':
+            return super().extract(schema)
+        elif self._mode == 'd':
+            return super(SessionPage, self).extract(schema)
+
+    def ele_any(self, locs, timeout=None, raise_err=None):
+        """同时查找多个定位符，返回最先找到的一个
+        :param locs: 定位符组成的列表或元组，同时找到时以排在前面的为准
+        :param timeout: 查找元素超时时间，d模式专用
+        :param raise_err: 找不到元素是是否抛出异常，为None时根据全局设置
+        :return: (定位符在locs中的序号, 元素对象或属性、文本)，都找不到时返回(None, NoneElement)
+        """
+        if self._mode == 's':
+            return super().ele_any(locs, raise_err=raise_err)
+        elif self._mode == 'd':
+            return super(SessionPage, self).ele_any(locs, timeout=timeout, raise_err=raise_err)
+
     def s_ele(self, loc_or_ele=None):
         """查找第一个符合条件的元素以SessionElement形式返回，d模式处理复杂页面时效率很高
         :param loc_or_ele: 元素的定位信息，可以是loc元组，或查询字符串
@@ -447,6 +477,7 @@ class WebPage(SessionPage, ChromiumPage, BasePage):
         if self._has_driver:
             self._tab_obj.Browser.close()
             self._tab_obj.stop()
+            self._stop_tab_drivers()
             self._tab_obj = None
             self._has_driver = None
 
@@ -558,6 +589,7 @@ class WebPageDownloadSetter(ChromiumDownloadSetter):
 
         except CallMethodError:
             warn('\n您的浏览器版本太低，用新标签页下载文件可能崩溃，建议升级。')
+            self._page.driver.domains.enable('Page', 'download')
             self._page.driver.Page.setDownloadBehavior(behavior='allow', downloadPath=self._page.download_path)
             self._page.driver.Page.downloadWillBegin = self._download_by_browser
 
@@ -27,6 +27,9 @@ setup(
         "websocket-client",
         'click~=8.1.3'
     ],
+    extras_require={
+        'async': ['websockets'],
+    },
     classifiers=[
         "Programming Language :: Python :: 3.6",
         "Development Status :: 4 - Beta",
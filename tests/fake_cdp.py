@@ -0,0 +1,79 @@
+# -*- coding:utf-8 -*-
+"""
+测试用的假cdp服务，不需要浏览器
+"""
+from json import dumps, loads
+from threading import Lock
+from time import sleep
+
+from DrissionPage.cdp_recorder import ReplayServer, _recv_frame, _send_frame
+
+# 让页面对象能完成连接流程的默认回复
+DEFAULT_REPLIES = {
+    'DOM.getDocument': {'root': {'nodeId': 1, 'backendNodeId': 1}},
+    'DOM.resolveNode': {'object': {'type': 'object', 'objectId': 'root'}},
+    'Runtime.evaluate': {'result': {'type': 'string', 'value': 'complete'}},
+    'Page.addScriptToEvaluateOnNewDocument': {'identifier': '1'},
+}
+
+
+class FakeCdpServer(ReplayServer):
+    """按方法名回复固定结果的cdp服务，未设置的方法回复{}"""
+
+    def __init__(self, replies=None, targets=('page/tab1',), delay=0, events=None):
+        """
+        :param replies: {方法名: 结果dict或接收参数返回结果的函数}，与默认回复合并
+        :param targets: 提供的target，如'page/xxx'
+        :param delay: 每条回复前的延迟秒数
+        :param events: {方法名: [事件dict, ...]}，回复该方法后依次发出的事件
+        """
+        self.replies = dict(DEFAULT_REPLIES, **(replies or {}))
+        self.events = events or {}
+        self.targets = list(targets)
+        self.calls = []  # [(target, 方法名, 参数), ...]
+        self.closes = []  # 收到关闭帧的target
+        self._calls_lock = Lock()
+        super().__init__(None, delay=delay)
+
+    def _load(self, path):
+        self._requests = {i: [] for i in self.targets}
+        self._on_connect = {}
+
+    def _replay(self, conn, target):
+        while not self._stopped:
+            opcode, payload = _recv_frame(conn)
+            if opcode == 8:
+                self.closes.append(target)
+                _send_frame(conn, payload, 8)
+                return
+            if opcode == 9:
+                _send_frame(conn, payload, 10)
+                continue
+            if opcode != 1:
+                continue
+
+            message = loads(payload)
+            params = message.get('params', {})
+            with self._calls_lock:
+                self.calls.append((target, message['method'], params))
+
+            result = self.replies.get(message['method'], {})
+            if callable(result):
+                result = result(**params)
+            reply = {'id': message['id'], 'result': result}
+            if 'sessionId' in message:
+                reply['sessionId'] = message['sessionId']
+            if self.delay:
+                sleep(self.delay)
+            _send_frame(conn, dumps(reply, separators=(',', ':')))  # 与浏览器一样不带多余空格
+            for event in self.events.get(message['method'], ()):
+                _send_frame(conn, dumps(event, separators=(',', ':')))
+            self._on_reply(message, reply)
+
+    def methods(self, target=None):
+        """返回收到的方法名列表
+        :param target: 只返回该target的，为None时返回全部
+        :return: 方法名列表
+        """
+        with self._calls_lock:
+            return [i[1] for i in self.calls if target is None or i[0] == target]
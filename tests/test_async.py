@@ -0,0 +1,148 @@
+# -*- coding:utf-8 -*-
+from asyncio import run, gather
+from math import inf
+
+import pytest
+
+pytest.importorskip('websockets')
+
+from DrissionPage.async_chromium_driver import AsyncChromiumDriver
+from DrissionPage.async_chromium_page import AsyncChromiumBase, AsyncChromiumElement
+from DrissionPage.errors import AlertExistsError
+from fake_cdp import FakeCdpServer
+
+DIALOG_OPENING = {'method': 'Page.javascriptDialogOpening',
+                  'params': {'url': '', 'message': 'hi', 'type': 'alert', 'hasBrowserHandler': False}}
+DIALOG_CLOSED = {'method': 'Page.javascriptDialogClosed', 'params': {'result': True, 'userInput': ''}}
+
+
+def call_function_on(functionDeclaration, **kwargs):
+    """查找元素时返回一个节点，其它情况返回数字"""
+    if 'querySelector' in functionDeclaration or 'document.evaluate' in functionDeclaration:
+        return {'result': {'type': 'object', 'subtype': 'node', 'className': 'HTMLDivElement', 'objectId': 'n1'}}
+    return {'result': {'type': 'number', 'value': 3}}
+
+
+@pytest.fixture
+def server():
+    with FakeCdpServer({'Test.echo': lambda **kwargs: kwargs,
+                        'Runtime.callFunctionOn': call_function_on},
+                       events={'Test.openDialog': [DIALOG_OPENING],
+                               'Page.handleJavaScriptDialog': [DIALOG_CLOSED]}) as s:
+        yield s
+
+
+def test_start_stop(server):
+    async def main():
+        driver = AsyncChromiumDriver('tab1', 'page', server.address)
+        assert await driver.start() is True
+        assert await driver.start() is False
+        assert await driver.call_method('Test.echo', a=1) == {'a': 1}
+        assert await driver.stop() is True
+        assert await driver.stop() is False
+        return driver
+
+    driver = run(main())
+    assert driver.status == 'stopped'
+    assert driver.method_results == {}
+    assert server.methods() == ['Test.echo']
+
+
+def test_call_method(server):
+    async def main():
+        driver = AsyncChromiumDriver('tab1', 'page', server.address)
+        try:
+            results = await gather(*(driver.Test.echo(n=i) for i in range(20)))
+            error = await driver.call_method('Test.echo', 1)
+        except Exception as e:
+            error = e
+        finally:
+            await driver.stop()
+        return results, error
+
+    results, error = run(main())
+    assert results == [{'n': i} for i in range(20)]
+    assert 'key=value' in str(error)
+
+
+def test_connection_closed(server):
+    async def main():
+        driver = AsyncChromiumDriver('tab1', 'page', server.address)
+        await driver.start()
+        await driver._ws.close()  # 连接在driver不知情时断开
+        r1 = await driver.call_method('Test.echo', a=1)
+        await driver.stop()
+        r2 = await driver._send({'method': 'Test.echo', 'params': {}})  # stop()后_ws为None
+        r3 = await driver.call_method('Test.echo', a=1)
+        return r1, r2, r3
+
+    r1, r2, r3 = run(main())
+    assert r1['type'] == 'tab_closed'
+    assert r2 is None
+    assert r3['type'] == 'tab_closed'
+
+
+def test_timeout(server):
+    async def main():
+        driver = AsyncChromiumDriver('tab1', 'page', server.address)
+        await driver.start()
+        server.delay = .2
+        try:
+            with pytest.raises(TimeoutError):
+                await driver.call_method('Test.echo', _timeout=.05)
+            return dict(driver.method_results)
+        finally:
+            server.delay = 0
+            await driver.stop()
+
+    assert run(main()) == {}
+
+
+def test_alert(server):
+    async def main():
+        page = await AsyncChromiumBase(server.address, 'tab1').connect()
+        try:
+            opened, pending = await gather(page.driver.call_method('Test.openDialog'),
+                                           page.driver.call_method('Test.echo', a=1))
+            has_alert = page.driver.has_alert
+            with pytest.raises(AlertExistsError):
+                await page.run_cdp('Test.echo')
+            text = await page.handle_alert()
+            return opened, pending, has_alert, text, page.driver.has_alert, page._alert.response_accept
+        finally:
+            await page.close()
+
+    opened, pending, has_alert, text, has_alert_after, accepted = run(main())
+    assert opened == {}
+    assert pending['type'] == 'alert_exists'  # 等待中的调用在提示框出现时立即返回
+    assert has_alert is True
+    assert text == 'hi'
+    assert has_alert_after is False
+    assert accepted is True
+
+
+def test_run_js(server):
+    async def main():
+        async with AsyncChromiumBase(server.address, 'tab1') as page:
+            ele = AsyncChromiumElement(page, 'e1')
+            return await page.run_js('return 1 + 2;', 1, 'a', inf, ele)
+
+    assert run(main()) == 3
+    params = [i[2] for i in server.calls if i[1] == 'Runtime.callFunctionOn'][-1]
+    assert params['functionDeclaration'] == 'function(){return 1 + 2;}'
+    assert params['objectId'] == 'root'
+    assert params['arguments'] == [{'value': 1}, {'value': 'a'}, {'unserializableValue': 'Infinity'},
+                                   {'objectId': 'e1'}]
+
+
+def test_relative_find(server):
+    async def main():
+        async with AsyncChromiumBase(server.address, 'tab1') as page:
+            ele = AsyncChromiumElement(page, 'e1')
+            return await ele.ele('css:>div'), await ele.ele('xpath:/p')
+
+    by_css, by_xpath = run(main())
+    assert isinstance(by_css, AsyncChromiumElement) and by_css.obj_id == 'n1'
+    js = [i[2]['functionDeclaration'] for i in server.calls if i[1] == 'Runtime.callFunctionOn']
+    assert 'querySelector(":scope>div")' in js[0]
+    assert "'./p'" in js[1]
@@ -0,0 +1,128 @@
+# -*- coding:utf-8 -*-
+from base64 import b64encode
+from importlib.util import find_spec
+from json import dumps, loads
+from os import urandom
+from time import perf_counter, sleep
+
+import pytest
+
+from DrissionPage.chromium_driver import ChromiumDriver
+from DrissionPage.commons import codec
+from DrissionPage.commons.codec import LazyField, b64decode_field, loads_message, set_json_codec
+from fake_cdp import FakeCdpServer
+
+CODECS = ('orjson', 'ujson', 'json')
+
+
+def make_message(size, **extra):
+    """生成和浏览器一样没有多余空格的消息"""
+    data = urandom(size)
+    result = dict(extra, data=b64encode(data).decode())
+    return data, dumps({'id': 1, 'result': result}, separators=(',', ':'))
+
+
+def test_small_message_not_lazy():
+    _, text = make_message(100)
+    assert loads_message(text) == loads(text)
+
+
+def test_lazy_field_keeps_offsets():
+    data, text = make_message(codec.LAZY_SIZE, other='x')
+    message = loads_message(text)
+    field = message['result']['data']
+    assert isinstance(field, LazyField)
+    assert field._text is text  # 没有复制原文
+    assert message['result']['other'] == 'x'
+    assert field == loads(text)['result']['data']
+    assert len(field) == len(str(field))
+    assert field.startswith(str(field)[:8])
+    assert field.bytes() == data
+    assert b64decode_field(field) == data
+
+
+def test_two_lazy_fields():
+    body = 'b' * codec.LAZY_SIZE
+    data = 'QUJD' * codec.LAZY_SIZE
+    text = dumps({'id': 1, 'result': {'body': body, 'data': data, 'n': 1}}, separators=(',', ':'))
+    message = loads_message(text)
+    assert isinstance(message['result']['body'], LazyField)
+    assert isinstance(message['result']['data'], LazyField)
+    assert message['result']['body'] == body
+    assert message['result']['data'] == data
+    assert message['result']['n'] == 1
+
+
+def test_escaped_field_parsed_normally():
+    body = 'a\nb' * codec.LAZY_SIZE
+    text = dumps({'id': 1, 'result': {'body': body}}, separators=(',', ':'))
+    assert loads_message(text)['result']['body'] == body
+
+
+def test_save(tmp_path):
+    data, text = make_message(codec.LAZY_SIZE)
+    field = loads_message(text)['result']['data']
+    path = tmp_path / 'a.bin'
+    field.save(path)
+    assert path.read_bytes() == data
+
+
+@pytest.fixture
+def restore_codec():
+    name = codec.codec_name
+    yield
+    set_json_codec(name)
+
+
+@pytest.mark.parametrize('name', CODECS)
+def test_codecs_identical(restore_codec, name):
+    if find_spec(name) is None:
+        with pytest.raises(ModuleNotFoundError):
+            set_json_codec(name)
+        return
+
+    assert set_json_codec(name) == name
+    obj = {'id': 3, 'method': 'Runtime.evaluate', 'params': {'expression': '"中文"/\\n', 'n': [1, 2.5, None, True]}}
+    assert loads(codec.dumps(obj)) == obj
+    assert codec.loads(dumps(obj)) == obj
+
+    _, text = make_message(codec.LAZY_SIZE, text='中文\n"x"')
+    expected = loads(text)
+    message = loads_message(text)
+    assert message['result']['text'] == expected['result']['text']
+    assert str(message['result']['data']) == expected['result']['data']
+
+
+def test_fallback_order(restore_codec):
+    expected = next(i for i in CODECS if i == 'json' or find_spec(i) is not None)
+    assert set_json_codec() == expected
+    with pytest.raises(ValueError):
+        set_json_codec('xml')
+
+
+def test_public_results_are_str():
+    data, text = make_message(codec.LAZY_SIZE)
+    reply = loads(text)['result']
+    with FakeCdpServer({'Page.captureScreenshot': reply}, events={'Page.navigate': [
+            {'method': 'Page.screencastFrame', 'params': reply}]}) as server:
+        driver = ChromiumDriver('tab1', 'page', server.address)
+        frames = []
+        driver.set_listener('Page.screencastFrame', lambda **kwargs: frames.append(kwargs))
+        driver.start()
+        try:
+            r = driver.call_method('Page.captureScreenshot', _timeout=2)
+            assert type(r['data']) is str and r == reply
+            assert type(driver.call_method_async('Page.captureScreenshot').result(2)['data']) is str
+
+            r = driver.call_method('Page.captureScreenshot', _lazy=True, _timeout=2)
+            assert isinstance(r['data'], LazyField)
+            assert r['data'].bytes() == data
+            assert driver._lazy_ids == set()
+
+            driver.call_method('Page.navigate', _timeout=2)
+            end_time = perf_counter() + 2
+            while not frames and perf_counter() < end_time:
+                sleep(.01)
+            assert type(frames[0]['data']) is str
+        finally:
+            driver.stop()
@@ -0,0 +1,90 @@
+# -*- coding:utf-8 -*-
+"""DEEP_QUERY_JS的测试，用node执行，dom和选择器匹配由只支持tag和组合符的简单实现模拟"""
+from json import loads
+from shutil import which
+from subprocess import run
+
+import pytest
+
+from DrissionPage.chromium_element import DEEP_QUERY_JS
+
+DOM_JS = r'''
+function tokens(sel){
+    return sel.trim().replace(/\s*([>+~])\s*/g, ' $1 ').split(/\s+/).reduce(function(r, t){
+        if (r.length && !/^[>+~]$/.test(t) && !/^[>+~ ]$/.test(r[r.length - 1])) {r.push(' ');}
+        r.push(t); return r;}, []);
+}
+function matchAt(el, ts, i, scope){
+    var t = ts[i];
+    if (t === ':scope' ? el !== scope : (t !== '*' && el.tag !== t)) {return false;}
+    if (i === 0) {return true;}
+    var comb = ts[i - 1], p;
+    if (comb === '>') {return el.parentNode.nodeType === 1 && matchAt(el.parentNode, ts, i - 2, scope)
+                               || el.parentNode === scope && ts[i - 2] === ':scope';}
+    if (comb === '+') {p = el.previousElementSibling; return !!p && matchAt(p, ts, i - 2, scope);}
+    if (comb === '~') {
+        for (p = el.previousElementSibling; p; p = p.previousElementSibling) {if (matchAt(p, ts, i - 2, scope)) {return true;}}
+        return false;
+    }
+    for (p = el.parentNode; p; p = p.parentNode) {
+        if (p === scope && ts[i - 2] === ':scope') {return true;}
+        if (p.nodeType === 1 && matchAt(p, ts, i - 2, scope)) {return true;}
+    }
+    return false;
+}
+function descendants(node){
+    var r = [];
+    node.children.forEach(function(c){r.push(c); r = r.concat(descendants(c));});
+    return r;
+}
+function qsa(node, sel){
+    // 与浏览器一致：ShadowRoot中:scope不匹配任何元素
+    var scope = node.nodeType === 1 ? node : null;
+    return descendants(node).filter(function(e){
+        return sel.split(',').some(function(s){var ts = tokens(s); return matchAt(e, ts, ts.length - 1, scope);});
+    });
+}
+function make(d, parent){
+    var n = {nodeType: d.shadow ? 11 : 1, tag: d.tag, id: d.id, parentNode: parent, shadowRoot: null,
+             children: [], host: null};
+    n.querySelectorAll = function(s){return qsa(n, s);};
+    n.matches = function(s){var ts = tokens(s); return matchAt(n, ts, ts.length - 1, null);};
+    n.children = (d.c || []).map(function(c){return make(c, n);});
+    n.children.forEach(function(c, i){
+        c.nextElementSibling = n.children[i + 1] || null;
+        c.previousElementSibling = n.children[i - 1] || null;
+    });
+    if (d.root) {n.shadowRoot = make(d.root, null); n.shadowRoot.host = n;}
+    return n;
+}
+'''
+
+TREE = '''{"shadow": true, "c": [
+    {"tag": "div", "id": "a", "c": [{"tag": "span", "id": "s1"}]},
+    {"tag": "p", "id": "p"},
+    {"tag": "div", "id": "b", "c": [{"tag": "span", "id": "s2"}, {"tag": "x-comp", "id": "host",
+        "root": {"shadow": true, "c": [{"tag": "div", "id": "inner", "c": [{"tag": "span", "id": "s3"}]}]}}]}
+]}'''
+
+CASES = [
+    (':scope>div', ['a', 'b']),
+    (':scope > div span', ['s1', 's2']),
+    (':scope>div>span', ['s1', 's2']),
+    (':scope>p+div', ['b']),
+    (':scope>div~div', ['b']),
+    (':scope+div', []),
+    (':scope span', ['s1', 's2']),
+    (':scope>div, :scope>p', ['a', 'b', 'p']),
+    ('span', ['s1', 's2', 's3']),
+    ('x-comp >>> :scope>div', ['inner']),
+]
+
+
+@pytest.mark.skipif(which('node') is None, reason='需要node执行js')
+@pytest.mark.parametrize('sel, ids', CASES)
+def test_deep_query_shadow_root(sel, ids):
+    js = (DOM_JS + DEEP_QUERY_JS + f'\nvar root = make({TREE}, null);\n'
+          f'console.log(JSON.stringify(deepQuery(root, {sel!r}, true).map(function(i){{return i.id;}})));')
+    r = run(['node', '-e', js], capture_output=True, text=True)
+    assert r.returncode == 0, r.stderr
+    assert loads(r.stdout) == ids
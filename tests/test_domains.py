@@ -0,0 +1,60 @@
+# -*- coding:utf-8 -*-
+import pytest
+
+from DrissionPage.chromium_driver import ChromiumDriver
+from fake_cdp import FakeCdpServer
+
+
+@pytest.fixture
+def driver():
+    d = ChromiumDriver('tab1', 'page', '127.0.0.1:1')  # 不连接，只测试文本判断
+    d.sessions['s1'] = ChromiumDriver('tab2', 'page', '127.0.0.1:1')
+    return d
+
+
+def test_skip_unheard_event(driver):
+    assert driver._skip_event('{"method":"DOM.childNodeCountUpdated","params":{"nodeId":1}}')
+    assert driver.domains.suppressed == {'DOM.childNodeCountUpdated': 1}
+
+    driver.set_listener('DOM.childNodeCountUpdated', lambda **kwargs: None)
+    assert not driver._skip_event('{"method":"DOM.childNodeCountUpdated","params":{"nodeId":1}}')
+
+
+def test_skip_session_event(driver):
+    session = driver.sessions['s1']
+    text = '{"method":"DOM.documentUpdated","params":{},"sessionId":"s1"}'
+    assert driver._skip_event(text)
+    assert session.domains.suppressed == {'DOM.documentUpdated': 1}
+    assert driver.domains.suppressed == {}
+
+    session.set_listener('DOM.documentUpdated', lambda **kwargs: None)
+    assert not driver._skip_event(text)
+    assert not driver._skip_event('{"method":"DOM.documentUpdated","params":{},"sessionId":"unknown"}')
+
+
+@pytest.mark.parametrize('text', [
+    '{"method":"DOM.documentUpdated","sessionId":"s1","params":{}}',  # sessionId不在最后
+    '{"method":"DOM.documentUpdated", "params":{},"sessionId":"s1"}',  # 有空格
+    '{"method":"DOM.documentUpdated","params":{"x":{"sessionId":"s1"}}}',
+    '{"method":"Target.detachedFromTarget","params":{"sessionId":"s1"}}',
+])
+def test_unknown_layout_decoded(driver, text):
+    driver.sessions['s1'].set_listener('DOM.documentUpdated', lambda **kwargs: None)
+    assert not driver._skip_event(text)
+
+
+def test_domain_ref_count():
+    with FakeCdpServer() as server:
+        driver = ChromiumDriver('tab1', 'page', server.address)
+        driver.start()
+        try:
+            driver.domains.enable('Page', 'page')
+            driver.domains.enable('Page', 'screencast')
+            driver.domains.disable('Page', 'screencast')
+            assert driver.domains.features('Page') == {'page'}
+            driver.domains.disable('Page', 'page')
+            assert not driver.domains.is_enabled('Page')
+            assert server.methods().count('Page.enable') == 1
+            assert server.methods().count('Page.disable') == 1
+        finally:
+            driver.stop()
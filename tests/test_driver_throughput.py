@@ -0,0 +1,126 @@
+# -*- coding:utf-8 -*-
+"""
+多线程共用一个ChromiumDriver时的吞吐量测试，对比旧的Queue轮询实现和现在的Future实现
+查看结果：python -m pytest -s tests/test_driver_throughput.py
+"""
+from json import dumps
+from queue import Queue, Empty
+from threading import Thread
+from time import perf_counter
+
+import pytest
+
+from DrissionPage.chromium_driver import ChromiumDriver
+from fake_cdp import FakeCdpServer
+
+
+class _QueueSlot(Queue):
+    """让接收线程能像填Future一样填入结果的Queue"""
+
+    def done(self):
+        return False
+
+    def set_result(self, result):
+        self.put(result)
+
+
+class LegacyDriver(ChromiumDriver):
+    """模拟改动前的_send()：非原子的id自增，每次调用新建Queue并以1秒为片轮询"""
+
+    def _send(self, message, timeout=None, lazy=False):
+        if 'id' not in message:
+            self._cur_id += 1
+            message['id'] = self._cur_id
+
+        message_json = dumps(message)
+        if not isinstance(timeout, (int, float)) or timeout > 1:
+            q_timeout = 1
+        else:
+            q_timeout = timeout / 2.0
+
+        try:
+            slot = self.method_results[message['id']] = _QueueSlot()  # 现在的接收线程会先取出再填入
+            self._ws.send(message_json)
+
+            while not self._stopped.is_set():
+                try:
+                    if isinstance(timeout, (int, float)):
+                        if timeout < q_timeout:
+                            q_timeout = timeout
+                        timeout -= q_timeout
+
+                    return slot.get(timeout=q_timeout)
+
+                except Empty:
+                    if isinstance(timeout, (int, float)) and timeout <= 0:
+                        raise TimeoutError(f"调用{message['method']}超时。")
+                    continue
+
+        finally:
+            self.method_results.pop(message['id'], None)
+
+
+def run_benchmark(driver_cls, address, threads, calls):
+    """从多个线程同时调用同一个driver
+    :param driver_cls: driver类
+    :param address: 服务地址
+    :param threads: 线程数
+    :param calls: 每个线程的调用次数
+    :return: (每秒调用次数, 结果错误或超时的次数, 结束后残留的等待项数)
+    """
+    driver = driver_cls(tab_id='tab1', tab_type='page', address=address)
+    driver.start()
+    errors = []
+
+    def worker(n):
+        for i in range(calls):
+            key = f'{n}-{i}'
+            try:
+                r = driver.call_method('Test.echo', key=key, _timeout=5)
+                if r.get('key') != key:
+                    errors.append(key)
+            except TimeoutError:  # 旧实现id重复时会收不到结果
+                errors.append(key)
+
+    ths = [Thread(target=worker, args=(n,)) for n in range(threads)]
+    t = perf_counter()
+    for th in ths:
+        th.start()
+    for th in ths:
+        th.join()
+    t = perf_counter() - t
+
+    left = len(driver.method_results)
+    driver.stop()
+    return threads * calls / t, len(errors), left
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FakeCdpServer({'Test.echo': lambda **kwargs: kwargs}) as s:
+        yield s
+
+
+@pytest.mark.parametrize('threads', [1, 8])
+def test_throughput(server, threads):
+    speed, errors, left = run_benchmark(ChromiumDriver, server.address, threads, 200)
+    legacy_speed, legacy_errors, _ = run_benchmark(LegacyDriver, server.address, threads, 200)
+    print(f'\n{threads}线程：现在 {speed:.0f} 次/秒，旧实现 {legacy_speed:.0f} 次/秒（错误{legacy_errors}次）')
+    assert errors == 0
+    assert left == 0
+
+
+def test_timeout_leaves_no_slot(server):
+    server.delay = .2
+    driver = ChromiumDriver(tab_id='tab1', tab_type='page', address=server.address)
+    driver.start()
+    try:
+        with pytest.raises(TimeoutError):
+            driver.call_method('Test.echo', _timeout=.05)
+        with pytest.raises(TimeoutError):
+            driver.call_many([('Test.echo', None), ('Test.echo', None)], timeout=.05)
+        assert driver.method_results == {}
+    finally:
+        server.delay = 0
+        driver.stop()
+
@@ -0,0 +1,65 @@
+# -*- coding:utf-8 -*-
+"""ELE_TXT_JS与get_ele_txt()的结果对比，js用node执行，dom由lxml解析的结果生成"""
+from json import dumps, loads
+from shutil import which
+from subprocess import run
+
+import pytest
+from lxml.etree import _Comment
+
+from DrissionPage.commons.web import ELE_TXT_JS, ele_txt_by_js, get_ele_txt
+from DrissionPage.session_element import make_session_ele
+
+CASES = [
+    '<div>hello <b>world</b></div>',
+    '<div><p>a</p><p>b</p>tail</div>',
+    '<div>line<br>break<br></div>',
+    '<div>  many    spaces\n here  </div>',
+    '<div><span>a</span><span>b</span><div>c</div>d</div>',
+    '<ul><li>one</li><li>two <a href="#">link</a></li></ul>',
+    '<table><tr><td>1</td><td>2</td></tr><tr><th>a</th><td>b</td><td></td></tr></table>',
+    '<div><pre>  keep\n   spaces <b> and  tags</b>\n</pre> after</div>',
+    '<div>x<script>var a = 1;</script>y<style>p {}</style><template><p>t</p></template></div>',
+    '<div>&lt;tag&gt; &amp;amp; a&nbsp;b</div>',
+    '<div>a<!-- c -->b</div>',
+    '<div><h1>T</h1><section><p>s</p></section><article>x</article><address>y</address>z</div>',
+    '<div><p>a<br></p><p></p><div><div>deep</div></div></div>',
+    '<pre>a<b>b</b>\n<i>c</i>\n\n</pre>',
+    '<div><td>1</td><span>x</span><td>2</td><td>3</td></div>',
+    '<script>raw   text</script>',
+    '<p>\n\t </p>',
+]
+
+
+def to_node(ele):
+    """把lxml元素转换成js中用于生成节点的数据"""
+    children = [{'t': 3, 'd': ele.text}] if ele.text else []
+    for i in ele:
+        children.append({'t': 8} if isinstance(i, _Comment) else to_node(i))
+        if i.tail:
+            children.append({'t': 3, 'd': i.tail})
+    return {'t': 1, 'n': ele.tag.upper(), 'c': children}
+
+
+JS = '''
+var eleTxt = (%s);
+function build(d){
+    if (d.t !== 1) {return {nodeType: d.t, nodeName: d.t === 3 ? '#text' : '#comment', data: d.d || ''};}
+    var n = {nodeType: 1, nodeName: d.n, childNodes: d.c.map(build)};
+    Object.defineProperty(n, 'textContent', {get: function(){
+        return this.childNodes.map(function(i){return i.nodeType === 1 ? i.textContent
+                                                     : i.nodeType === 3 ? i.data : '';}).join('');}});
+    return n;
+}
+console.log(JSON.stringify(%s.map(function(d){return eleTxt(build(d));})));
+'''
+
+
+@pytest.mark.skipif(which('node') is None, reason='需要node执行js')
+def test_ele_txt_parity():
+    eles = [make_session_ele(f'<html><body>{i}</body></html>', 'xpath://body/*') for i in CASES]
+    r = run(['node', '-e', JS % (ELE_TXT_JS, dumps([to_node(i.inner_ele) for i in eles]))],
+            capture_output=True, text=True, encoding='utf-8')
+    assert r.returncode == 0, r.stderr
+    for case, ele, result in zip(CASES, eles, loads(r.stdout)):
+        assert ele_txt_by_js(result) == get_ele_txt(ele), case
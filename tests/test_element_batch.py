@@ -0,0 +1,74 @@
+# -*- coding:utf-8 -*-
+from DrissionPage.chromium_element import ChromiumElement, ChromiumElementList, snapshot_eles
+
+
+class FakePage(object):
+    """记录cdp调用的页面对象，DOM.resolveNode按backend id生成object id，js调用原样返回参数"""
+
+    def __init__(self):
+        self._object_group = None
+        self.calls = []
+        self.resolved = []  # DOM.resolveNode的参数
+
+    def run_cdp(self, cmd, **cmd_args):
+        self.calls.append(cmd)
+        return self._reply(cmd, cmd_args)
+
+    def run_cdp_many(self, cmds, timeout=None):
+        self.calls.append(tuple(i[0] for i in cmds))
+        return [self._reply(cmd, cmd_args) for cmd, cmd_args in cmds]
+
+    def _reply(self, cmd, cmd_args):
+        if cmd == 'DOM.resolveNode':
+            self.resolved.append(cmd_args)
+            return {'object': {'objectId': f'obj{cmd_args["backendNodeId"]}'}}
+        if cmd == 'Runtime.callFunctionOn' and 'getBoundingClientRect' in cmd_args['functionDeclaration']:
+            return {'result': {'value': [{'tag': i['objectId']} for i in cmd_args['arguments']]}}
+        if cmd == 'Runtime.callFunctionOn':
+            return {'result': {'value': [i['objectId'] for i in cmd_args['arguments']]}}
+        raise AssertionError(cmd)
+
+
+def make_list(page, n):
+    return ChromiumElementList(ChromiumElement(page, node_id=i, backend_id=i) for i in range(1, n + 1))
+
+
+def test_run_resolves_ids_in_one_batch():
+    page = FakePage()
+    eles = make_list(page, 5)
+    assert eles.props('id') == [f'obj{i}' for i in range(1, 6)]
+    assert page.calls == [('DOM.resolveNode',) * 5, 'Runtime.callFunctionOn']
+
+    page.calls.clear()
+    eles.props('id')
+    assert page.calls == ['Runtime.callFunctionOn']
+
+
+def test_run_keeps_existing_ids():
+    page = FakePage()
+    eles = make_list(page, 3)
+    eles.insert(1, 'text')
+    eles.append(ChromiumElement(page, obj_id='given'))
+    assert eles.props('id') == ['obj1', None, 'obj2', 'obj3', 'given']
+    assert page.calls == [('DOM.resolveNode',) * 3, 'Runtime.callFunctionOn']
+
+
+def test_snapshot_resolves_ids_in_one_batch():
+    page = FakePage()
+    eles = make_list(page, 4)
+    eles.append('text')
+    r = snapshot_eles(eles, 'tag')
+    assert [i.tag for i in r[:4]] == [f'obj{i}' for i in range(1, 5)]
+    assert r[4] == 'text'
+    assert page.calls == [('DOM.resolveNode',) * 4, 'Runtime.callFunctionOn']
+
+
+def test_scope_group_only_for_new_elements():
+    page = FakePage()
+    old = ChromiumElement(page, backend_id=1)
+    page._object_group = 'scope'
+    new = ChromiumElement(page, backend_id=2)
+    old.ids.obj_id
+    new.ids.obj_id
+    page._object_group = None
+    assert page.resolved == [{'backendNodeId': 1}, {'backendNodeId': 2, 'objectGroup': 'scope'}]
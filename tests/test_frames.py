@@ -0,0 +1,71 @@
+# -*- coding:utf-8 -*-
+from threading import Event
+from types import SimpleNamespace
+
+import DrissionPage.chromium_frame
+from DrissionPage import ChromiumPage, ChromiumOptions
+from DrissionPage.chromium_base import ChromiumBase
+from fake_cdp import FakeCdpServer
+
+
+class FakeFrame(object):
+    """记录创建次数的ChromiumFrame替代品"""
+    created = []
+
+    def __init__(self, page, ele):
+        self._backend_id = ele.ids.backend_id
+        self._tab_obj = SimpleNamespace(_stopped=Event())
+        self._tab_obj.stop = self._tab_obj._stopped.set
+        self.created.append(self)
+
+    def eles_in_all_frames(self, loc):
+        return [(id(self), loc)]
+
+
+def test_remote_frame_reused(monkeypatch):
+    monkeypatch.setattr(DrissionPage.chromium_frame, 'ChromiumFrame', FakeFrame)
+    FakeFrame.created = []
+    page = SimpleNamespace(_object_group=None, _remote_frames={})
+
+    frame1, r1 = ChromiumBase._eles_in_remote_frame(page, None, 5, 'a')
+    frame2, r2 = ChromiumBase._eles_in_remote_frame(page, frame1, 5, 'b')
+    assert len(FakeFrame.created) == 1
+    assert frame1 is frame2 and r1[0][0] == r2[0][0]
+
+    frame3, _ = ChromiumBase._eles_in_remote_frame(page, frame2, 6, 'a')  # iframe元素已替换
+    assert len(FakeFrame.created) == 2
+    assert FakeFrame.created[0]._tab_obj._stopped.is_set()
+
+    frame3._tab_obj.stop()  # 连接已断开
+    frame4, _ = ChromiumBase._eles_in_remote_frame(page, frame3, 6, 'a')
+    assert len(FakeFrame.created) == 3
+    assert frame4 is FakeFrame.created[2]
+    assert page._remote_frames == {}  # 由调用者合并，线程中不修改
+
+
+def test_only_frames_of_this_page():
+    targets = {'targetInfos': [
+        {'targetId': 'tab1', 'type': 'page'},
+        {'targetId': 'mine', 'type': 'iframe', 'parentFrameId': 'main'},
+        {'targetId': 'nested', 'type': 'iframe', 'parentFrameId': 'child'},
+        {'targetId': 'other', 'type': 'iframe', 'parentFrameId': 'other_main'},  # 其它标签页中的
+    ]}
+    replies = {'SystemInfo.getProcessInfo': {'processInfo': []},
+               'Page.getFrameTree': {'frameTree': {'frame': {'id': 'main'},
+                                                   'childFrames': [{'frame': {'id': 'child'}}]}},
+               'Target.getTargets': targets,
+               'DOM.getFrameOwner': {'backendNodeId': 7},
+               'DOM.describeNode': {'node': {'contentDocument': {'backendNodeId': 8}}},
+               'Runtime.callFunctionOn': {'result': {'type': 'object', 'subtype': 'array',
+                                                     'description': 'Array(0)', 'objectId': 'a'}}}
+    with FakeCdpServer(replies) as server:
+        options = ChromiumOptions(read_file=False)
+        options.set_paths(local_port=int(server.address.split(':')[1]))
+        page = ChromiumPage(options, tab_id='tab1')
+        try:
+            assert page.eles_in_all_frames('tag:div') == []
+        finally:
+            page.quit()
+
+        owners = [i[2]['frameId'] for i in server.calls if i[1] == 'DOM.getFrameOwner']
+        assert owners == ['child', 'mine', 'nested']
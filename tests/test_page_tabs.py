@@ -0,0 +1,76 @@
+# -*- coding:utf-8 -*-
+from time import perf_counter
+
+import pytest
+
+from DrissionPage import ChromiumPage, ChromiumOptions
+from DrissionPage.chromium_driver import ChromiumDriver, CLOSE_TIMEOUT
+from fake_cdp import FakeCdpServer
+
+
+@pytest.fixture
+def server():
+    with FakeCdpServer({'SystemInfo.getProcessInfo': {'processInfo': []}},
+                       targets=('page/tab1', 'page/tab2', 'page/tab3')) as s:
+        yield s
+
+
+@pytest.fixture
+def page(server):
+    options = ChromiumOptions(read_file=False)
+    options.set_paths(local_port=int(server.address.split(':')[1]))
+    p = ChromiumPage(options, tab_id='tab1')
+    yield p
+    p.quit()
+
+
+def test_stop_sends_close_frame(server):
+    driver = ChromiumDriver('tab1', 'page', server.address)
+    driver.start()
+    t = perf_counter()
+    driver.stop()
+    assert perf_counter() - t < CLOSE_TIMEOUT
+    assert server.closes == ['page/tab1']
+    assert not driver._recv_th.is_alive()
+
+
+def test_switch_reuses_driver(server, page):
+    driver1 = page.driver
+    page.to_tab('tab2')
+    driver2 = page.driver
+    assert page.tab_id == 'tab2'
+    assert not driver1._stopped.is_set()
+    assert driver1.event_handlers == {}  # 不再触发本对象的回调
+
+    page.to_tab('tab1')
+    assert page.driver is driver1
+    assert page.tab_id == 'tab1'
+    assert 'Page.javascriptDialogOpening' in driver1.event_handlers
+    assert server.closes == []
+    assert server.methods('page/tab1').count('DOM.enable') == 1
+
+    page.to_tab('tab2')
+    assert page.driver is driver2
+
+
+def test_switch_keeps_helper(server, page):
+    page.set.helper_runtime(True)
+    page.to_tab('tab2')
+    assert page._helper_id == '1'
+    page.set.helper_runtime(False)
+    page.to_tab('tab1')
+    assert page._helper_id is None
+    assert server.methods('page/tab1').count('Page.addScriptToEvaluateOnNewDocument') == 1
+    assert 'Page.removeScriptToEvaluateOnNewDocument' in server.methods('page/tab1')
+
+
+def test_close_tabs_stops_parked_drivers(server, page):
+    page.to_tab('tab2')
+    page.to_tab('tab3')
+    driver2 = page._tab_drivers['tab2'][0]
+    page.close_tabs(['tab2', 'tab3'])
+    assert driver2._stopped.is_set()
+    assert 'page/tab2' in server.closes and 'page/tab3' in server.closes
+    assert page.tab_id == 'tab1'
+    assert page.tabs == ['tab1']
+    assert 'tab2' not in page._tab_drivers
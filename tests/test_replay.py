@@ -0,0 +1,98 @@
+# -*- coding:utf-8 -*-
+from time import perf_counter, sleep
+
+import pytest
+from requests import get
+
+from DrissionPage.cdp_recorder import CdpRecorder, ReplayServer
+from DrissionPage.chromium_driver import ChromiumDriver
+from fake_cdp import FakeCdpServer
+
+LOAD_EVENT = {'method': 'Page.loadEventFired', 'params': {'timestamp': 1.5}}
+
+
+def tab_ids(address):
+    return [i['id'] for i in get(f'http://{address}/json').json()]
+
+
+def run_session(address):
+    """在一个标签页连接上执行固定的操作
+    :param address: 服务地址
+    :return: (各调用的结果, 收到的事件参数)
+    """
+    events = []
+    driver = ChromiumDriver('tab1', 'page', address)
+    driver.start()
+    driver.set_listener('Page.loadEventFired', lambda **kwargs: events.append(kwargs))
+    try:
+        results = [driver.call_method('Test.echo', n=i, _timeout=2) for i in range(3)]
+        results.append(driver.call_method('Page.navigate', url='about:blank', _timeout=2))
+        results.append(driver.call_method('Target.createTarget', url='', _timeout=2))
+        end_time = perf_counter() + 2
+        while not events and perf_counter() < end_time:
+            sleep(.01)
+    finally:
+        driver.stop()
+    return results, events
+
+
+def test_http_endpoints():
+    with FakeCdpServer(targets=('page/a', 'page/b')) as server:
+        address = server.address
+        assert tab_ids(address) == ['a', 'b']
+        assert get(f'http://{address}/json/list').json() == get(f'http://{address}/json').json()
+        assert get(f'http://{address}/json/version').json()['webSocketDebuggerUrl'].startswith('ws://')
+
+        assert get(f'http://{address}/json/activate/b').status_code == 200
+        assert tab_ids(address) == ['b', 'a']
+        assert get(f'http://{address}/json/close/a').text == 'Target is closing'
+        assert tab_ids(address) == ['b']
+        assert get(f'http://{address}/json/close/a').status_code == 404
+        assert get(f'http://{address}/json/activate/x').status_code == 404
+
+        new = get(f'http://{address}/json/new?about:blank').json()
+        assert tab_ids(address) == [new['id'], 'b']
+        assert get(f'http://{address}/json/unknown').status_code == 404
+
+
+def test_record_and_replay(tmp_path):
+    path = tmp_path / 'session.txt'
+    replies = {'Test.echo': lambda **kwargs: kwargs, 'Target.createTarget': {'targetId': 'tab2'}}
+    with FakeCdpServer(replies, events={'Page.navigate': [LOAD_EVENT]}) as server:
+        with CdpRecorder(path):
+            recorded = run_session(server.address)
+    assert recorded[0][:3] == [{'n': 0}, {'n': 1}, {'n': 2}]
+    assert recorded[1] == [LOAD_EVENT['params']]
+
+    with ReplayServer(path) as replay:
+        assert tab_ids(replay.address) == ['tab1']  # 记录期间新建的标签页在新建后才出现
+        assert run_session(replay.address) == recorded
+        assert tab_ids(replay.address) == ['tab2', 'tab1']
+
+        driver = ChromiumDriver('tab1', 'page', replay.address)
+        driver.start()
+        try:
+            r = driver.call_method('Test.notRecorded', _timeout=2)
+            assert r['error'] == 'not found in recording'
+        finally:
+            driver.stop()
+
+
+def test_replay_close_target(tmp_path):
+    path = tmp_path / 'session.txt'
+    with FakeCdpServer({'Target.closeTarget': {'success': True}}, targets=('page/tab1', 'page/tab2')) as server:
+        with CdpRecorder(path):
+            driver = ChromiumDriver('tab1', 'page', server.address)
+            driver.start()
+            driver.call_method('Target.closeTarget', targetId='tab2', _timeout=2)
+            driver.stop()
+
+    with ReplayServer(path) as replay:
+        driver = ChromiumDriver('tab1', 'page', replay.address)
+        driver.start()
+        try:
+            assert tab_ids(replay.address) == ['tab1']
+            driver.call_method('Target.closeTarget', targetId='tab1', _timeout=2)  # 参数不同时按方法名匹配
+            assert tab_ids(replay.address) == []
+        finally:
+            driver.stop()
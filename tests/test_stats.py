@@ -0,0 +1,69 @@
+# -*- coding:utf-8 -*-
+import pytest
+
+from DrissionPage.chromium_driver import ChromiumDriver
+from DrissionPage.commons.stats import byte_len
+from fake_cdp import FakeCdpServer
+
+
+@pytest.fixture
+def server():
+    with FakeCdpServer({'Test.echo': lambda **kwargs: kwargs, 'Target.attachToTarget': {'sessionId': 's1'}}) as s:
+        yield s
+
+
+@pytest.fixture
+def driver(server):
+    d = ChromiumDriver('tab1', 'page', server.address)
+    d.start()
+    yield d
+    d.stop()
+
+
+def test_disabled_by_default(driver):
+    assert driver.stats.enabled is False
+    driver.call_method('Test.echo', a=1)
+    assert driver.stats.snapshot() == {'methods': {}, 'events': {}}
+    assert driver._stats_pending == {}
+
+
+def test_counts_bytes(driver):
+    driver.stats.enabled = True
+    driver.call_method('Test.echo', text='x' * 10)
+    item = driver.stats.snapshot()['methods']['Test.echo']
+    assert item['count'] == 1 and item['errors'] == 0
+    assert item['sent_bytes'] > 10 and item['received_bytes'] > 10
+    assert byte_len('abc') == 3
+    assert byte_len('中文') == 6
+
+
+def test_timeout_counted_as_error(server, driver):
+    driver.stats.enabled = True
+    server.delay = .2
+    with pytest.raises(TimeoutError):
+        driver.call_method('Test.echo', _timeout=.05)
+    with pytest.raises(TimeoutError):
+        driver.call_many([('Test.echo', None), ('Test.echo', None)], timeout=.05)
+    server.delay = 0
+
+    assert driver._stats_pending == {}
+    assert driver.method_results == {}
+    item = driver.stats.snapshot()['methods']['Test.echo']
+    assert item['count'] == 3 and item['errors'] == 3
+
+
+def test_session_timeout_counted_as_error(server):
+    browser = ChromiumDriver('b1', 'browser', server.address)
+    browser.start()
+    try:
+        session = browser.attach('tab1')
+        session.start()
+        session.stats.enabled = True
+        server.delay = .2
+        with pytest.raises(TimeoutError):
+            session.call_method('Test.echo', _timeout=.05)
+        server.delay = 0
+        assert browser._stats_pending == {}
+        assert session.stats.snapshot()['methods']['Test.echo']['errors'] == 1
+    finally:
+        browser.stop()
@@ -0,0 +1,56 @@
+# -*- coding:utf-8 -*-
+from types import SimpleNamespace
+
+import pytest
+from requests import Session
+
+from DrissionPage.chromium_tab import ChromiumTab, WebPageTab
+from fake_cdp import FakeCdpServer
+
+
+@pytest.fixture
+def server():
+    with FakeCdpServer(targets=('page/tab1', 'page/tab2')) as s:
+        yield s
+
+
+def make_page(address):
+    """返回新建标签页对象所需的最小主页面对象"""
+    return SimpleNamespace(address=address, _debug=False, _debug_recorder=None, session=Session(),
+                           timeouts=SimpleNamespace(implicit=1, page_load=1, script=1), timeout=1,
+                           retry_times=0, retry_interval=0, page_load_strategy='normal',
+                           _multiplex_driver=None)
+
+
+def test_web_page_tab(server):
+    tab = WebPageTab(make_page(server.address), 'tab2')
+    try:
+        assert tab.tab_id == 'tab2'
+        assert tab._root_id == 'root'
+        assert tab._node_cache is None
+        assert tab._object_group is None
+        assert tab._helper_id is None
+        assert tab._script_cache is None
+        assert 'DOM.getDocument' in server.methods('page/tab2')
+    finally:
+        tab.driver.stop()
+
+
+def test_chromium_tab(server):
+    tab = ChromiumTab(make_page(server.address), 'tab1')
+    try:
+        assert tab.tab_id == 'tab1'
+        assert tab._root_id == 'root'
+    finally:
+        tab.driver.stop()
+
+
+def test_web_page_tab_helper_runtime(server):
+    tab = WebPageTab(make_page(server.address), 'tab1')
+    try:
+        tab.set.helper_runtime(True)
+        tab.set.script_cache(True)
+        assert tab._helper_id == '1'
+        assert tab._script_cache == {}
+    finally:
+        tab.driver.stop()
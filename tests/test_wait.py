@@ -0,0 +1,88 @@
+# -*- coding:utf-8 -*-
+from json import loads
+from shutil import which
+from subprocess import run
+from time import sleep
+
+import pytest
+
+from DrissionPage.chromium_base import ChromiumBase
+from DrissionPage.chromium_element import wait_in_page, make_js_for_wait, WAIT_MARGIN
+
+
+class FakeSearchPage(object):
+    """DOM.performSearch在_wait_loc()之后才有结果的页面对象"""
+    timeout = 1
+
+    def __init__(self, wait_time):
+        """
+        :param wait_time: _wait_loc()耗时
+        """
+        self._object_group = None
+        self.wait_time = wait_time
+        self.count = 0
+        self.searches = 0
+
+    def run_cdp_loaded(self, cmd, **cmd_args):
+        if cmd == 'DOM.performSearch':
+            self.searches += 1
+            return {'searchId': 's', 'resultCount': self.count}
+        return {'nodeIds': list(range(1, cmd_args['toIndex'] + 1))}
+
+    def run_cdp_many(self, cmds, timeout=None):
+        return [{'node': {'localName': 'div', 'backendNodeId': i[1]['nodeId']}} for i in cmds]
+
+    def _discard_search(self, search_id):
+        pass
+
+    def _wait_loc(self, loc, timeout):
+        sleep(self.wait_time)
+        self.count = 2
+        return False
+
+
+def test_search_again_after_wait_past_deadline():
+    page = FakeSearchPage(.2)
+    r = ChromiumBase._find_elements(page, 'tag:div', timeout=.1, single=False)
+    assert len(r) == 2
+    assert page.searches == 2
+
+
+def test_not_found():
+    page = FakeSearchPage(0)
+    page._wait_loc = lambda loc, timeout: sleep(timeout)
+    assert ChromiumBase._find_elements(page, 'tag:div', timeout=.1, single=False) == []
+
+
+class SlowPage(object):
+    _object_group = None
+
+    def __init__(self):
+        self.timeouts = []
+
+    def run_cdp(self, cmd, **cmd_args):
+        self.timeouts.append(cmd_args['_timeout'])
+        raise TimeoutError
+
+
+def test_wait_in_page_python_timeout():
+    page = SlowPage()
+    r = wait_in_page(page, 'obj', 'function(){return null;}', 1.5)
+    assert r['result']['subtype'] == 'null'
+    assert page.timeouts == [1.5 + WAIT_MARGIN]
+
+
+@pytest.mark.skipif(which('node') is None, reason='需要node执行js')
+def test_wait_observes_every_root():
+    js = make_js_for_wait('function(){return null;}', 0)
+    script = '''
+var observed = [];
+global.MutationObserver = function(){this.observe = function(n){observed.push(n.name);}; this.disconnect = function(){};};
+var doc = {name: 'doc', getRootNode: function(){return this;}};
+var host = {getRootNode: function(){return doc;}};
+var shadow = {name: 'shadow', host: host, getRootNode: function(){return this;}};
+var ele = {getRootNode: function(){return shadow;}};
+(''' + js + ''').call(ele).then(function(){console.log(JSON.stringify(observed));});
+'''
+    r = run(['node', '-e', script], capture_output=True, text=True)
+    assert loads(r.stdout) == ['shadow', 'doc']